@@ -38,12 +38,14 @@ from utils.common import (
 from utils.git_utils import (
     git_clone_wrapper,
     git_pull_wrapper,
+    read_upstream_file,
 )
 from utils.input_utils import get_confirm
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
     cmd_sysctl_service,
     parse_packages_from_file,
+    parse_packages_from_str,
 )
 
 
@@ -117,6 +119,20 @@ def configure_multi_instance() -> None:
         Logger.print_error("Generating .config failed, installation aborted")
 
 
+def get_crowsnest_packages(upstream: bool = False) -> List[str]:
+    """
+    Get the system packages Crowsnest depends on |
+    :param upstream: read them from the upstream branch, i.e. as of after an update
+    :return: List of package names
+    """
+    script = None
+    if upstream:
+        script = read_upstream_file(CROWSNEST_DIR, CROWSNEST_INSTALL_SCRIPT)
+    if script is not None:
+        return parse_packages_from_str(script)
+    return parse_packages_from_file(CROWSNEST_INSTALL_SCRIPT)
+
+
 def update_crowsnest() -> None:
     try:
         cmd_sysctl_service(CROWSNEST_SERVICE_NAME, "stop")
@@ -137,8 +153,7 @@ def update_crowsnest() -> None:
 
             git_pull_wrapper(CROWSNEST_REPO, CROWSNEST_DIR)
 
-            deps = parse_packages_from_file(CROWSNEST_INSTALL_SCRIPT)
-            check_install_dependencies({*deps})
+            check_install_dependencies({*get_crowsnest_packages()})
 
         cmd_sysctl_service(CROWSNEST_SERVICE_NAME, "restart")
 
@@ -16,6 +16,7 @@ from components.klipper.klipper_dialogs import print_instance_overview
 from core.instance_manager.instance_manager import InstanceManager
 from core.logger import Logger
 from core.services.message_service import Message
+from core.services.unit_transaction import UnitTransaction
 from core.types.color import Color
 from utils.fs_utils import run_remove_routines
 from utils.input_utils import get_selection_input
@@ -102,10 +103,13 @@ def remove_instances(
     if not instance_list:
         return
 
-    for instance in instance_list:
-        Logger.print_status(f"Removing instance {instance.service_file_path.stem} ...")
-        InstanceManager.remove(instance)
-        delete_klipper_env_file(instance)
+    with UnitTransaction():
+        for instance in instance_list:
+            Logger.print_status(
+                f"Removing instance {instance.service_file_path.stem} ..."
+            )
+            InstanceManager.remove(instance)
+            delete_klipper_env_file(instance)
 
 
 def delete_klipper_env_file(instance: Klipper):
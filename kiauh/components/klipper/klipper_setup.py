@@ -36,17 +36,17 @@ from components.webui_client.client_utils import (
 )
 from core.instance_manager.instance_manager import InstanceManager
 from core.logger import DialogType, Logger
+from core.services.bytecode import precompile_bytecode
 from core.settings.kiauh_settings import KiauhSettings
 from utils.common import check_install_dependencies
-from utils.git_utils import git_clone_wrapper, git_pull_wrapper
+from utils.git_utils import git_clone_wrapper, git_pull_wrapper, read_upstream_file
 from utils.input_utils import get_confirm
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
-    cmd_sysctl_manage,
-    cmd_sysctl_service,
     create_python_venv,
     install_python_requirements,
     parse_packages_from_file,
+    parse_packages_from_str,
 )
 
 
@@ -101,23 +101,22 @@ def run_klipper_setup(
     if not klipper_list:
         setup_klipper_prerequesites()
 
-    for i in name_dict:
-        # skip this iteration if there is already an instance with the name
-        if name_dict[i] in [n.suffix for n in klipper_list]:
-            continue
+    existing_suffixes = [n.suffix for n in klipper_list]
+    instances = [
+        Klipper(suffix=suffix)
+        for suffix in name_dict.values()
+        # skip the name if there is already an instance with the name
+        if suffix not in existing_suffixes
+    ]
 
-        instance = Klipper(suffix=name_dict[i])
-        instance.create()
-        cmd_sysctl_service(instance.service_file_path.name, "enable")
+    # if a client-config is installed, include it in the new example cfg
+    clients = get_existing_clients() if create_example_cfg else []
 
+    def configure(instance: Klipper) -> None:
         if create_example_cfg:
-            # if a client-config is installed, include it in the new example cfg
-            clients = get_existing_clients()
             create_example_printer_cfg(instance, clients)
 
-        cmd_sysctl_service(instance.service_file_path.name, "start")
-
-    cmd_sysctl_manage("daemon-reload")
+    InstanceManager.create_all(instances, configure)
 
     # step 4: check/handle conflicting packages/services
     handle_disruptive_system_packages()
@@ -167,20 +166,35 @@ def setup_klipper_prerequesites() -> None:
         install_klipper_packages()
         if create_python_venv(KLIPPER_ENV_DIR):
             install_python_requirements(KLIPPER_ENV_DIR, KLIPPER_REQ_FILE)
+            precompile_bytecode(KLIPPER_ENV_DIR, [KLIPPER_DIR.joinpath("klippy")])
     except Exception:
         Logger.print_error("Error during installation of Klipper requirements!")
         raise
 
 
 def install_klipper_packages() -> None:
-    script = KLIPPER_INSTALL_SCRIPT
-    packages = parse_packages_from_file(script)
+    check_install_dependencies({*get_klipper_packages()})
+
+
+def get_klipper_packages(upstream: bool = False) -> List[str]:
+    """
+    Get the system packages Klipper depends on |
+    :param upstream: read them from the upstream branch, i.e. as of after an update
+    :return: List of package names
+    """
+    script = None
+    if upstream:
+        script = read_upstream_file(KLIPPER_DIR, KLIPPER_INSTALL_SCRIPT)
+    if script is not None:
+        packages = parse_packages_from_str(script)
+    else:
+        packages = parse_packages_from_file(KLIPPER_INSTALL_SCRIPT)
 
     # Add dbus requirement for DietPi distro
     if Path("/boot/dietpi/.version").exists():
         packages.append("dbus")
 
-    check_install_dependencies({*packages})
+    return packages
 
 
 def update_klipper() -> None:
@@ -209,6 +223,7 @@ def update_klipper() -> None:
     install_klipper_packages()
     # install possible new python dependencies
     install_python_requirements(KLIPPER_ENV_DIR, KLIPPER_REQ_FILE)
+    precompile_bytecode(KLIPPER_ENV_DIR, [KLIPPER_DIR.joinpath("klippy")])
 
     InstanceManager.start_all(instances)
 
@@ -40,7 +40,7 @@ from core.types.component_status import ComponentStatus
 from utils.common import get_install_status
 from utils.input_utils import get_confirm, get_number_input, get_string_input
 from utils.instance_utils import get_instances
-from utils.sys_utils import cmd_sysctl_service
+from utils.sys_utils import cmd_sysctl_service, get_service_states
 
 
 def get_klipper_status() -> ComponentStatus:
@@ -125,23 +125,9 @@ def check_user_groups() -> None:
 
 
 def handle_disruptive_system_packages() -> None:
-    services = []
-
-    command = ["systemctl", "is-enabled", "brltty"]
-    brltty_status = run(command, capture_output=True, text=True)
-
-    command = ["systemctl", "is-enabled", "brltty-udev"]
-    brltty_udev_status = run(command, capture_output=True, text=True)
-
-    command = ["systemctl", "is-enabled", "ModemManager"]
-    modem_manager_status = run(command, capture_output=True, text=True)
-
-    if "enabled" in brltty_status.stdout:
-        services.append("brltty")
-    if "enabled" in brltty_udev_status.stdout:
-        services.append("brltty-udev")
-    if "enabled" in modem_manager_status.stdout:
-        services.append("ModemManager")
+    disruptive = ["brltty", "brltty-udev", "ModemManager"]
+    states = get_service_states(disruptive)
+    services = [s for s in disruptive if s in states and states[s].is_enabled]
 
     for service in services if services else []:
         try:
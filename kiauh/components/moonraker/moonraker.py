@@ -9,6 +9,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from subprocess import CalledProcessError
 
@@ -30,6 +31,7 @@ from core.submodules.simple_config_parser.src.simple_config_parser.simple_config
 )
 from utils.fs_utils import create_folders
 from utils.sys_utils import get_service_file_path
+from utils.template_utils import render_template
 
 
 # noinspection PyMethodMayBeStatic
@@ -41,26 +43,40 @@ class Moonraker:
     log_file_name: str = MOONRAKER_LOG_NAME
     moonraker_dir: Path = MOONRAKER_DIR
     env_dir: Path = MOONRAKER_ENV_DIR
-    data_dir: Path = field(init=False)
-    cfg_file: Path = field(init=False)
-    env_file: Path = field(init=False)
-    backup_dir: Path = field(init=False)
-    certs_dir: Path = field(init=False)
-    db_dir: Path = field(init=False)
-    port: int | None = field(init=False)
 
     def __post_init__(self):
         self.base: BaseInstance = BaseInstance(Klipper, self.suffix)
         self.base.log_file_name = self.log_file_name
 
         self.service_file_path: Path = get_service_file_path(Moonraker, self.suffix)
-        self.data_dir: Path = self.base.data_dir
-        self.cfg_file: Path = self.base.cfg_dir.joinpath(MOONRAKER_CFG_NAME)
-        self.env_file: Path = self.base.sysd_dir.joinpath(MOONRAKER_ENV_FILE_NAME)
-        self.backup_dir: Path = self.base.data_dir.joinpath("backup")
-        self.certs_dir: Path = self.base.data_dir.joinpath("certs")
-        self.db_dir: Path = self.base.data_dir.joinpath("database")
-        self.port: int | None = self._get_port()
+
+    @cached_property
+    def data_dir(self) -> Path:
+        return self.base.data_dir
+
+    @cached_property
+    def cfg_file(self) -> Path:
+        return self.base.cfg_dir.joinpath(MOONRAKER_CFG_NAME)
+
+    @cached_property
+    def env_file(self) -> Path:
+        return self.base.sysd_dir.joinpath(MOONRAKER_ENV_FILE_NAME)
+
+    @cached_property
+    def backup_dir(self) -> Path:
+        return self.base.data_dir.joinpath("backup")
+
+    @cached_property
+    def certs_dir(self) -> Path:
+        return self.base.data_dir.joinpath("certs")
+
+    @cached_property
+    def db_dir(self) -> Path:
+        return self.base.data_dir.joinpath("database")
+
+    @cached_property
+    def port(self) -> int | None:
+        return self._get_port()
 
     def create(self) -> None:
         from utils.sys_utils import create_env_file, create_service_file
@@ -87,53 +103,24 @@ class Moonraker:
             raise
 
     def _prep_service_file_content(self) -> str:
-        template = MOONRAKER_SERVICE_TEMPLATE
-
-        try:
-            with open(template, "r") as template_file:
-                template_content = template_file.read()
-        except FileNotFoundError:
-            Logger.print_error(f"Unable to open {template} - File not found")
-            raise
-
-        service_content = template_content.replace(
-            "%USER%",
-            CURRENT_USER,
-        )
-        service_content = service_content.replace(
-            "%MOONRAKER_DIR%",
-            self.moonraker_dir.as_posix(),
-        )
-        service_content = service_content.replace(
-            "%ENV%",
-            self.env_dir.as_posix(),
+        return render_template(
+            MOONRAKER_SERVICE_TEMPLATE,
+            {
+                "USER": CURRENT_USER,
+                "MOONRAKER_DIR": self.moonraker_dir.as_posix(),
+                "ENV": self.env_dir.as_posix(),
+                "ENV_FILE": self.env_file.as_posix(),
+            },
         )
-        service_content = service_content.replace(
-            "%ENV_FILE%",
-            self.base.sysd_dir.joinpath(MOONRAKER_ENV_FILE_NAME).as_posix(),
-        )
-        return service_content
 
     def _prep_env_file_content(self) -> str:
-        template = MOONRAKER_ENV_FILE_TEMPLATE
-
-        try:
-            with open(template, "r") as env_file:
-                env_template_file_content = env_file.read()
-        except FileNotFoundError:
-            Logger.print_error(f"Unable to open {template} - File not found")
-            raise
-
-        env_file_content = env_template_file_content.replace(
-            "%MOONRAKER_DIR%",
-            self.moonraker_dir.as_posix(),
+        return render_template(
+            MOONRAKER_ENV_FILE_TEMPLATE,
+            {
+                "MOONRAKER_DIR": self.moonraker_dir.as_posix(),
+                "PRINTER_DATA": self.base.data_dir.as_posix(),
+            },
         )
-        env_file_content = env_file_content.replace(
-            "%PRINTER_DATA%",
-            self.base.data_dir.as_posix(),
-        )
-
-        return env_file_content
 
     def _get_port(self) -> int | None:
         if not self.cfg_file or not self.cfg_file.is_file():
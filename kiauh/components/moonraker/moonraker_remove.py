@@ -16,6 +16,7 @@ from components.moonraker import MOONRAKER_DIR, MOONRAKER_ENV_DIR
 from components.moonraker.moonraker import Moonraker
 from core.instance_manager.instance_manager import InstanceManager
 from core.logger import Logger
+from core.services.unit_transaction import UnitTransaction
 from utils.fs_utils import run_remove_routines
 from utils.input_utils import get_selection_input
 from utils.instance_utils import get_instances
@@ -91,10 +92,13 @@ def remove_instances(
     if not instance_list:
         Logger.print_info("No Moonraker instances found. Skipped ...")
         return
-    for instance in instance_list:
-        Logger.print_status(f"Removing instance {instance.service_file_path.stem} ...")
-        InstanceManager.remove(instance)
-        delete_moonraker_env_file(instance)
+    with UnitTransaction():
+        for instance in instance_list:
+            Logger.print_status(
+                f"Removing instance {instance.service_file_path.stem} ..."
+            )
+            InstanceManager.remove(instance)
+            delete_moonraker_env_file(instance)
 
 
 def remove_polkit_rules() -> None:
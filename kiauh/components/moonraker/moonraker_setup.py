@@ -39,10 +39,11 @@ from components.webui_client.client_utils import (
 from components.webui_client.mainsail_data import MainsailData
 from core.instance_manager.instance_manager import InstanceManager
 from core.logger import Logger
+from core.services.bytecode import precompile_bytecode
 from core.settings.kiauh_settings import KiauhSettings
 from utils.common import check_install_dependencies
 from utils.fs_utils import check_file_exist
-from utils.git_utils import git_clone_wrapper, git_pull_wrapper
+from utils.git_utils import git_clone_wrapper, git_pull_wrapper, read_upstream_file
 from utils.input_utils import (
     get_confirm,
     get_selection_input,
@@ -50,8 +51,6 @@ from utils.input_utils import (
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
     check_python_version,
-    cmd_sysctl_manage,
-    cmd_sysctl_service,
     create_python_venv,
     install_python_requirements,
     parse_packages_from_file,
@@ -103,19 +102,15 @@ def install_moonraker() -> None:
         install_moonraker_polkit()
 
         used_ports_map = {m.suffix: m.port for m in moonraker_list}
-        for instance in instances:
-            instance.create()
-            cmd_sysctl_service(instance.service_file_path.name, "enable")
+        # if a webclient and/or it's config is installed, patch
+        # its update section to the config
+        clients = get_existing_clients() if create_example_cfg else []
 
+        def configure(instance: Moonraker) -> None:
             if create_example_cfg:
-                # if a webclient and/or it's config is installed, patch
-                # its update section to the config
-                clients = get_existing_clients()
                 create_example_moonraker_conf(instance, used_ports_map, clients)
 
-            cmd_sysctl_service(instance.service_file_path.name, "start")
-
-        cmd_sysctl_manage("daemon-reload")
+        InstanceManager.create_all(instances, configure)
 
         # if mainsail is installed, and we installed
         # multiple moonraker instances, we enable mainsails remote mode
@@ -149,14 +144,30 @@ def setup_moonraker_prerequesites() -> None:
     # install moonraker dependencies and create python virtualenv
     install_moonraker_packages()
     if create_python_venv(MOONRAKER_ENV_DIR):
-        install_python_requirements(MOONRAKER_ENV_DIR, MOONRAKER_REQ_FILE)
-        install_python_requirements(MOONRAKER_ENV_DIR, MOONRAKER_SPEEDUPS_REQ_FILE)
+        install_python_requirements(
+            MOONRAKER_ENV_DIR, [MOONRAKER_REQ_FILE, MOONRAKER_SPEEDUPS_REQ_FILE]
+        )
+        precompile_bytecode(MOONRAKER_ENV_DIR, [MOONRAKER_DIR.joinpath("moonraker")])
 
 
 def install_moonraker_packages() -> None:
+    check_install_dependencies({*get_moonraker_packages()})
+
+
+def get_moonraker_packages(upstream: bool = False) -> List[str]:
+    """
+    Get the system packages Moonraker depends on |
+    :param upstream: read them from the upstream branch, i.e. as of after an update
+    :return: List of package names
+    """
     moonraker_deps = []
 
-    if MOONRAKER_DEPS_JSON_FILE.exists():
+    deps_json = None
+    if upstream:
+        deps_json = read_upstream_file(MOONRAKER_DIR, MOONRAKER_DEPS_JSON_FILE)
+    if deps_json is not None:
+        moonraker_deps = json.loads(deps_json).get("debian", [])
+    elif MOONRAKER_DEPS_JSON_FILE.exists():
         with open(MOONRAKER_DEPS_JSON_FILE, "r") as deps:
             moonraker_deps = json.load(deps).get("debian", [])
     elif MOONRAKER_INSTALL_SCRIPT.exists():
@@ -165,7 +176,7 @@ def install_moonraker_packages() -> None:
     if not moonraker_deps:
         raise ValueError("Error reading Moonraker dependencies!")
 
-    check_install_dependencies({*moonraker_deps})
+    return moonraker_deps
 
 
 def install_moonraker_polkit() -> None:
@@ -214,6 +225,9 @@ def update_moonraker() -> None:
     # install possible new system packages
     install_moonraker_packages()
     # install possible new python dependencies
-    install_python_requirements(MOONRAKER_ENV_DIR, MOONRAKER_REQ_FILE)
+    install_python_requirements(
+        MOONRAKER_ENV_DIR, [MOONRAKER_REQ_FILE, MOONRAKER_SPEEDUPS_REQ_FILE]
+    )
+    precompile_bytecode(MOONRAKER_ENV_DIR, [MOONRAKER_DIR.joinpath("moonraker")])
 
     InstanceManager.start_all(instances)
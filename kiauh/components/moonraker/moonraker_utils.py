@@ -21,6 +21,7 @@ from components.moonraker import (
 from components.moonraker.moonraker import Moonraker
 from components.webui_client.base_data import BaseWebClient
 from core.backup_manager.backup_manager import BackupManager
+from core.instance_manager.base_instance import invalidate_cached_properties
 from core.logger import Logger
 from core.submodules.simple_config_parser.src.simple_config_parser.simple_config_parser import (
     SimpleConfigParser,
@@ -118,6 +119,7 @@ def create_example_moonraker_conf(
                     scp.set_option(c_config_section, option[0], option[1])
 
     scp.write_file(target)
+    invalidate_cached_properties(instance)
     Logger.print_ok(f"Example moonraker.conf created in '{instance.base.cfg_dir}'")
 
 
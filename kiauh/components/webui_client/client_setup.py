@@ -6,10 +6,12 @@
 #                                                                         #
 #  This file may be distributed under the terms of the GNU GPLv3 license  #
 # ======================================================================= #
+import os
 import shutil
 import tempfile
+import threading
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 from components.klipper.klipper import Klipper
 from components.moonraker.moonraker import Moonraker
@@ -50,6 +52,13 @@ from utils.sys_utils import (
     get_ipv4_addr,
 )
 
+# zip files of the clients that were downloaded ahead of an update
+_prefetched: Dict[str, Path] = {}
+_prefetched_lock = threading.Lock()
+# incremented by discard_prefetched_clients(), downloads that started before
+# remove their file once they finish instead of registering it
+_prefetch_generation = 0
+
 
 def install_client(
     client: BaseWebClient,
@@ -149,15 +158,64 @@ def install_client(
     )
 
 
+def prefetch_client(client: BaseWebClient) -> None:
+    """
+    Downloads the zip file of a client ahead of its update, the next call of
+    download_client() uses the file instead of downloading it again |
+    :param client: the client to download
+    :return: None
+    """
+    with _prefetched_lock:
+        generation = _prefetch_generation
+
+    fd, tmp = tempfile.mkstemp(prefix=f"{client.name.lower()}-", suffix=".zip")
+    os.close(fd)
+    try:
+        download_file(client.download_url, Path(tmp), False)
+    except Exception:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+    # the file is only registered once it is complete
+    with _prefetched_lock:
+        if generation != _prefetch_generation:
+            Path(tmp).unlink(missing_ok=True)
+            return
+        previous = _prefetched.get(client.name)
+        if previous is not None:
+            previous.unlink(missing_ok=True)
+        _prefetched[client.name] = Path(tmp)
+
+
+def discard_prefetched_clients() -> None:
+    """
+    Removes the zip files of all prefetched clients that were not used by an
+    update. Downloads that are still running remove their file once they finish. |
+    :return: None
+    """
+    global _prefetch_generation
+    with _prefetched_lock:
+        _prefetch_generation += 1
+        for prefetched in _prefetched.values():
+            prefetched.unlink(missing_ok=True)
+        _prefetched.clear()
+
+
 def download_client(client: BaseWebClient) -> None:
     zipfile = f"{client.name.lower()}.zip"
     target = Path().home().joinpath(zipfile)
+    with _prefetched_lock:
+        prefetched = _prefetched.pop(client.name, None)
     try:
-        Logger.print_status(
-            f"Downloading {client.display_name} from {client.download_url} ..."
-        )
-        download_file(client.download_url, target, True)
-        Logger.print_ok("Download complete!")
+        if prefetched is not None and prefetched.is_file():
+            Logger.print_status(f"Using prefetched download of {client.display_name}")
+            shutil.move(prefetched.as_posix(), target)
+        else:
+            Logger.print_status(
+                f"Downloading {client.display_name} from {client.download_url} ..."
+            )
+            download_file(client.download_url, target, True)
+            Logger.print_ok("Download complete!")
 
         Logger.print_status(f"Extracting {zipfile} ...")
         unzip(target, client.client_dir)
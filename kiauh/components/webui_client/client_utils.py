@@ -12,7 +12,7 @@ import json
 import re
 import shutil
 from pathlib import Path
-from subprocess import PIPE, CalledProcessError, run
+from subprocess import CalledProcessError
 from typing import List, get_args
 
 from components.klipper.klipper import Klipper
@@ -32,13 +32,16 @@ from core.constants import (
 )
 from core.logger import Logger
 from core.settings.kiauh_settings import KiauhSettings, WebUiSettings
-from core.submodules.simple_config_parser.src.simple_config_parser.simple_config_parser import (
-    SimpleConfigParser,
-)
 from core.types.color import Color
 from core.types.component_status import ComponentStatus
 from utils.common import get_install_status
-from utils.fs_utils import create_symlink, remove_file
+from utils.config_utils import get_config_sections
+from utils.fs_utils import (
+    copy_with_sudo,
+    create_symlink,
+    move_with_sudo,
+    remove_file,
+)
 from utils.git_utils import (
     get_latest_remote_tag,
     get_latest_unstable_tag,
@@ -87,10 +90,9 @@ def get_current_client_config() -> str:
     mainsail_includes, fluidd_includes = [], []
     klipper_instances: List[Klipper] = get_instances(Klipper)
     for instance in klipper_instances:
-        scp = SimpleConfigParser()
-        scp.read_file(instance.cfg_file)
-        includes_mainsail = scp.has_section(mainsail.client_config.config_section)
-        includes_fluidd = scp.has_section(fluidd.client_config.config_section)
+        sections = [name for name, _ in get_config_sections(instance.cfg_file)]
+        includes_mainsail = mainsail.client_config.config_section in sections
+        includes_fluidd = fluidd.client_config.config_section in sections
 
         if includes_mainsail:
             mainsail_includes.append(instance)
@@ -257,8 +259,7 @@ def copy_upstream_nginx_cfg() -> None:
     source = MODULE_PATH.joinpath("assets/upstreams.conf")
     target = NGINX_CONFD.joinpath("upstreams.conf")
     try:
-        command = ["sudo", "cp", source, target]
-        run(command, stderr=PIPE, check=True)
+        copy_with_sudo(source, target)
     except CalledProcessError as e:
         log = f"Unable to create upstreams.conf: {e.stderr.decode()}"
         Logger.print_error(log)
@@ -273,8 +274,7 @@ def copy_common_vars_nginx_cfg() -> None:
     source = MODULE_PATH.joinpath("assets/common_vars.conf")
     target = NGINX_CONFD.joinpath("common_vars.conf")
     try:
-        command = ["sudo", "cp", source, target]
-        run(command, stderr=PIPE, check=True)
+        copy_with_sudo(source, target)
     except CalledProcessError as e:
         log = f"Unable to create upstreams.conf: {e.stderr.decode()}"
         Logger.print_error(log)
@@ -304,8 +304,7 @@ def generate_nginx_cfg_from_template(name: str, template_src: Path, **kwargs) ->
 
     target = NGINX_SITES_AVAILABLE.joinpath(name)
     try:
-        command = ["sudo", "mv", tmp, target]
-        run(command, stderr=PIPE, check=True)
+        move_with_sudo(tmp, target)
     except CalledProcessError as e:
         log = f"Unable to create '{target}': {e.stderr.decode()}"
         Logger.print_error(log)
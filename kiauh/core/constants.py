@@ -16,6 +16,9 @@ from core.backup_manager import BACKUP_ROOT_DIR
 # global dependencies
 GLOBAL_DEPS = ["git", "wget", "curl", "unzip", "dfu-util", "python3-virtualenv"]
 
+# urls
+GITHUB_API_URL = "https://api.github.com"
+
 # strings
 INVALID_CHOICE = "Invalid choice. Please select a valid value."
 
@@ -23,6 +26,8 @@ INVALID_CHOICE = "Invalid choice. Please select a valid value."
 CURRENT_USER = pwd.getpwuid(os.getuid())[0]
 
 # dirs
+KIAUH_DATA_DIR = Path.home().joinpath(".kiauh")
+KIAUH_CACHE_DIR = KIAUH_DATA_DIR.joinpath("cache")
 SYSTEMD = Path("/etc/systemd/system")
 PRINTER_DATA_BACKUP_DIR = BACKUP_ROOT_DIR.joinpath("printer-data-backups")
 NGINX_SITES_AVAILABLE = Path("/etc/nginx/sites-available")
@@ -10,11 +10,16 @@ from __future__ import annotations
 
 from pathlib import Path
 from subprocess import CalledProcessError
-from typing import List
+from typing import Callable, List
 
 from core.logger import Logger
+from core.services.unit_transaction import UnitTransaction
 from utils.instance_type import InstanceType
-from utils.sys_utils import cmd_sysctl_service
+from utils.sys_utils import (
+    SysCtlServiceAction,
+    cmd_sysctl_service,
+    cmd_sysctl_services,
+)
 
 
 class InstanceManager:
@@ -64,19 +69,49 @@ class InstanceManager:
             raise
 
     @staticmethod
-    def start_all(instances: List[InstanceType]) -> None:
-        for instance in instances:
-            InstanceManager.start(instance)
+    def start_all(instances: List[InstanceType], no_block: bool = False) -> None:
+        InstanceManager._run_bulk_action(instances, "start", no_block)
 
     @staticmethod
-    def stop_all(instances: List[InstanceType]) -> None:
-        for instance in instances:
-            InstanceManager.stop(instance)
+    def stop_all(instances: List[InstanceType], no_block: bool = False) -> None:
+        InstanceManager._run_bulk_action(instances, "stop", no_block)
 
     @staticmethod
-    def restart_all(instances: List[InstanceType]) -> None:
-        for instance in instances:
-            InstanceManager.restart(instance)
+    def restart_all(instances: List[InstanceType], no_block: bool = False) -> None:
+        InstanceManager._run_bulk_action(instances, "restart", no_block)
+
+    @staticmethod
+    def _run_bulk_action(
+        instances: List[InstanceType], action: SysCtlServiceAction, no_block: bool
+    ) -> None:
+        names: List[str] = [i.service_file_path.name for i in instances]
+        try:
+            cmd_sysctl_services(names, action, no_block=no_block)
+        except CalledProcessError as e:
+            Logger.print_error(f"Error running {action} on {', '.join(names)}: {e}")
+            raise
+
+    @staticmethod
+    def create_all(
+        instances: List[InstanceType],
+        configure: Callable[[InstanceType], None] | None = None,
+    ) -> None:
+        """
+        Creates several instances at once. All service files are installed with
+        a single privileged call and systemd is reloaded once before all services
+        are enabled and started with one systemctl call each. |
+        :param instances: List of instances to create
+        :param configure: Optional function that is called for each instance
+            after it was created and before its service is started
+        :return: None
+        """
+        with UnitTransaction() as transaction:
+            for instance in instances:
+                instance.create()
+                transaction.enable(instance.service_file_path.name)
+                if configure is not None:
+                    configure(instance)
+                transaction.start(instance.service_file_path.name)
 
     @staticmethod
     def remove(instance: InstanceType) -> None:
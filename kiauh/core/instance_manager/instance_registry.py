@@ -0,0 +1,128 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from core.constants import SYSTEMD
+
+DATA_DIR_PATTERN = re.compile(r"^EnvironmentFile=(.+)(/systemd/.+\.env)", re.MULTILINE)
+
+
+# noinspection PyMethodMayBeStatic
+class InstanceRegistry:
+    """
+    Process-wide index of the unit files in the systemd directory. The directory
+    is only listed again after its mtime changed, which happens whenever a unit
+    file is created, renamed or removed. Service files are parsed once and only
+    parsed again after their own mtime or size changed.
+    """
+
+    _instance = None
+
+    def __new__(cls) -> "InstanceRegistry":
+        if cls._instance is None:
+            cls._instance = super(InstanceRegistry, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, systemd_dir: Path = SYSTEMD) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        self._initialized = True
+        self.systemd_dir = systemd_dir
+        self._lock = threading.Lock()
+        self._dir_mtime: int | None = None
+        self._unit_files: List[str] = []
+        self._matches: Dict[Tuple[str, str, Tuple[str, ...]], List[str]] = {}
+        self._data_dirs: Dict[Path, Tuple[Tuple[int, int], Path | None]] = {}
+
+    def get_unit_files(self) -> List[str]:
+        """
+        Get the names of all files in the systemd directory |
+        :return: sorted List of file names
+        """
+        with self._lock:
+            self._refresh()
+            return list(self._unit_files)
+
+    def find_units(
+        self, name: str, suffix: str = "service", exclude: List[str] | None = None
+    ) -> List[str]:
+        """
+        Get all unit files named "<name>.<suffix>" or "<name>-<id>.<suffix>" |
+        :param name: the name of the unit file
+        :param suffix: suffix of the unit file, e.g. "service" or "timer"
+        :param exclude: List of strings the unit file names must not contain
+        :return: List of matching file names
+        """
+        key = (name, suffix, tuple(exclude or []))
+        with self._lock:
+            self._refresh()
+            if key not in self._matches:
+                pattern = re.compile(f"^{name}(-[0-9a-zA-Z]+)?.{suffix}$")
+                self._matches[key] = [
+                    unit
+                    for unit in self._unit_files
+                    if pattern.search(unit) and not any(s in unit for s in key[2])
+                ]
+            return list(self._matches[key])
+
+    def get_data_dir(self, service_file: Path) -> Path | None:
+        """
+        Get the data dir of an instance from the EnvironmentFile of its service file |
+        :param service_file: Path to the service file
+        :return: the data dir or None if the file does not exist or has no such line
+        """
+        try:
+            stat = os.stat(service_file)
+        except OSError:
+            return None
+
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._data_dirs.get(service_file)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        try:
+            with open(service_file, "r") as f:
+                match = DATA_DIR_PATTERN.search(f.read())
+        except OSError:
+            return None
+
+        data_dir = Path(match.group(1)) if match else None
+        with self._lock:
+            self._data_dirs[service_file] = (key, data_dir)
+
+        return data_dir
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._dir_mtime = None
+            self._data_dirs.clear()
+
+    def _refresh(self) -> None:
+        try:
+            mtime = os.stat(self.systemd_dir).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if mtime is not None and mtime == self._dir_mtime:
+            return
+
+        try:
+            self._unit_files = sorted(os.listdir(self.systemd_dir))
+        except OSError:
+            self._unit_files = []
+        self._dir_mtime = mtime
+        self._matches.clear()
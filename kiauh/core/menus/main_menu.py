@@ -10,7 +10,7 @@ from __future__ import annotations
 
 import sys
 import textwrap
-from typing import Callable, Type
+from typing import Callable, Dict, Tuple, Type
 
 from components.crowsnest.crowsnest import get_crowsnest_status
 from components.klipper.klipper_utils import get_klipper_status
@@ -23,6 +23,8 @@ from components.webui_client.client_utils import (
 )
 from components.webui_client.fluidd_data import FluiddData
 from components.webui_client.mainsail_data import MainsailData
+from core.instance_manager.base_instance import SUFFIX_BLACKLIST
+from core.instance_manager.instance_registry import InstanceRegistry
 from core.logger import Logger
 from core.menus import FooterType
 from core.menus.advanced_menu import AdvancedMenu
@@ -34,8 +36,10 @@ from core.menus.settings_menu import SettingsMenu
 from core.menus.update_menu import UpdateMenu
 from core.types.color import Color
 from core.types.component_status import ComponentStatus, StatusMap, StatusText
+from core.types.service_state import ServiceState
 from extensions.extensions_menu import ExtensionsMenu
 from utils.common import get_kiauh_version, trunc_string
+from utils.instance_utils import get_service_snapshot
 
 
 # noinspection PyUnusedLocal
@@ -54,6 +58,13 @@ class MainMenu(BaseMenu):
         self.mr_status, self.mr_owner, self.mr_repo = "", "", ""
         self.ms_status, self.fl_status, self.ks_status = "", "", ""
         self.cn_status, self.cc_status = "", ""
+        self.service_states: Dict[str, ServiceState] = {}
+        self.service_names: Dict[str, str] = {
+            "kl": "klipper",
+            "mr": "moonraker",
+            "ks": "KlipperScreen",
+            "cn": "crowsnest",
+        }
         self._init_status()
 
     def set_previous_menu(self, previous_menu: Type[BaseMenu] | None) -> None:
@@ -83,6 +94,7 @@ class MainMenu(BaseMenu):
 
     def _fetch_status(self) -> None:
         self.version = get_kiauh_version()
+        self.service_states = get_service_snapshot()
         self._get_component_status("kl", get_klipper_status)
         self._get_component_status("mr", get_moonraker_status)
         self._get_component_status("ms", get_client_status, MainsailData())
@@ -103,11 +115,41 @@ class MainMenu(BaseMenu):
         if instance_count > 0 and code == 2:
             count_txt = f": {instance_count}"
 
-        setattr(self, f"{name}_status", self._format_by_code(code, status, count_txt))
+        color: Color | None = None
+        if code == 2 and name in self.service_names:
+            count_txt, color = self._get_service_status(name, count_txt)
+
+        setattr(
+            self, f"{name}_status", self._format_by_code(code, status, count_txt, color)
+        )
         setattr(self, f"{name}_owner", Color.apply(owner, Color.CYAN))
         setattr(self, f"{name}_repo", Color.apply(repo, Color.CYAN))
 
-    def _format_by_code(self, code: int, status: str, count: str) -> str:
+    def _get_service_status(
+        self, name: str, count_txt: str
+    ) -> Tuple[str, Color | None]:
+        units = InstanceRegistry().find_units(
+            self.service_names[name], "service", SUFFIX_BLACKLIST
+        )
+        states = [self.service_states[u] for u in units if u in self.service_states]
+        failed = len([s for s in states if s.is_failed])
+        stopped = len([s for s in states if not s.is_running]) - failed
+
+        # components with instances show the number of affected instances
+        if failed > 0:
+            amount = f"{failed} " if count_txt else ""
+            return f"{count_txt}, {amount}failed", Color.RED
+        if stopped > 0:
+            amount = f"{stopped} " if count_txt else ""
+            return f"{count_txt}, {amount}stopped", Color.YELLOW
+        return count_txt, None
+
+    def _format_by_code(
+        self, code: int, status: str, count: str, color: Color | None = None
+    ) -> str:
+        if color is not None:
+            return Color.apply(f"{status}{count}", color)
+
         color = Color.RED
         if code == 0:
             color = Color.RED
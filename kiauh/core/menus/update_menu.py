@@ -9,23 +9,40 @@
 from __future__ import annotations
 
 import textwrap
-from typing import Callable, List, Type
-
-from components.crowsnest.crowsnest import get_crowsnest_status, update_crowsnest
-from components.klipper.klipper_setup import update_klipper
+import time
+from typing import Any, Callable, Dict, List, Tuple, Type, cast
+
+from components.crowsnest import CROWSNEST_DIR
+from components.crowsnest.crowsnest import (
+    get_crowsnest_packages,
+    get_crowsnest_status,
+    update_crowsnest,
+)
+from components.klipper import KLIPPER_DIR
+from components.klipper.klipper_setup import get_klipper_packages, update_klipper
 from components.klipper.klipper_utils import (
     get_klipper_status,
 )
+from components.klipperscreen import KLIPPERSCREEN_DIR
 from components.klipperscreen.klipperscreen import (
     get_klipperscreen_status,
     update_klipperscreen,
 )
-from components.moonraker.moonraker_setup import update_moonraker
+from components.moonraker import MOONRAKER_DIR
+from components.moonraker.moonraker_setup import (
+    get_moonraker_packages,
+    update_moonraker,
+)
 from components.moonraker.moonraker_utils import get_moonraker_status
+from components.webui_client.base_data import BaseWebClient
 from components.webui_client.client_config.client_config_setup import (
     update_client_config,
 )
-from components.webui_client.client_setup import update_client
+from components.webui_client.client_setup import (
+    discard_prefetched_clients,
+    prefetch_client,
+    update_client,
+)
 from components.webui_client.client_utils import (
     get_client_config_status,
     get_client_status,
@@ -35,15 +52,65 @@ from components.webui_client.mainsail_data import MainsailData
 from core.logger import DialogType, Logger
 from core.menus import Option
 from core.menus.base_menu import BaseMenu
+from core.services.probe_runner import ProbeResult, ProbeRunner
+from core.services.remote_prefetcher import RemotePrefetcher
 from core.types.color import Color
 from core.types.component_status import ComponentStatus
+from utils.common import install_planned_dependencies
+from utils.git_utils import git_cmd_fetch
 from utils.input_utils import get_confirm
 from utils.sys_utils import (
+    check_package_lists_outdated,
     get_upgradable_packages,
     update_system_package_lists,
     upgrade_system_packages,
 )
 
+# repositories are fetched and client zips downloaded concurrently before
+# "Update all" applies the updates, the updates themselves still run serially
+UPDATE_FETCH_WORKERS = 4
+UPDATE_FETCH_TIMEOUT = 300.0
+
+
+def get_remote_prefetch_probes() -> Dict[str, Tuple[Callable, tuple]]:
+    """
+    Get the probes that warm the remote version information shown by the
+    update menu, named like the corresponding probes of the menu itself |
+    :return: Dict of probe names and a tuple of function and arguments
+    """
+    return {
+        "klipper": (get_klipper_status, ()),
+        "moonraker": (get_moonraker_status, ()),
+        "mainsail": (_prefetch_client_status, (MainsailData,)),
+        "mainsail_config": (_prefetch_client_config_status, (MainsailData,)),
+        "fluidd": (_prefetch_client_status, (FluiddData,)),
+        "fluidd_config": (_prefetch_client_config_status, (FluiddData,)),
+        "klipperscreen": (get_klipperscreen_status, ()),
+        "crowsnest": (get_crowsnest_status, ()),
+        "system": (_prefetch_upgradable_packages, ()),
+    }
+
+
+# the client data is created inside the probe, as creating it
+# looks up the download url of the client, which may be remote
+def _prefetch_client_status(data_cls: Callable[[], BaseWebClient]) -> ComponentStatus:
+    return get_client_status(data_cls(), True)
+
+
+def _prefetch_client_config_status(
+    data_cls: Callable[[], BaseWebClient],
+) -> ComponentStatus:
+    return get_client_config_status(data_cls())
+
+
+def _prefetch_upgradable_packages() -> List[str] | None:
+    # updating the package lists requires sudo, which must not
+    # prompt for a password in the background, so we leave that
+    # to the update menu when the lists are outdated
+    if check_package_lists_outdated():
+        return None
+    return get_upgradable_packages()
+
 
 # noinspection PyUnusedLocal
 # noinspection PyMethodMayBeStatic
@@ -58,7 +125,10 @@ class UpdateMenu(BaseMenu):
         self.previous_menu: Type[BaseMenu] | None = previous_menu
 
         self.packages: List[str] = []
-        self.package_count: int = 0
+        self.package_count: int | None = 0
+        self.probe_durations: Dict[str, float | None] = {}
+        # fetches of "Update all" keep running after they timed out
+        self.update_fetches: ProbeRunner | None = None
 
         self.klipper_local = self.klipper_remote = ""
         self.moonraker_local = self.moonraker_remote = ""
@@ -71,7 +141,7 @@ class UpdateMenu(BaseMenu):
 
         self.mainsail_data = MainsailData()
         self.fluidd_data = FluiddData()
-        self.status_data = {
+        self.status_data: Dict[str, Dict[str, Any]] = {
             "klipper": {
                 "display_name": "Klipper",
                 "installed": False,
@@ -147,7 +217,10 @@ class UpdateMenu(BaseMenu):
     def print_menu(self) -> None:
         sysupgrades: str = "No upgrades available."
         padding = 29
-        if self.package_count > 0:
+        if self.package_count is None:
+            sysupgrades = Color.apply("Upgrades unknown.", Color.YELLOW)
+            padding = 38
+        elif self.package_count > 0:
             sysupgrades = Color.apply(
                 f"{self.package_count} upgrades available!", Color.GREEN
             )
@@ -182,15 +255,21 @@ class UpdateMenu(BaseMenu):
 
     def update_all(self, **kwargs) -> None:
         Logger.print_status("Updating all components ...")
-        self.update_klipper()
-        self.update_moonraker()
-        self.update_mainsail()
-        self.update_mainsail_config()
-        self.update_fluidd()
-        self.update_fluidd_config()
-        self.update_klipperscreen()
-        self.update_crowsnest()
-        self.upgrade_system_packages()
+        try:
+            self._prefetch_updates()
+            self._install_update_dependencies()
+            self.update_klipper()
+            self.update_moonraker()
+            self.update_mainsail()
+            self.update_mainsail_config()
+            self.update_fluidd()
+            self.update_fluidd_config()
+            self.update_klipperscreen()
+            self.update_crowsnest()
+            self.upgrade_system_packages()
+        finally:
+            # downloads that were not used, e.g. because they finished too late
+            discard_prefetched_clients()
 
     def update_klipper(self, **kwargs) -> None:
         self._run_update_routine("klipper", update_klipper)
@@ -235,24 +314,97 @@ class UpdateMenu(BaseMenu):
     def upgrade_system_packages(self, **kwargs) -> None:
         self._run_system_updates()
 
+    def _get_status_probes(self) -> Dict[str, Tuple[Callable, tuple]]:
+        return {
+            "klipper": (get_klipper_status, ()),
+            "moonraker": (get_moonraker_status, ()),
+            "mainsail": (get_client_status, (self.mainsail_data, True)),
+            "mainsail_config": (get_client_config_status, (self.mainsail_data,)),
+            "fluidd": (get_client_status, (self.fluidd_data, True)),
+            "fluidd_config": (get_client_config_status, (self.fluidd_data,)),
+            "klipperscreen": (get_klipperscreen_status, ()),
+            "crowsnest": (get_crowsnest_status, ()),
+        }
+
     def _fetch_update_status(self) -> None:
-        self._set_status_data("klipper", get_klipper_status)
-        self._set_status_data("moonraker", get_moonraker_status)
-        self._set_status_data("mainsail", get_client_status, self.mainsail_data, True)
-        self._set_status_data(
-            "mainsail_config", get_client_config_status, self.mainsail_data
-        )
-        self._set_status_data("fluidd", get_client_status, self.fluidd_data, True)
-        self._set_status_data(
-            "fluidd_config", get_client_config_status, self.fluidd_data
+        # updating the package lists may prompt for the sudo password, so it
+        # must run in the foreground before any of the probes is started
+        update_system_package_lists(silent=True)
+
+        runner = ProbeRunner()
+        for name, (status_fn, args) in self._get_status_probes().items():
+            runner.submit(name, self._probe_status, name, status_fn, *args)
+        runner.submit("system", self._probe_upgradable_packages)
+
+        results: Dict[str, ProbeResult] = {}
+        for name in [*self.status_data, "system"]:
+            self._show_pending_probes(runner.pending())
+            results[name] = runner.wait(name)
+        self.probe_durations = runner.get_durations()
+
+        for name, result in results.items():
+            if name == "system":
+                self._set_system_status(result)
+            else:
+                self._set_probe_result(name, result)
+
+    def _probe_status(
+        self, name: str, status_fn: Callable[..., ComponentStatus], *args
+    ) -> ComponentStatus:
+        # a prefetch that is still running warms the same caches
+        # the status function uses, so we wait for it to finish
+        RemotePrefetcher().wait(name)
+        return status_fn(*args)
+
+    def _probe_upgradable_packages(self) -> List[str]:
+        prefetched = RemotePrefetcher().consume("system")
+        if prefetched is not None and prefetched.ok:
+            if isinstance(prefetched.value, list):
+                return prefetched.value
+        return get_upgradable_packages()
+
+    def _show_pending_probes(self, pending: List[str]) -> None:
+        if self.spinner is None or not pending:
+            return
+
+        names = [self.status_data.get(n, {}).get("display_name", n) for n in pending]
+        self.spinner.set_message(
+            f"{self.loading_msg} (waiting for {', '.join(sorted(names))})"
         )
-        self._set_status_data("klipperscreen", get_klipperscreen_status)
-        self._set_status_data("crowsnest", get_crowsnest_status)
 
-        update_system_package_lists(silent=True)
-        self.packages = get_upgradable_packages()
+    def _set_system_status(self, result: ProbeResult) -> None:
+        if not result.ok:
+            self._report_failed_probe("System", result)
+            self.packages = []
+            self.package_count = None
+            return
+
+        self.packages = cast(List[str], result.value)
         self.package_count = len(self.packages)
 
+    def _set_probe_result(self, name: str, result: ProbeResult) -> None:
+        if not result.ok:
+            self._report_failed_probe(self.status_data[name]["display_name"], result)
+            self.status_data[name]["unknown"] = True
+            unknown = Color.apply("unknown", Color.YELLOW)
+            setattr(self, f"{name}_local", unknown)
+            setattr(self, f"{name}_remote", unknown)
+            return
+
+        self.status_data[name]["unknown"] = False
+        self._apply_status_data(name, cast(ComponentStatus, result.value))
+
+    def _report_failed_probe(self, display_name: str, result: ProbeResult) -> None:
+        if result.timed_out:
+            Logger.print_warn(
+                f"Status of {display_name} unknown: "
+                f"no response within {result.duration:.1f}s!"
+            )
+        else:
+            Logger.print_error(
+                f"Reading status of {display_name} failed: {result.error}"
+            )
+
     def _format_local_status(self, local_version, remote_version) -> str:
         color = Color.RED
         if not local_version:
@@ -265,8 +417,10 @@ class UpdateMenu(BaseMenu):
         return Color.apply(local_version or "-", color)
 
     def _set_status_data(self, name: str, status_fn: Callable, *args) -> None:
-        comp_status: ComponentStatus = status_fn(*args)
+        self._apply_status_data(name, status_fn(*args))
+        self.status_data[name]["unknown"] = False
 
+    def _apply_status_data(self, name: str, comp_status: ComponentStatus) -> None:
         self.status_data[name]["installed"] = True if comp_status.status == 2 else False
         self.status_data[name]["local"] = comp_status.local
         self.status_data[name]["remote"] = comp_status.remote
@@ -285,13 +439,99 @@ class UpdateMenu(BaseMenu):
         setattr(self, f"{name}_remote", remote_txt)
 
     def _check_is_installed(self, name: str) -> bool:
-        return self.status_data[name]["installed"]
+        return bool(self.status_data[name]["installed"])
 
     def _is_update_available(self, name: str) -> bool:
-        return self.status_data[name]["local"] != self.status_data[name]["remote"]
+        return bool(self.status_data[name]["local"] != self.status_data[name]["remote"])
+
+    def _get_update_fetches(self) -> Dict[str, Tuple[Callable, tuple]]:
+        fetches: Dict[str, Tuple[Callable, tuple]] = {
+            "klipper": (git_cmd_fetch, (KLIPPER_DIR,)),
+            "moonraker": (git_cmd_fetch, (MOONRAKER_DIR,)),
+            "mainsail": (prefetch_client, (self.mainsail_data,)),
+            "mainsail_config": (
+                git_cmd_fetch,
+                (self.mainsail_data.client_config.config_dir,),
+            ),
+            "fluidd": (prefetch_client, (self.fluidd_data,)),
+            "fluidd_config": (
+                git_cmd_fetch,
+                (self.fluidd_data.client_config.config_dir,),
+            ),
+            "klipperscreen": (git_cmd_fetch, (KLIPPERSCREEN_DIR,)),
+            "crowsnest": (git_cmd_fetch, (CROWSNEST_DIR,)),
+        }
+        return {
+            name: fetch
+            for name, fetch in fetches.items()
+            if not self.status_data[name].get("unknown", False)
+            and self._check_is_installed(name)
+            and self._is_update_available(name)
+        }
+
+    def _prefetch_updates(self) -> None:
+        fetches = self._get_update_fetches()
+        if not fetches:
+            return
+
+        Logger.print_status("Downloading updates ...")
+        start = time.monotonic()
+        runner = ProbeRunner(UPDATE_FETCH_WORKERS, UPDATE_FETCH_TIMEOUT)
+        self.update_fetches = runner
+        for name, (fetch_fn, args) in fetches.items():
+            runner.submit(name, fetch_fn, *args)
+
+        for name, result in runner.collect().items():
+            if not result.ok:
+                # the update routine downloads the update again on its own
+                display_name = self.status_data[name]["display_name"]
+                Logger.print_warn(f"Downloading update of {display_name} failed!")
+
+        Logger.print_ok(f"Downloads finished in {time.monotonic() - start:.1f}s")
+
+    def _wait_for_update_fetch(self, name: str) -> bool:
+        runner = self.update_fetches
+        if runner is None or not runner.has_probe(name) or runner.join(name, 0):
+            return True
+
+        # a fetch that timed out may still write to the repository or download
+        # the client, so the update must not run at the same time
+        display_name = self.status_data[name]["display_name"]
+        Logger.print_status(f"Waiting for the download of {display_name} ...")
+        return runner.join(name, UPDATE_FETCH_TIMEOUT)
+
+    def _install_update_dependencies(self) -> None:
+        # the packages are read from the upstream branches _prefetch_updates()
+        # fetched, so the apt run covers the dependencies of the new versions
+        sources: Dict[str, Callable[[], List[str]]] = {
+            "klipper": lambda: get_klipper_packages(upstream=True),
+            "moonraker": lambda: get_moonraker_packages(upstream=True),
+            "mainsail": lambda: ["nginx"],
+            "fluidd": lambda: ["nginx"],
+            "crowsnest": lambda: get_crowsnest_packages(upstream=True),
+        }
+        sources = {
+            n: s
+            for n, s in sources.items()
+            if self._check_is_installed(n) and self._is_update_available(n)
+        }
+        if not sources:
+            return
+
+        try:
+            install_planned_dependencies(sources)
+        except Exception as e:
+            # each update routine still installs its own dependencies
+            Logger.print_error(f"Error installing dependencies:\n{e}")
 
     def _run_update_routine(self, name: str, update_fn: Callable, *args) -> None:
         display_name = self.status_data[name]["display_name"]
+        if self.status_data[name].get("unknown", False):
+            # the status probe failed or timed out while loading the menu,
+            # so we give it another try before deciding what to do
+            status_fn, status_args = self._get_status_probes()[name]
+            self._set_status_data(name, status_fn, *status_args)
+
         is_installed = self._check_is_installed(name)
         is_update_available = self._is_update_available(name)
 
@@ -301,10 +541,19 @@ class UpdateMenu(BaseMenu):
         elif not is_update_available:
             Logger.print_info(f"{display_name} is already up to date! Skipped ...")
             return
+        elif not self._wait_for_update_fetch(name):
+            Logger.print_warn(f"Download of {display_name} still running! Skipped ...")
+            return
 
         update_fn(*args)
 
     def _run_system_updates(self) -> None:
+        if self.package_count is None:
+            # the probe timed out while loading the menu, so try again,
+            # the package lists were updated before the probe started
+            self.packages = get_upgradable_packages()
+            self.package_count = len(self.packages)
+
         if not self.packages:
             Logger.print_info("No system upgrades available!")
             return
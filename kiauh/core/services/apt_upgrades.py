@@ -0,0 +1,85 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from subprocess import DEVNULL, check_output
+from typing import List, Tuple
+
+from core.services.dpkg_index import DPKG_STATUS_FILE
+from core.services.status_cache import Fingerprint, get_fingerprint
+
+APT_LISTS_DIR = Path("/var/lib/apt/lists")
+
+# e.g. "Inst libc6 [2.36-9+deb12u4] (2.36-9+deb12u7 Debian:12.5/stable [arm64]) []"
+# packages that are installed for the first time have no current version
+APT_INST_RE = re.compile(r"^Inst (\S+) \[([^\]]+)\] \((\S+)(?:.*?\[([\w-]+)\]\))?")
+
+_cache: Tuple[Fingerprint, List[PackageUpgrade]] | None = None
+_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class PackageUpgrade:
+    name: str
+    current_version: str
+    candidate_version: str
+    arch: str = ""
+
+
+def parse_apt_simulation(output: str) -> List[PackageUpgrade]:
+    """
+    Parses the output of a simulated apt-get upgrade |
+    :param output: stdout of "apt-get -s dist-upgrade"
+    :return: List of the packages that would be upgraded
+    """
+    upgrades = []
+    for line in output.splitlines():
+        match = APT_INST_RE.match(line)
+        if match is None:
+            continue
+        name, current, candidate, arch = match.groups()
+        upgrades.append(PackageUpgrade(name, current, candidate, arch or ""))
+
+    return upgrades
+
+
+def get_package_upgrades() -> List[PackageUpgrade]:
+    """
+    Get all installed packages a newer version is available for. The result is
+    cached until the package lists are updated or packages are (un)installed. |
+    :return: List of the upgradable packages
+    :raises CalledProcessError: if apt-get failed
+    """
+    global _cache
+
+    fingerprint = get_fingerprint([APT_LISTS_DIR, DPKG_STATUS_FILE])
+    with _cache_lock:
+        if _cache is not None and _cache[0] == fingerprint:
+            return list(_cache[1])
+
+    # simulating a dist-upgrade doesn't require root permissions and, unlike
+    # "apt list", includes the versions and has a stable output format
+    output = check_output(
+        ["apt-get", "-s", "-q", "dist-upgrade"],
+        stderr=DEVNULL,
+        text=True,
+        encoding="utf-8",
+        env={**os.environ, "LC_ALL": "C"},
+    )
+    upgrades = parse_apt_simulation(output)
+
+    with _cache_lock:
+        _cache = (fingerprint, upgrades)
+
+    return list(upgrades)
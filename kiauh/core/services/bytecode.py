@@ -0,0 +1,123 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from subprocess import PIPE, run
+from typing import Dict, List
+
+from core.constants import KIAUH_CACHE_DIR
+from core.logger import Logger
+from core.services.requirements_fingerprint import get_interpreter_version
+from core.settings.kiauh_settings import KiauhSettings
+
+BYTECODE_STAMP_DIR = KIAUH_CACHE_DIR.joinpath("bytecode")
+
+
+def get_tree_fingerprint(tree: Path) -> str:
+    """
+    Hashes the paths, mtimes and sizes of all python files of a directory tree |
+    :param tree: the directory tree
+    :return: the hex digest
+    """
+    sha256 = hashlib.sha256()
+    for root, dirs, files in os.walk(tree):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            sha256.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+
+    return sha256.hexdigest()
+
+
+def _get_stamp_path(tree: Path) -> Path:
+    name = hashlib.sha256(tree.as_posix().encode("utf-8")).hexdigest()
+    return BYTECODE_STAMP_DIR.joinpath(f"{name}.json")
+
+
+def _read_stamp(tree: Path) -> Dict[str, str] | None:
+    try:
+        with open(_get_stamp_path(tree), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _write_stamp(tree: Path, stamp: Dict[str, str]) -> None:
+    path = _get_stamp_path(tree)
+    tmp: str | None = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(stamp, f)
+        os.replace(tmp, path)
+    except OSError:
+        # the stamps are an optimization only, so failing to write is no error
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def precompile_bytecode(venv: Path, trees: List[Path]) -> None:
+    """
+    Byte-compiles directory trees and the site-packages of a virtualenv with
+    the interpreter of the virtualenv, so the first start of a service after an
+    install or update doesn't have to write the .pyc files. All trees that
+    changed since the last run are compiled by a single compileall process using
+    one worker per CPU core, unchanged trees are skipped without spawning it. |
+    :param venv: Path of the virtualenv
+    :param trees: List of directory trees to compile, e.g. the klippy directory
+    :return: None
+    """
+    if not KiauhSettings().kiauh.precompile_bytecode:
+        return
+
+    python = venv.joinpath("bin/python")
+    version = get_interpreter_version(venv)
+    if not version:
+        return
+
+    trees = [*trees, *sorted(venv.glob("lib/python*/site-packages"))]
+    stamps = {}
+    for tree in trees:
+        if not tree.is_dir():
+            continue
+        stamp = {"python": version, "tree": get_tree_fingerprint(tree)}
+        if _read_stamp(tree) != stamp:
+            stamps[tree] = stamp
+
+    if not stamps:
+        return
+
+    Logger.print_status("Precompiling Python bytecode ...")
+    cmd = [python.as_posix(), "-m", "compileall", "-q", "-j", "0"]
+    cmd.extend(tree.as_posix() for tree in stamps)
+    result = run(cmd, stdout=PIPE, stderr=PIPE, text=True)
+    if result.returncode != 0:
+        # files that can't be compiled are compiled again on the next run, all
+        # others are skipped by compileall as their .pyc files are up to date
+        Logger.print_warn("Some Python files could not be precompiled!")
+        return
+
+    # the .pyc files don't change the fingerprint, which only covers .py files
+    for tree, stamp in stamps.items():
+        _write_stamp(tree, stamp)
+
+    Logger.print_ok("Precompiling Python bytecode successful!")
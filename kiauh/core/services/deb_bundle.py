@@ -0,0 +1,373 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from subprocess import PIPE, CalledProcessError, check_output, run
+from typing import Dict, List
+
+from core.logger import Logger
+from utils.fs_utils import copy_with_sudo, remove_with_sudo
+
+# both paths are relative to the apt root, which is "/" on a real system
+APT_ARCHIVES_DIR = Path("var/cache/apt/archives")
+APT_SOURCES_DIR = Path("etc/apt/sources.list.d")
+APT_LISTS_DIR = Path("var/lib/apt/lists")
+# the paths KIAUH checks to tell if the package lists are outdated
+APT_UPDATE_STAMPS = [Path("var/lib/apt/periodic/update-success-stamp"), APT_LISTS_DIR]
+
+DEB_BUNDLE_INDEX = "Packages"
+DEB_BUNDLE_SOURCE = "kiauh-deb-bundle.list"
+
+# mtimes of the update stamps before a bundle was imported, by source file
+_stamp_mtimes: Dict[Path, Dict[Path, int]] = {}
+
+
+def get_deb_package_name(deb: Path) -> str:
+    # apt stores downloaded packages as "<name>_<version>_<arch>.deb"
+    return deb.name.split("_", 1)[0]
+
+
+def get_deb_package_spec(deb: Path) -> str:
+    # "<name>:<arch>", so apt-get downloads the same architecture again
+    arch = deb.stem.rsplit("_", 1)[-1]
+    name = get_deb_package_name(deb)
+    return name if arch == "all" else f"{name}:{arch}"
+
+
+def get_archived_debs(apt_root: Path = Path("/")) -> List[Path]:
+    """
+    Get all packages in the apt archive cache |
+    :param apt_root: the root directory of the apt installation
+    :return: List of the .deb files in the archive cache
+    """
+    archives = apt_root.joinpath(APT_ARCHIVES_DIR)
+    if not archives.is_dir():
+        return []
+    return sorted(f for f in archives.iterdir() if f.suffix == ".deb" and f.is_file())
+
+
+def get_dependency_closure(packages: List[str]) -> List[str]:
+    """
+    Get the packages and all of their dependencies, including the ones that are
+    already installed, as a host without them needs all of them |
+    :param packages: names of the packages
+    :return: List of the package names
+    :raises CalledProcessError: if apt-cache failed
+    """
+    command = [
+        "apt-cache",
+        "depends",
+        "--recurse",
+        "--no-recommends",
+        "--no-suggests",
+        "--no-conflicts",
+        "--no-breaks",
+        "--no-replaces",
+        "--no-enhances",
+        *packages,
+    ]
+    output = check_output(command, text=True, stderr=PIPE)
+
+    # every package is listed unindented followed by its indented dependencies,
+    # virtual packages are listed as "<name>" and can't be downloaded
+    names = set()
+    for line in output.splitlines():
+        if line and not line[0].isspace() and not line.startswith("<"):
+            names.add(line.strip())
+
+    return sorted(names)
+
+
+def get_deb_download_names(packages: List[str]) -> Dict[str, int]:
+    """
+    Get the file names and sizes of the candidate versions of the packages |
+    :param packages: names of the packages
+    :return: Dict of the .deb file names and their sizes
+    :raises CalledProcessError: if apt-get failed
+    """
+    command = ["apt-get", "download", "--print-uris", *packages]
+    output = check_output(command, text=True, stderr=PIPE)
+
+    # each line is of the form "'<uri>' <file name> <size> <hash>"
+    debs = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) >= 3 and fields[1].endswith(".deb"):
+            debs[fields[1]] = int(fields[2])
+
+    return debs
+
+
+def export_deb_bundle(
+    bundle_dir: Path,
+    packages: List[str],
+    apt_root: Path = Path("/"),
+) -> List[Path]:
+    """
+    Adds packages and all of their dependencies to a bundle directory and
+    updates the package index of the bundle. Packages are taken from the apt
+    archive cache if possible and downloaded otherwise, packages that are
+    already part of the bundle are not added again. |
+    :param bundle_dir: the bundle directory, created if it doesn't exist
+    :param packages: names of the packages to export
+    :param apt_root: the root directory of the apt installation
+    :return: List of the .deb files that were added to the bundle
+    :raises CalledProcessError: if apt failed to resolve or download a package
+    """
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    archived = {deb.name: deb for deb in get_archived_debs(apt_root)}
+
+    exported = []
+    missing = []
+    debs = get_deb_download_names(get_dependency_closure(packages))
+    for name, size in debs.items():
+        target = bundle_dir.joinpath(name)
+        if target.is_file() and target.stat().st_size == size:
+            continue
+
+        deb = archived.get(name)
+        if deb is not None and deb.stat().st_size == size:
+            shutil.copyfile(deb, target)
+        else:
+            missing.append(get_deb_package_spec(target))
+        exported.append(target)
+
+    if missing:
+        command = ["apt-get", "download", *missing]
+        run(command, cwd=bundle_dir, stdout=PIPE, stderr=PIPE, check=True)
+
+    if exported or not bundle_dir.joinpath(DEB_BUNDLE_INDEX).is_file():
+        write_deb_bundle_index(bundle_dir)
+
+    return exported
+
+
+def read_deb_bundle_index(bundle_dir: Path) -> Dict[str, str]:
+    """
+    Reads the package index of a bundle |
+    :param bundle_dir: the bundle directory
+    :return: Dict of the file names and their index stanzas
+    """
+    index = bundle_dir.joinpath(DEB_BUNDLE_INDEX)
+    if not index.is_file():
+        return {}
+
+    stanzas = {}
+    for stanza in index.read_text(encoding="utf-8").split("\n\n"):
+        for line in stanza.splitlines():
+            if line.startswith("Filename:"):
+                filename = Path(line.partition(":")[2].strip()).name
+                stanzas[filename] = stanza.strip("\n")
+                break
+
+    return stanzas
+
+
+def write_deb_bundle_index(bundle_dir: Path) -> int:
+    """
+    Writes the package index apt needs to use a bundle as a flat repository.
+    The stanzas of packages that are already indexed are kept, only new
+    packages are inspected with dpkg-deb. |
+    :param bundle_dir: the bundle directory
+    :return: the number of indexed packages
+    """
+    indexed = read_deb_bundle_index(bundle_dir)
+    stanzas = []
+    for deb in sorted(bundle_dir.glob("*.deb")):
+        size = deb.stat().st_size
+        stanza = indexed.get(deb.name)
+        if stanza is None or f"\nSize: {size}\n" not in f"{stanza}\n":
+            stanza = _create_index_stanza(deb, size)
+        stanzas.append(stanza)
+
+    # write to a temporary file first, so apt never reads a partial index
+    fd, tmp = tempfile.mkstemp(dir=bundle_dir, prefix=f".{DEB_BUNDLE_INDEX}.")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write("".join(f"{s}\n\n" for s in stanzas))
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, bundle_dir.joinpath(DEB_BUNDLE_INDEX))
+
+    return len(stanzas)
+
+
+def _create_index_stanza(deb: Path, size: int) -> str:
+    control = check_output(["dpkg-deb", "--field", deb.as_posix()], text=True)
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+    with open(deb, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            md5.update(chunk)
+            sha256.update(chunk)
+
+    return "\n".join(
+        [
+            control.strip("\n"),
+            f"Filename: ./{deb.name}",
+            f"Size: {size}",
+            f"MD5sum: {md5.hexdigest()}",
+            f"SHA256: {sha256.hexdigest()}",
+        ]
+    )
+
+
+def get_deb_bundle_source(bundle_dir: Path) -> str:
+    # the bundle is a local, unsigned flat repository
+    return f"deb [trusted=yes] file:{bundle_dir.resolve().as_posix()} ./\n"
+
+
+def import_deb_bundle(bundle_dir: Path, apt_root: Path = Path("/")) -> Path:
+    """
+    Adds a bundle as a local apt source. If the sources directory of the apt
+    root is not writable, the source file is installed with sudo. |
+    :param bundle_dir: the bundle directory
+    :param apt_root: the root directory of the apt installation
+    :return: Path of the written source file
+    :raises FileNotFoundError: if the bundle has no package index
+    :raises CalledProcessError: if the source file could not be installed
+    """
+    if not bundle_dir.joinpath(DEB_BUNDLE_INDEX).is_file():
+        raise FileNotFoundError(f"No package index found in {bundle_dir}")
+
+    sources_dir = apt_root.joinpath(APT_SOURCES_DIR)
+    source_file = sources_dir.joinpath(DEB_BUNDLE_SOURCE)
+    content = get_deb_bundle_source(bundle_dir)
+    if source_file.is_file() and source_file.read_text() == content:
+        return source_file
+
+    if os.access(sources_dir, os.W_OK):
+        source_file.write_text(content)
+        return source_file
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_file = Path(tmp).joinpath(DEB_BUNDLE_SOURCE)
+        tmp_file.write_text(content)
+        tmp_file.chmod(0o644)
+        copy_with_sudo(tmp_file, source_file)
+
+    return source_file
+
+
+def update_deb_bundle_lists(source_file: Path) -> None:
+    """
+    Updates the package lists of the bundle source only. This neither requires
+    network access nor waits for the remote sources. |
+    :param source_file: the source file written by import_deb_bundle()
+    :return: None
+    :raises CalledProcessError: if apt-get failed
+    """
+    command = [
+        "sudo",
+        "apt-get",
+        "update",
+        "-o",
+        f"Dir::Etc::SourceList={source_file.as_posix()}",
+        "-o",
+        "Dir::Etc::SourceParts=-",
+        "-o",
+        "APT::Get::List-Cleanup=0",
+    ]
+    run(command, stderr=PIPE, check=True)
+
+
+def get_deb_bundle_lists(bundle_dir: Path, apt_root: Path = Path("/")) -> List[Path]:
+    """
+    Get the package lists apt created for the source of a bundle |
+    :param bundle_dir: the bundle directory
+    :param apt_root: the root directory of the apt installation
+    :return: List of the list files
+    """
+    # apt names the lists after the uri of the source with "/" replaced
+    # by "_", e.g. "_home_pi_kiauh-deb-bundle_._Packages.lz4"
+    prefix = f"{bundle_dir.resolve().as_posix()}/.".replace("/", "_")
+    return sorted(apt_root.joinpath(APT_LISTS_DIR).glob(f"{prefix}_*"))
+
+
+def use_deb_bundle(bundle_dir: Path, apt_root: Path = Path("/")) -> Path | None:
+    """
+    Imports a bundle and makes its packages available to apt. The bundle must be
+    released with release_deb_bundle() once the packages are installed. |
+    :param bundle_dir: the bundle directory
+    :param apt_root: the root directory of the apt installation
+    :return: Path of the source file or None if the bundle can't be used
+    """
+    Logger.print_status(f"Importing package bundle {bundle_dir} ...")
+    source_file: Path | None = None
+    try:
+        source_file = import_deb_bundle(bundle_dir, apt_root)
+        _stamp_mtimes[source_file] = _get_stamp_mtimes(apt_root)
+        update_deb_bundle_lists(source_file)
+    except FileNotFoundError as e:
+        Logger.print_warn(f"Unable to import package bundle: {e}")
+        return None
+    except CalledProcessError as e:
+        Logger.print_error(f"Error importing package bundle:\n{e.stderr.decode()}")
+        if source_file is not None:
+            release_deb_bundle(source_file, bundle_dir, apt_root)
+        return None
+
+    Logger.print_ok("Package bundle imported!")
+    return source_file
+
+
+def release_deb_bundle(
+    source_file: Path, bundle_dir: Path, apt_root: Path = Path("/")
+) -> None:
+    """
+    Removes the source and the package lists of a bundle again. The bundle is an
+    unsigned repository that is often located on removable media, so it must not
+    stay around for the regular package list updates of the system. |
+    :param source_file: the source file written by import_deb_bundle()
+    :param bundle_dir: the bundle directory
+    :param apt_root: the root directory of the apt installation
+    :return: None
+    """
+    files = [source_file, *get_deb_bundle_lists(bundle_dir, apt_root)]
+    writable = [f for f in files if os.access(f.parent, os.W_OK)]
+    for f in writable:
+        f.unlink(missing_ok=True)
+    others = [f for f in files if f not in writable and f.exists()]
+    if source_file in others:
+        remove_with_sudo(source_file)
+
+    # the lists are removed by their exact paths, so neither this nor the
+    # privileged worker can touch the package lists of the other sources
+    lists = [f.as_posix() for f in others if f != source_file]
+    if lists:
+        result = run(["sudo", "rm", "-f", "--", *lists], stderr=PIPE, text=True)
+        if result.returncode != 0:
+            Logger.print_warn(f"Unable to remove package bundle lists: {result.stderr}")
+
+    # updating the bundle lists did not update the regular package lists
+    _restore_stamp_mtimes(_stamp_mtimes.pop(source_file, {}))
+
+
+def _get_stamp_mtimes(apt_root: Path) -> Dict[Path, int]:
+    mtimes = {}
+    for stamp in [apt_root.joinpath(p) for p in APT_UPDATE_STAMPS]:
+        try:
+            mtimes[stamp] = os.stat(stamp).st_mtime_ns
+        except OSError:
+            continue
+    return mtimes
+
+
+def _restore_stamp_mtimes(mtimes: Dict[Path, int]) -> None:
+    for stamp, mtime in mtimes.items():
+        try:
+            os.utime(stamp, ns=(mtime, mtime))
+        except PermissionError:
+            timestamp = f"@{mtime / 1e9:.9f}"
+            run(["sudo", "touch", "-c", "-d", timestamp, stamp.as_posix()], stderr=PIPE)
+        except OSError:
+            continue
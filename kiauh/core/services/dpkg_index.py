@@ -0,0 +1,177 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+DPKG_STATUS_FILE = Path("/var/lib/dpkg/status")
+
+
+@dataclass
+class DpkgPackage:
+    name: str
+    arch: str = ""
+    version: str = ""
+    status: str = ""
+    provides: List[str] = field(default_factory=list)
+
+    @property
+    def is_installed(self) -> bool:
+        # the status field consists of "<want> <error flag> <status>"
+        return self.status.split()[-1:] == ["installed"]
+
+
+def parse_dpkg_status(content: str) -> Iterator[DpkgPackage]:
+    """
+    Parses the content of the dpkg status file. Only the fields KIAUH needs are
+    read, continuation lines of multiline fields are skipped. |
+    :param content: the content of the dpkg status file
+    :return: Iterator of the packages in the file
+    """
+    for stanza in content.split("\n\n"):
+        fields: Dict[str, str] = {}
+        for line in stanza.splitlines():
+            if not line or line[0] in " \t":
+                continue
+            key, _, value = line.partition(":")
+            fields[key] = value.strip()
+
+        if "Package" not in fields:
+            continue
+
+        provides = []
+        for entry in fields.get("Provides", "").split(","):
+            # e.g. "python3-foo (= 1.0)" or "libbar:any"
+            name = entry.split("(")[0].strip().split(":")[0]
+            if name:
+                provides.append(name)
+
+        yield DpkgPackage(
+            name=fields["Package"],
+            arch=fields.get("Architecture", ""),
+            version=fields.get("Version", ""),
+            status=fields.get("Status", ""),
+            provides=provides,
+        )
+
+
+# noinspection PyMethodMayBeStatic
+class DpkgIndex:
+    """
+    Index of the packages in the dpkg status file. The file is parsed once and
+    only parsed again after its mtime or size changed, so any number of packages
+    can be checked without spawning a dpkg-query process per package.
+    """
+
+    _instance = None
+
+    def __new__(cls) -> "DpkgIndex":
+        if cls._instance is None:
+            cls._instance = super(DpkgIndex, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, status_file: Path = DPKG_STATUS_FILE) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        self._initialized = True
+        self.status_file = status_file
+        self._lock = threading.Lock()
+        self._key: Tuple[int, int] | None = None
+        self._packages: Dict[str, List[DpkgPackage]] = {}
+        self._providers: Dict[str, List[DpkgPackage]] = {}
+
+    @property
+    def is_available(self) -> bool:
+        return self.status_file.is_file()
+
+    def get_packages(self, name: str) -> List[DpkgPackage]:
+        """
+        Get all installed or known instances of a package. Multiarch packages can
+        be queried as "<name>:<arch>", "<name>:any" matches every architecture. |
+        :param name: the package name
+        :return: List of packages, one per architecture
+        """
+        name, _, arch = name.partition(":")
+        with self._lock:
+            self._refresh()
+            packages = self._packages.get(name, [])
+
+        if arch and arch != "any":
+            packages = [p for p in packages if p.arch in (arch, "all")]
+
+        return list(packages)
+
+    def get_version(self, name: str) -> str | None:
+        """
+        Get the installed version of a package |
+        :param name: the package name, optionally with an architecture
+        :return: the version or None if the package is not installed
+        """
+        for package in self.get_packages(name):
+            if package.is_installed:
+                return package.version
+        return None
+
+    def is_installed(self, name: str) -> bool:
+        """
+        Check if a package is installed. A virtual package counts as installed
+        if any installed package provides it. |
+        :param name: the package name, optionally with an architecture
+        :return: True if the package is installed, otherwise False
+        """
+        if any(p.is_installed for p in self.get_packages(name)):
+            return True
+
+        name = name.partition(":")[0]
+        with self._lock:
+            self._refresh()
+            return any(p.is_installed for p in self._providers.get(name, []))
+
+    def get_missing(self, names: List[str]) -> List[str]:
+        """
+        Get all packages of a list that are not installed |
+        :param names: List of package names
+        :return: List of the package names that are not installed
+        """
+        return [name for name in names if not self.is_installed(name)]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._key = None
+
+    def _refresh(self) -> None:
+        try:
+            stat = os.stat(self.status_file)
+            key = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            key = None
+
+        if key is not None and key == self._key:
+            return
+
+        packages: Dict[str, List[DpkgPackage]] = {}
+        providers: Dict[str, List[DpkgPackage]] = {}
+        try:
+            with open(self.status_file, "r", encoding="utf-8", errors="replace") as f:
+                content = f.read()
+        except OSError:
+            content = ""
+
+        for package in parse_dpkg_status(content):
+            packages.setdefault(package.name, []).append(package)
+            for provided in package.provides:
+                providers.setdefault(provided, []).append(package)
+
+        self._packages = packages
+        self._providers = providers
+        self._key = key
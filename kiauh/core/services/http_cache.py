@@ -0,0 +1,201 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict
+from urllib.error import HTTPError, URLError
+
+from core.constants import KIAUH_CACHE_DIR
+
+HTTP_CACHE_DIR = KIAUH_CACHE_DIR.joinpath("http")
+DEFAULT_HTTP_CACHE_TTL = 600.0
+DEFAULT_HTTP_TIMEOUT = 10.0
+
+
+class HttpCacheError(Exception):
+    pass
+
+
+# noinspection PyMethodMayBeStatic
+class HttpCache:
+    """
+    On-disk cache for JSON responses of HTTP APIs like the one of GitHub. Entries
+    younger than the TTL are served without a request. Older entries are revalidated
+    with If-None-Match, so an unchanged resource only costs a 304 response, which
+    does not count against the GitHub rate limit. If the server can't be reached
+    or the rate limit is exhausted, the last known response is served instead.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = HTTP_CACHE_DIR,
+        ttl: float = DEFAULT_HTTP_CACHE_TTL,
+        timeout: float = DEFAULT_HTTP_TIMEOUT,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+        self.rate_limit: Dict[str, int] | None = None
+
+    def get_json(self, url: str) -> Any:
+        """
+        Get the decoded JSON response of the given url |
+        :param url: the url to request
+        :return: the decoded JSON content
+        :raises HttpCacheError: if the url could neither be fetched nor served from cache
+        """
+        # concurrent lookups of the same url share a single request
+        with self._get_url_lock(url):
+            entry = self._read_entry(url)
+            now = time.time()
+
+            if entry is not None and now - entry["fetched"] < self.ttl:
+                return json.loads(entry["body"])
+
+            if self._is_rate_limited(now):
+                if entry is not None:
+                    return json.loads(entry["body"])
+                raise HttpCacheError(f"GitHub rate limit exceeded, skipping '{url}'")
+
+            try:
+                entry = self._fetch(url, entry)
+            except (HTTPError, URLError, OSError) as e:
+                if entry is not None:
+                    return json.loads(entry["body"])
+                raise HttpCacheError(f"Error requesting '{url}': {e}") from e
+
+            return json.loads(entry["body"])
+
+    def invalidate(self, url: str | None = None) -> None:
+        """
+        Removes a single entry or, if no url is provided, all entries from the cache
+        :param url: url of the entry to remove
+        :return: None
+        """
+        paths = (
+            [self._get_entry_path(url)]
+            if url is not None
+            else self.cache_dir.glob("*.json")
+        )
+        for path in paths:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _fetch(self, url: str, entry: Dict[str, Any] | None) -> Dict[str, Any]:
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "kiauh",
+        }
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                self._update_rate_limit(response.headers)
+                body = response.read().decode("utf-8")
+                # make sure only valid responses end up in the cache
+                json.loads(body)
+                entry = {
+                    "url": url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "body": body,
+                }
+        except HTTPError as e:
+            self._update_rate_limit(e.headers)
+            if e.code != 304 or entry is None:
+                raise
+
+        entry["fetched"] = time.time()
+        self._write_entry(url, entry)
+        return entry
+
+    def _is_rate_limited(self, now: float) -> bool:
+        if self.rate_limit is None:
+            self.rate_limit = self._read_json(self._get_rate_limit_path())
+        if not self.rate_limit:
+            return False
+
+        return self.rate_limit["remaining"] <= 0 and now < self.rate_limit["reset"]
+
+    def _update_rate_limit(self, headers) -> None:
+        if headers is None:
+            return
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+
+        try:
+            rate_limit = {"remaining": int(remaining), "reset": int(reset)}
+        except ValueError:
+            return
+
+        with self._lock:
+            self.rate_limit = rate_limit
+        self._write_json(self._get_rate_limit_path(), rate_limit)
+
+    def _get_url_lock(self, url: str) -> threading.Lock:
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _get_entry_path(self, url: str) -> Path:
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir.joinpath(f"{name}.json")
+
+    def _get_rate_limit_path(self) -> Path:
+        return self.cache_dir.joinpath("rate_limit")
+
+    def _read_entry(self, url: str) -> Dict[str, Any] | None:
+        entry = self._read_json(self._get_entry_path(url))
+        if not entry or entry.get("url") != url or "body" not in entry:
+            return None
+        return entry
+
+    def _write_entry(self, url: str, entry: Dict[str, Any]) -> None:
+        self._write_json(self._get_entry_path(url), entry)
+
+    def _read_json(self, path: Path) -> Dict[str, Any] | None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _write_json(self, path: Path, data: Dict[str, Any]) -> None:
+        # write to a temporary file first and move it in place afterward, so
+        # concurrent readers never see a partially written cache file
+        tmp: str | None = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except OSError:
+            # the cache is an optimization only, so failing to write is no error
+            if tmp is not None and os.path.exists(tmp):
+                os.unlink(tmp)
@@ -0,0 +1,73 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict
+
+from core.services.http_cache import HttpCache, HttpCacheError
+from core.services.requirements_fingerprint import get_installed_distributions
+from core.services.wheelhouse import normalize_dist_name
+
+PYPI_PIP_URL = "https://pypi.org/pypi/pip/json"
+# the latest pip version is looked up at most once an hour
+PIP_VERSION_CACHE_TTL = 3600.0
+
+_http_cache = HttpCache(ttl=PIP_VERSION_CACHE_TTL)
+_lock = threading.Lock()
+# pip versions of the virtualenvs that were updated in this session
+_updated: Dict[Path, str] = {}
+
+
+def get_latest_pip_version() -> str | None:
+    """
+    Get the latest version of pip on PyPI. The response is cached on disk |
+    :return: the version or None if it could not be determined
+    """
+    try:
+        return str(_http_cache.get_json(PYPI_PIP_URL)["info"]["version"])
+    except (HttpCacheError, KeyError, TypeError):
+        return None
+
+
+def get_installed_version(venv: Path, name: str) -> str | None:
+    """
+    Get the version of a package installed in a virtualenv without running pip |
+    :param venv: Path of the virtualenv
+    :param name: the name of the package
+    :return: the version or None if the package is not installed
+    """
+    name = normalize_dist_name(name)
+    for dist in get_installed_distributions(venv):
+        if not dist.endswith(".dist-info"):
+            continue
+        dist_name, _, version = dist[: -len(".dist-info")].partition("-")
+        if normalize_dist_name(dist_name) == name:
+            return version
+    return None
+
+
+def is_pip_updated(venv: Path) -> bool:
+    """
+    Check if pip was updated in a virtualenv during this session already. A
+    virtualenv that was recreated since has a different pip and needs an update. |
+    :param venv: Path of the virtualenv
+    :return: True if pip does not need to be updated again
+    """
+    version = get_installed_version(venv, "pip")
+    with _lock:
+        return version is not None and _updated.get(venv) == version
+
+
+def set_pip_updated(venv: Path) -> None:
+    version = get_installed_version(venv, "pip")
+    with _lock:
+        if version is not None:
+            _updated[venv] = version
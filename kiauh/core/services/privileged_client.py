@@ -0,0 +1,221 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import atexit
+import json
+import sys
+import threading
+from pathlib import Path
+from subprocess import PIPE, CalledProcessError, Popen
+from typing import Any, Callable, Dict, List
+
+from core.logger import Logger
+from core.services.privileged_worker import PrivilegedWorker, SystemctlRunner
+
+WORKER_SCRIPT = Path(__file__).parent.joinpath("privileged_worker.py")
+
+
+class PrivilegedWorkerError(Exception):
+    pass
+
+
+# noinspection PyMethodMayBeStatic
+class PrivilegedClient:
+    """
+    Talks to a single privileged worker process that is started with sudo once
+    per session. Helpers that need root permissions send their operations to the
+    worker in batches instead of spawning a sudo process per operation. If the
+    worker is not running, get_privileged_client() returns None and the helpers
+    fall back to calling sudo themselves.
+    """
+
+    _instance = None
+
+    def __new__(cls) -> "PrivilegedClient":
+        if cls._instance is None:
+            cls._instance = super(PrivilegedClient, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._request_id = 0
+        self._process: Popen | None = None
+        self._send: Callable[[Dict[str, Any]], Dict[str, Any]] | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._send is not None
+
+    def start(self) -> bool:
+        """
+        Start the worker process. Sudo may ask for the password once. |
+        :return: True if the worker is running, False otherwise
+        """
+        with self._lock:
+            if self._send is not None:
+                return True
+
+            Logger.print_status("Starting privileged worker ...")
+            try:
+                cmd = ["sudo", sys.executable, WORKER_SCRIPT.as_posix()]
+                self._process = Popen(cmd, stdin=PIPE, stdout=PIPE, text=True)
+                self._send = self._send_to_process
+                self._send({"id": 0, "ops": []})
+            except (OSError, PrivilegedWorkerError) as e:
+                Logger.print_error(f"Unable to start privileged worker: {e}")
+                self._terminate()
+                return False
+
+        atexit.register(self.stop)
+        Logger.print_ok("Privileged worker started!")
+        return True
+
+    def attach(
+        self,
+        allowed_roots: List[str],
+        systemctl_runner: SystemctlRunner | None = None,
+    ) -> PrivilegedWorker:
+        """
+        Use an in-process worker instead of a root process, e.g. for testing the
+        helpers without root permissions. Requests and responses are still
+        serialized, so the double behaves like the real worker. |
+        :param allowed_roots: directories the worker is allowed to modify
+        :param systemctl_runner: function that is called with the systemctl args
+        :return: the attached worker
+        """
+        if systemctl_runner is None:
+            worker = PrivilegedWorker(allowed_roots)
+        else:
+            worker = PrivilegedWorker(allowed_roots, systemctl_runner)
+
+        def send(request: Dict[str, Any]) -> Dict[str, Any]:
+            response = worker.handle(json.loads(json.dumps(request)))
+            return _parse_response(json.dumps(response))
+
+        with self._lock:
+            self._terminate()
+            self._send = send
+
+        return worker
+
+    def execute(self, ops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute a batch of operations in the worker |
+        :param ops: List of operations, see privileged_worker.py
+        :return: List of results in the order of the operations
+        :raises PrivilegedWorkerError: if the worker is not running or died
+        """
+        with self._lock:
+            if self._send is None:
+                raise PrivilegedWorkerError("Privileged worker is not running")
+
+            self._request_id += 1
+            try:
+                response = self._send({"id": self._request_id, "ops": ops})
+            except PrivilegedWorkerError:
+                self._terminate()
+                raise
+
+        results = response.get("results")
+        if response.get("id") != self._request_id or not isinstance(results, list):
+            raise PrivilegedWorkerError(response.get("error", "Invalid response"))
+        if not all(isinstance(result, dict) for result in results):
+            raise PrivilegedWorkerError("Invalid response")
+
+        return results
+
+    def stop(self) -> None:
+        with self._lock:
+            self._terminate()
+
+    def _send_to_process(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        process = self._process
+        if process is None or process.stdin is None or process.stdout is None:
+            raise PrivilegedWorkerError("Privileged worker is not running")
+
+        try:
+            process.stdin.write(json.dumps(request) + "\n")
+            process.stdin.flush()
+            line = process.stdout.readline()
+        except OSError as e:
+            raise PrivilegedWorkerError(f"Privileged worker died: {e}")
+
+        if not line:
+            raise PrivilegedWorkerError("Privileged worker exited unexpectedly")
+
+        return _parse_response(line)
+
+    def _terminate(self) -> None:
+        self._send = None
+        process, self._process = self._process, None
+        if process is None:
+            return
+
+        try:
+            if process.stdin is not None:
+                # the worker exits once its stdin is closed
+                process.stdin.close()
+            process.wait(timeout=5)
+        except Exception:
+            process.kill()
+
+
+def get_privileged_client() -> PrivilegedClient | None:
+    """
+    Get the privileged client if a worker is running |
+    :return: PrivilegedClient or None if the helpers should use sudo directly
+    """
+    client = PrivilegedClient()
+    return client if client.is_running else None
+
+
+def run_privileged(ops: List[Dict[str, Any]]) -> List[Dict[str, Any]] | None:
+    """
+    Execute a batch of operations in the privileged worker if one is running |
+    :param ops: List of operations, see privileged_worker.py
+    :return: List of results or None if the caller has to fall back to sudo
+    """
+    client = get_privileged_client()
+    if client is None:
+        return None
+
+    try:
+        return client.execute(ops)
+    except PrivilegedWorkerError as e:
+        Logger.print_warn(f"Privileged worker failed, falling back to sudo: {e}")
+        return None
+
+
+def check_privileged_result(result: Dict[str, Any], cmd: List[str]) -> Any:
+    """
+    Get the value of an operation result, failed operations raise the same
+    error the equivalent sudo command would have raised |
+    :param result: a single result returned by run_privileged()
+    :param cmd: the equivalent command, used for the error
+    :return: the value of the result
+    :raises CalledProcessError: if the operation failed
+    """
+    if not result.get("ok"):
+        error = str(result.get("error", ""))
+        raise CalledProcessError(1, cmd, stderr=error.encode())
+    return result.get("value")
+
+
+def _parse_response(line: str) -> Dict[str, Any]:
+    try:
+        response = json.loads(line)
+    except ValueError as e:
+        raise PrivilegedWorkerError(f"Invalid response: {e}")
+    if not isinstance(response, dict):
+        raise PrivilegedWorkerError(f"Invalid response: {line.strip()}")
+    return response
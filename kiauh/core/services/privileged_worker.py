@@ -0,0 +1,217 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+
+# This module is executed as a standalone script with root privileges, so it must
+# only depend on the standard library. It reads one JSON request per line from
+# stdin and writes one JSON response per line to stdout. A request holds a batch
+# of operations, the response holds one result per operation in the same order:
+#
+#   {"id": 1, "ops": [{"op": "exists", "path": "/etc/nginx/sites-available/x"}]}
+#   {"id": 1, "results": [{"ok": true, "value": false}]}
+
+from __future__ import annotations
+
+import json
+import os
+import pwd
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List
+
+# directories the worker is allowed to modify, the home directory of the user
+# that invoked sudo and the temp directory are added at runtime
+ALLOWED_ROOTS: List[str] = [
+    "/etc/apt/sources.list.d",
+    "/etc/systemd/system",
+    "/etc/nginx",
+    "/etc/logrotate.d",
+    "/usr/local/bin",
+    "/var/log",
+]
+
+SYSTEMCTL_ACTIONS: List[str] = [
+    "start",
+    "stop",
+    "restart",
+    "reload",
+    "enable",
+    "disable",
+    "mask",
+    "unmask",
+    "daemon-reload",
+    "reset-failed",
+]
+SYSTEMCTL_FLAGS: List[str] = ["--no-block"]
+UNIT_NAME_RE = re.compile(r"^[\w@.:-]+$")
+
+SystemctlRunner = Callable[[List[str]], subprocess.CompletedProcess]
+
+
+class OperationError(Exception):
+    pass
+
+
+def run_systemctl(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["systemctl", *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+
+
+class PrivilegedWorker:
+    """
+    Executes a restricted set of file and systemctl operations. Paths must be
+    absolute and located below one of the allowed root directories.
+    """
+
+    def __init__(
+        self,
+        allowed_roots: List[str],
+        systemctl_runner: SystemctlRunner = run_systemctl,
+    ) -> None:
+        self.allowed_roots = [os.path.realpath(r) for r in allowed_roots]
+        self.systemctl_runner = systemctl_runner
+        self.operations: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "exists": self._op_exists,
+            "remove": self._op_remove,
+            "write": self._op_write,
+            "copy": self._op_copy,
+            "move": self._op_move,
+            "symlink": self._op_symlink,
+            "systemctl": self._op_systemctl,
+        }
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute all operations of a request. A failing operation does not
+        prevent the following operations of the same batch from running. |
+        :param request: the decoded request
+        :return: the response to encode
+        """
+        results = []
+        for op in request.get("ops", []):
+            try:
+                handler = self.operations.get(op.get("op"))
+                if handler is None:
+                    raise OperationError(f"Unknown operation '{op.get('op')}'")
+                results.append({"ok": True, "value": handler(op)})
+            except (OperationError, OSError, KeyError, TypeError) as e:
+                results.append({"ok": False, "error": str(e)})
+
+        return {"id": request.get("id"), "results": results}
+
+    def serve(self, stdin=sys.stdin, stdout=sys.stdout) -> None:
+        for line in stdin:
+            if not line.strip():
+                continue
+            try:
+                response = self.handle(json.loads(line))
+            except ValueError as e:
+                response = {"id": None, "error": f"Invalid request: {e}"}
+            stdout.write(json.dumps(response) + "\n")
+            stdout.flush()
+
+    def _check_path(self, path: str) -> str:
+        if not isinstance(path, str) or not os.path.isabs(path):
+            raise OperationError(f"Path '{path}' must be absolute")
+
+        # resolve the parent only, so that operations on symlinks
+        # affect the link itself and not the file it points to
+        parent = os.path.realpath(os.path.dirname(os.path.normpath(path)))
+        resolved = os.path.join(parent, os.path.basename(os.path.normpath(path)))
+        for root in self.allowed_roots:
+            if resolved != root and resolved.startswith(root.rstrip("/") + "/"):
+                return resolved
+
+        raise OperationError(f"Path '{path}' is not allowed")
+
+    def _op_exists(self, op: Dict[str, Any]) -> bool:
+        return os.path.lexists(self._check_path(op["path"]))
+
+    def _op_remove(self, op: Dict[str, Any]) -> bool:
+        path = self._check_path(op["path"])
+        if not os.path.lexists(path):
+            return False
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+        return True
+
+    def _op_write(self, op: Dict[str, Any]) -> None:
+        path = self._check_path(op["path"])
+        mode = int(op.get("mode", 0o644))
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".kiauh-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(op["content"])
+            os.chmod(tmp, mode)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _op_copy(self, op: Dict[str, Any]) -> None:
+        # reading a source outside the allowed roots is fine
+        src = op["src"]
+        shutil.copy(src, self._check_path(op["dst"]))
+
+    def _op_move(self, op: Dict[str, Any]) -> None:
+        shutil.move(self._check_path(op["src"]), self._check_path(op["dst"]))
+
+    def _op_symlink(self, op: Dict[str, Any]) -> None:
+        src, dst = op["src"], self._check_path(op["dst"])
+        if os.path.lexists(dst) and not os.path.isdir(dst):
+            os.unlink(dst)
+        elif os.path.isdir(dst) and not os.path.islink(dst):
+            # same as "ln -sf" with an existing directory as target
+            dst = os.path.join(dst, os.path.basename(src))
+            if os.path.lexists(dst):
+                os.unlink(dst)
+        os.symlink(src, dst)
+
+    def _op_systemctl(self, op: Dict[str, Any]) -> Dict[str, Any]:
+        args: List[str] = list(op["args"])
+        if not args or args[0] not in SYSTEMCTL_ACTIONS:
+            raise OperationError(f"systemctl action not allowed: {args[:1]}")
+        for arg in args[1:]:
+            if arg not in SYSTEMCTL_FLAGS and not UNIT_NAME_RE.match(arg):
+                raise OperationError(f"Invalid systemctl argument '{arg}'")
+
+        result = self.systemctl_runner(args)
+        return {
+            "returncode": result.returncode,
+            "stdout": result.stdout or "",
+            "stderr": result.stderr or "",
+        }
+
+
+def get_default_roots() -> List[str]:
+    roots = list(ALLOWED_ROOTS)
+    roots.append(tempfile.gettempdir())
+
+    # sudo tells us which user invoked it, the worker may
+    # modify files in the home directory of that user only
+    sudo_uid = os.environ.get("SUDO_UID")
+    if sudo_uid is not None:
+        roots.append(pwd.getpwuid(int(sudo_uid)).pw_dir)
+
+    return roots
+
+
+def main() -> None:
+    worker = PrivilegedWorker(get_default_roots())
+    worker.serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+DEFAULT_PROBE_WORKERS = 4
+DEFAULT_PROBE_TIMEOUT = 20.0
+
+
+@dataclass
+class ProbeResult:
+    name: str
+    value: object = None
+    error: Exception | None = None
+    duration: float | None = None
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.timed_out and self.error is None
+
+
+@dataclass
+class _Probe:
+    fn: Callable
+    args: tuple
+    timeout: float
+    result: ProbeResult
+    started: float | None = None
+    done: bool = False
+    slot_released: bool = field(default=False, repr=False)
+
+
+# noinspection PyMethodMayBeStatic
+class ProbeRunner:
+    """
+    Runs status probes concurrently in daemon threads. At most max_workers probes
+    run at the same time. A probe that does not finish within its timeout, counted
+    from the moment it started, is reported as timed out and gives up its worker
+    slot, so it never blocks the caller or the probes queued behind it.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_PROBE_WORKERS,
+        timeout: float = DEFAULT_PROBE_TIMEOUT,
+    ) -> None:
+        self.timeout = timeout
+        self._slots = threading.Semaphore(max_workers)
+        self._cond = threading.Condition()
+        self._probes: Dict[str, _Probe] = {}
+
+    def submit(
+        self, name: str, fn: Callable, *args, timeout: float | None = None
+    ) -> None:
+        """
+        Start a probe in the background |
+        :param name: Unique name of the probe
+        :param fn: Function to call
+        :param args: Arguments passed to fn
+        :param timeout: Optional timeout overriding the default of the runner
+        :return: None
+        """
+        probe = _Probe(
+            fn=fn,
+            args=args,
+            timeout=timeout if timeout is not None else self.timeout,
+            result=ProbeResult(name=name),
+        )
+        with self._cond:
+            if name in self._probes:
+                raise ValueError(f"Probe '{name}' was already submitted!")
+            self._probes[name] = probe
+
+        thread = threading.Thread(target=self._run, args=(probe,), daemon=True)
+        thread.start()
+
+    def has_probe(self, name: str) -> bool:
+        with self._cond:
+            return name in self._probes
+
+    def pending(self) -> List[str]:
+        """
+        Get the names of all probes that are neither done nor timed out |
+        :return: List of probe names
+        """
+        with self._cond:
+            return [
+                name
+                for name, probe in self._probes.items()
+                if not probe.done and not probe.result.timed_out
+            ]
+
+    def wait(self, name: str) -> ProbeResult:
+        """
+        Wait for a single probe to finish or to time out |
+        :param name: Name of the probe
+        :return: ProbeResult of the probe
+        """
+        with self._cond:
+            probe = self._probes[name]
+            while True:
+                # a queued probe can only start once a running probe finishes or
+                # times out, so the deadlines of all running probes are checked
+                next_deadline = self._expire_overdue()
+                if probe.done or probe.result.timed_out:
+                    break
+                self._cond.wait(next_deadline)
+
+            return probe.result
+
+    def join(self, name: str, timeout: float | None = None) -> bool:
+        """
+        Wait for the function of a probe to return, even if the probe already
+        timed out, e.g. before changing anything a late probe still works on |
+        :param name: Name of the probe
+        :param timeout: Seconds to wait at most, None waits without a limit
+        :return: True if the function returned, False if it is still running
+        """
+        with self._cond:
+            probe = self._probes[name]
+            return self._cond.wait_for(lambda: probe.done, timeout)
+
+    def collect(self) -> Dict[str, ProbeResult]:
+        """
+        Wait for all probes to finish or to time out |
+        :return: Dict of probe names and their results
+        """
+        with self._cond:
+            names = list(self._probes)
+        return {name: self.wait(name) for name in names}
+
+    def get_durations(self) -> Dict[str, float | None]:
+        with self._cond:
+            return {n: p.result.duration for n, p in self._probes.items()}
+
+    def _run(self, probe: _Probe) -> None:
+        self._slots.acquire()
+        with self._cond:
+            probe.started = time.monotonic()
+            self._cond.notify_all()
+
+        value, error = None, None
+        try:
+            value = probe.fn(*probe.args)
+        except Exception as e:
+            error = e
+
+        with self._cond:
+            probe.result.value = value
+            probe.result.error = error
+            probe.result.duration = time.monotonic() - probe.started
+            probe.done = True
+            self._release_slot(probe)
+            self._cond.notify_all()
+
+    def _expire_overdue(self) -> float | None:
+        """
+        Mark all running probes that exceeded their timeout as timed out |
+        :return: Seconds until the next running probe times out or None
+        """
+        now = time.monotonic()
+        next_deadline: float | None = None
+        for probe in self._probes.values():
+            if probe.started is None or probe.done or probe.result.timed_out:
+                continue
+
+            remaining = probe.started + probe.timeout - now
+            if remaining <= 0:
+                probe.result.timed_out = True
+                probe.result.duration = now - probe.started
+                self._release_slot(probe)
+            elif next_deadline is None or remaining < next_deadline:
+                next_deadline = remaining
+
+        return next_deadline
+
+    def _release_slot(self, probe: _Probe) -> None:
+        # a timed out probe gives up its slot early, so a late
+        # finishing thread must not release it a second time
+        if probe.slot_released:
+            return
+        probe.slot_released = True
+        self._slots.release()
+        self._cond.notify_all()
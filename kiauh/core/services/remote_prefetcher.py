@@ -0,0 +1,84 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, List, Set, Tuple
+
+from core.services.probe_runner import ProbeResult, ProbeRunner
+
+PREFETCH_WORKERS = 2
+PREFETCH_TIMEOUT = 60.0
+
+
+# noinspection PyMethodMayBeStatic
+class RemotePrefetcher:
+    """
+    Warms remote version information (GitHub tags, remote git refs, upgradable
+    system packages) in the background while the user is still in the main menu.
+    Most probes only fill the caches the synchronous lookups use later on, the
+    results of the others can be consumed once.
+    """
+
+    _instance = None
+
+    def __new__(cls) -> "RemotePrefetcher":
+        if cls._instance is None:
+            cls._instance = super(RemotePrefetcher, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._runner: ProbeRunner | None = None
+        self._consumed: Set[str] = set()
+
+    def start(self, probes: Dict[str, Tuple[Callable, tuple]]) -> None:
+        """
+        Start prefetching in the background. Only the first call has an effect. |
+        :param probes: Dict of probe names and a tuple of function and arguments
+        :return: None
+        """
+        with self._lock:
+            if self._runner is not None:
+                return
+            self._runner = ProbeRunner(PREFETCH_WORKERS, PREFETCH_TIMEOUT)
+
+        for name, (fn, args) in probes.items():
+            self._runner.submit(name, fn, *args)
+
+    def pending(self) -> List[str]:
+        if self._runner is None:
+            return []
+        return self._runner.pending()
+
+    def wait(self, name: str) -> ProbeResult | None:
+        """
+        Wait for a prefetch probe if it is still running |
+        :param name: Name of the probe
+        :return: ProbeResult or None if no such probe was started
+        """
+        if self._runner is None or not self._runner.has_probe(name):
+            return None
+        return self._runner.wait(name)
+
+    def consume(self, name: str) -> ProbeResult | None:
+        """
+        Like wait(), but every result is handed out only once, for
+        results that are outdated after the user acted on them |
+        :param name: Name of the probe
+        :return: ProbeResult or None if no such probe was started or consumed
+        """
+        with self._lock:
+            if name in self._consumed:
+                return None
+            self._consumed.add(name)
+        return self.wait(name)
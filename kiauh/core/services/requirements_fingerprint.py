@@ -0,0 +1,153 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from subprocess import DEVNULL, CalledProcessError, check_output
+from typing import Dict, List, Set
+
+FINGERPRINT_FILE = ".kiauh-requirements.json"
+
+
+def get_requirement_files(requirements: List[Path]) -> List[Path]:
+    """
+    Get the requirements files and all files they include with "-r" or "-c" |
+    :param requirements: List of requirements files
+    :return: List of all files the requirements consist of
+    """
+    files: List[Path] = []
+    pending = list(requirements)
+    while pending:
+        requirement = pending.pop(0)
+        if requirement in files:
+            continue
+        files.append(requirement)
+
+        try:
+            lines = requirement.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+
+        for line in lines:
+            option, _, value = line.strip().partition(" ")
+            if option in ("-r", "-c", "--requirement", "--constraint"):
+                pending.append(requirement.parent.joinpath(value.strip()))
+
+    return files
+
+
+def hash_requirements(requirements: List[Path]) -> str:
+    """
+    Hashes the contents of requirements files and of all files they include |
+    :param requirements: List of requirements files
+    :return: the hex digest
+    """
+    sha256 = hashlib.sha256()
+    for requirement in get_requirement_files(requirements):
+        sha256.update(requirement.as_posix().encode("utf-8") + b"\0")
+        try:
+            sha256.update(requirement.read_bytes())
+        except OSError:
+            sha256.update(b"\0missing")
+        sha256.update(b"\0")
+
+    return sha256.hexdigest()
+
+
+def get_interpreter_version(venv: Path) -> str:
+    """
+    Get the full version of the interpreter of a virtualenv |
+    :param venv: Path of the virtualenv
+    :return: the version string or an empty string if the interpreter is broken
+    """
+    python = venv.joinpath("bin/python").as_posix()
+    try:
+        cmd = [python, "-c", "import sys; print(sys.version)"]
+        return check_output(cmd, stderr=DEVNULL, text=True).strip()
+    except (OSError, CalledProcessError):
+        return ""
+
+
+def get_installed_distributions(venv: Path) -> Set[str]:
+    """
+    Get the installed distributions of a virtualenv. This is the same set that
+    "pip freeze" reports, but read from the metadata directories of the env
+    instead of spawning pip. |
+    :param venv: Path of the virtualenv
+    :return: Set of the metadata directory names, e.g. "greenlet-3.0.3.dist-info"
+    """
+    installed = set()
+    for site_packages in venv.glob("lib/python*/site-packages"):
+        for entry in os.scandir(site_packages):
+            if entry.name.endswith((".dist-info", ".egg-info", ".egg-link")):
+                installed.add(entry.name)
+    return installed
+
+
+def get_fingerprint(venv: Path, requirements: List[Path]) -> Dict[str, str]:
+    """
+    Get the fingerprint of the requirements installed in a virtualenv |
+    :param venv: Path of the virtualenv
+    :param requirements: List of requirements files
+    :return: the fingerprint
+    """
+    installed = sorted(get_installed_distributions(venv))
+    return {
+        "requirements": hash_requirements(requirements),
+        "python": get_interpreter_version(venv),
+        "installed": hashlib.sha256("\n".join(installed).encode()).hexdigest(),
+    }
+
+
+def read_fingerprint(venv: Path) -> Dict[str, str] | None:
+    try:
+        with open(venv.joinpath(FINGERPRINT_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def write_fingerprint(venv: Path, requirements: List[Path]) -> None:
+    """
+    Stores the fingerprint of the requirements installed in a virtualenv |
+    :param venv: Path of the virtualenv
+    :param requirements: List of requirements files
+    :return: None
+    """
+    fingerprint = get_fingerprint(venv, requirements)
+    tmp: str | None = None
+    try:
+        fd, tmp = tempfile.mkstemp(dir=venv, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(fingerprint, f)
+        os.replace(tmp, venv.joinpath(FINGERPRINT_FILE))
+    except OSError:
+        # the fingerprint is an optimization only, so failing to write is no error
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def is_up_to_date(venv: Path, requirements: List[Path]) -> bool:
+    """
+    Check if the requirements were installed into a virtualenv already and
+    neither the requirements, the interpreter nor the installed packages have
+    changed since |
+    :param venv: Path of the virtualenv
+    :param requirements: List of requirements files
+    :return: True if installing the requirements again would be a no-op
+    """
+    stored = read_fingerprint(venv)
+    if stored is None:
+        return False
+    return stored == get_fingerprint(venv, requirements)
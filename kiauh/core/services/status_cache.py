@@ -0,0 +1,142 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from core.types.component_status import ComponentStatus
+from utils.git_reader import GitReader
+
+Fingerprint = Tuple[Tuple[str, Optional[int]], ...]
+
+
+def get_mtime_ns(path: Path) -> int | None:
+    """
+    Helper method to get the modification time of a path in nanoseconds |
+    :param path: the path to get the modification time of
+    :return: the modification time or None if the path does not exist
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_fingerprint(paths: List[Path]) -> Fingerprint:
+    """
+    Creates a fingerprint from the modification times of the provided paths.
+    Directories are only fingerprinted by their own mtime, which changes whenever
+    an entry is created, renamed or removed inside of them. |
+    :param paths: List of paths the fingerprint depends on
+    :return: Tuple of path and mtime pairs
+    """
+    return tuple((p.as_posix(), get_mtime_ns(p)) for p in paths)
+
+
+def get_git_dependencies(repo_dir: Path) -> List[Path]:
+    """
+    Get all files and directories of a local git repository whose mtime changes
+    when the checked out branch, a local or a remote ref changes |
+    :param repo_dir: Path to the local Git repository
+    :return: List of paths
+    """
+    reader = GitReader(repo_dir)
+    git_dir, common_dir = reader.git_dir, reader.common_dir
+    paths = [
+        git_dir.joinpath("HEAD"),
+        common_dir.joinpath("config"),
+        common_dir.joinpath("packed-refs"),
+        # deepening a shallow clone changes the version 'git describe' returns
+        common_dir.joinpath("shallow"),
+    ]
+
+    # loose refs are replaced by renaming a lock file onto them, so the
+    # mtime of each directory below .git/refs covers all of its refs
+    refs_dirs = [common_dir.joinpath("refs")]
+    if git_dir != common_dir:
+        refs_dirs.append(git_dir.joinpath("refs"))
+    for refs_dir in refs_dirs:
+        for root, dirs, _ in os.walk(refs_dir):
+            dirs.sort()
+            paths.append(Path(root))
+
+    return paths
+
+
+# noinspection PyMethodMayBeStatic
+class StatusCache:
+    """
+    Process-wide cache for ComponentStatus objects. An entry stays valid as long
+    as the fingerprint of the paths it was created from does not change. The
+    hits and misses counters tell how many lookups were served from the cache.
+    """
+
+    _instance = None
+
+    def __new__(cls) -> "StatusCache":
+        if cls._instance is None:
+            cls._instance = super(StatusCache, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[Fingerprint, ComponentStatus]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(
+        self,
+        key: Hashable,
+        dependencies: List[Path],
+        fetch_fn: Callable[[], ComponentStatus],
+    ) -> ComponentStatus:
+        """
+        Get the status for the given key from the cache. If there is no entry or
+        any of the dependencies changed since it was created, fetch_fn is called
+        and its result cached. A copy is returned, so callers can modify it. |
+        :param key: Unique key of the component
+        :param dependencies: List of paths the status depends on
+        :param fetch_fn: Function to create the ComponentStatus on a cache miss
+        :return: ComponentStatus
+        """
+        # the fingerprint is taken before fetching, so that a change
+        # happening while fetching leads to a miss on the next call
+        fingerprint = get_fingerprint(dependencies)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self.hits += 1
+                return replace(entry[1])
+            self.misses += 1
+
+        status = fetch_fn()
+        with self._lock:
+            self._entries[key] = (fingerprint, replace(status))
+
+        return status
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """
+        Removes a single entry or, if no key is provided, all entries from the cache
+        :param key: Key of the entry to remove
+        :return: None
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
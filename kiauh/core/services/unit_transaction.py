@@ -0,0 +1,171 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+from subprocess import CalledProcessError
+from typing import Dict, List, Literal, Tuple
+
+from core.logger import Logger
+
+UnitAction = Literal["enable", "start", "restart"]
+UNIT_ACTIONS: Tuple[UnitAction, ...] = ("enable", "start", "restart")
+
+
+# noinspection PyMethodMayBeStatic
+class UnitTransaction:
+    """
+    Collects changes to systemd units and applies them when the context is left.
+    All unit files are written, systemd reloads its configuration a single time
+    and the queued enable, start and restart actions run with one systemctl call
+    each. Stopping, disabling and removing units is never deferred, so a unit is
+    always stopped before any of its files are removed.
+
+    While a transaction is active, create_service_file, cmd_sysctl_manage and the
+    enable, start and restart actions of cmd_sysctl_service(s) are queued in it
+    instead of being executed right away. Nested transactions join the outermost
+    one. If the context is left with an exception, the unit files are still
+    written and systemd is still reloaded, but no unit is enabled or started.
+    """
+
+    _active: UnitTransaction | None = None
+
+    def __init__(self) -> None:
+        self._writes: Dict[str, str] = {}
+        self._actions: Dict[UnitAction, List[str]] = {a: [] for a in UNIT_ACTIONS}
+        self._reload = False
+        self._reset_failed = False
+        self._owner = False
+
+    @classmethod
+    def get_active(cls) -> UnitTransaction | None:
+        return cls._active
+
+    def __enter__(self) -> UnitTransaction:
+        if UnitTransaction._active is not None:
+            return UnitTransaction._active
+
+        UnitTransaction._active = self
+        self._owner = True
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if not self._owner:
+            return
+
+        UnitTransaction._active = None
+        self._owner = False
+        if exc_type is None:
+            self.commit()
+            return
+
+        # the units that were already changed on disk must not be left
+        # behind unknown to systemd, but nothing is started after a failure
+        try:
+            self.commit(run_actions=False)
+        except CalledProcessError as e:
+            Logger.print_error(f"Error applying unit changes: {e}")
+
+    def write(self, name: str, content: str) -> None:
+        """
+        Queue writing a unit file to the systemd directory |
+        :param name: the name of the unit file
+        :param content: the content of the unit file
+        :return: None
+        """
+        self._writes[name] = content
+
+    def discard(self, name: str) -> None:
+        """
+        Drop the queued write and all queued actions of a unit, e.g. because
+        the unit is removed within the transaction |
+        :param name: the name of the unit file
+        :return: None
+        """
+        self._writes.pop(name, None)
+        for names in self._actions.values():
+            if name in names:
+                names.remove(name)
+
+    def enable(self, name: str) -> None:
+        self.queue(name, "enable")
+
+    def start(self, name: str) -> None:
+        self.queue(name, "start")
+
+    def restart(self, name: str) -> None:
+        self.queue(name, "restart")
+
+    def queue(self, name: str, action: str) -> bool:
+        """
+        Queue a service action. Only enable, start and restart are deferred. Stop
+        and disable have to take effect right away and cancel the queued actions
+        they would undo, so the last action requested for a unit always wins. |
+        :param name: the name of the unit file
+        :param action: the systemctl action
+        :return: True if the action was queued, False if the caller has to run it
+        """
+        if action == "stop":
+            self._cancel(name, ("start", "restart"))
+        elif action == "disable":
+            self._cancel(name, ("enable",))
+
+        for queued_action in UNIT_ACTIONS:
+            if action == queued_action:
+                if name not in self._actions[queued_action]:
+                    self._actions[queued_action].append(name)
+                return True
+
+        return False
+
+    def request_reload(self) -> None:
+        self._reload = True
+
+    def request_reset_failed(self) -> None:
+        self._reset_failed = True
+
+    def commit(self, run_actions: bool = True) -> None:
+        """
+        Apply all queued changes. A failing step does not prevent the following
+        steps from running, the first error is raised after all steps ran. |
+        :param run_actions: run the queued enable, start and restart actions
+        :return: None
+        :raises CalledProcessError: if any of the steps failed
+        """
+        from utils.sys_utils import (
+            cmd_sysctl_manage,
+            cmd_sysctl_services,
+            write_service_files,
+        )
+
+        errors: List[CalledProcessError] = []
+
+        def run_step(fn, *args) -> None:
+            try:
+                fn(*args)
+            except CalledProcessError as e:
+                errors.append(e)
+
+        if self._writes:
+            run_step(write_service_files, self._writes)
+        if self._reload or self._writes:
+            run_step(cmd_sysctl_manage, "daemon-reload")
+        if self._reset_failed:
+            run_step(cmd_sysctl_manage, "reset-failed")
+
+        if run_actions:
+            for action in UNIT_ACTIONS:
+                run_step(cmd_sysctl_services, self._actions[action], action)
+
+        if errors:
+            raise errors[0]
+
+    def _cancel(self, name: str, actions: Tuple[UnitAction, ...]) -> None:
+        for action in actions:
+            if name in self._actions[action]:
+                self._actions[action].remove(name)
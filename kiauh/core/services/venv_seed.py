@@ -0,0 +1,155 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import configparser
+import os
+import re
+import shutil
+import zipfile
+from pathlib import Path
+from subprocess import PIPE, CalledProcessError, run
+from typing import Dict, List, Tuple
+
+# the first directory that contains a wheel of a package wins, Debian based
+# systems ship the wheels virtualenv and venv use in /usr/share/python-wheels
+SEED_WHEEL_DIRS: List[Path] = [Path("/usr/share/python-wheels")]
+SEED_PACKAGES: List[str] = ["pip", "setuptools", "wheel"]
+
+SCRIPT_TEMPLATE = """#!{python}
+# -*- coding: utf-8 -*-
+import re
+import sys
+from {module} import {name}
+if __name__ == "__main__":
+    sys.argv[0] = re.sub(r"(-script\\.pyw|\\.exe)?$", "", sys.argv[0])
+    sys.exit({call}())
+"""
+
+
+class VenvSeedError(Exception):
+    pass
+
+
+def _get_wheel_version(wheel: Path) -> Tuple[int, ...]:
+    version = wheel.name.split("-")[1]
+    return tuple(int(p) for p in re.findall(r"\d+", version))
+
+
+def find_seed_wheels(dirs: List[Path] | None = None) -> Dict[str, Path]:
+    """
+    Find the newest pure python wheel of each seed package |
+    :param dirs: directories to search, defaults to SEED_WHEEL_DIRS
+    :return: Dict of package names and wheel paths
+    """
+    wheels: Dict[str, Path] = {}
+    for package in SEED_PACKAGES:
+        for directory in dirs if dirs is not None else SEED_WHEEL_DIRS:
+            candidates = [
+                w
+                for w in directory.glob(f"{package}-*-none-any.whl")
+                if "py3" in w.name.split("-")[-3]
+            ]
+            if candidates:
+                wheels[package] = max(candidates, key=_get_wheel_version)
+                break
+
+    return wheels
+
+
+def get_site_packages(venv: Path) -> Path:
+    site_packages = sorted(venv.glob("lib/python*/site-packages"))
+    if not site_packages:
+        raise VenvSeedError(f"No site-packages directory found in {venv}")
+    return site_packages[0]
+
+
+def install_seed_wheel(wheel: Path, venv: Path) -> None:
+    """
+    Installs a pure python wheel into a virtualenv by extracting it, which is
+    a lot faster than running pip. Console scripts are created and added to
+    the RECORD file, so pip can upgrade or uninstall the package later on. |
+    :param wheel: Path of the wheel
+    :param venv: Path of the virtualenv
+    :return: None
+    :raises VenvSeedError: if the wheel could not be installed
+    """
+    site_packages = get_site_packages(venv)
+    python = venv.joinpath("bin/python").as_posix()
+    try:
+        with zipfile.ZipFile(wheel) as whl:
+            whl.extractall(site_packages)
+            names = whl.namelist()
+    except (OSError, zipfile.BadZipFile) as e:
+        raise VenvSeedError(f"Unable to extract {wheel.name}: {e}")
+
+    dist_infos = {n.split("/")[0] for n in names if ".dist-info/" in n}
+    if len(dist_infos) != 1:
+        raise VenvSeedError(f"Invalid wheel {wheel.name}")
+    dist_info = site_packages.joinpath(dist_infos.pop())
+
+    entry_points = configparser.ConfigParser(delimiters=("=",))
+    entry_points.optionxform = str  # type: ignore
+    entry_points.read(dist_info.joinpath("entry_points.txt"))
+    scripts = []
+    if entry_points.has_section("console_scripts"):
+        for script, target in entry_points.items("console_scripts"):
+            module, _, call = target.partition(":")
+            content = SCRIPT_TEMPLATE.format(
+                python=python,
+                module=module.strip(),
+                name=call.strip().split(".")[0],
+                call=call.strip(),
+            )
+            path = venv.joinpath("bin", script)
+            path.write_text(content)
+            path.chmod(0o755)
+            scripts.append(path)
+
+    relative = os.path.relpath(venv.joinpath("bin"), site_packages)
+    with open(dist_info.joinpath("RECORD"), "a") as f:
+        for path in scripts:
+            f.write(f"{relative}/{path.name},,\n")
+    dist_info.joinpath("INSTALLER").write_text("pip\n")
+
+
+def create_seeded_venv(
+    target: Path,
+    python: Path = Path("/usr/bin/python3"),
+    system_site_packages: bool = False,
+    seed_dirs: List[Path] | None = None,
+) -> None:
+    """
+    Creates a virtualenv with the venv module of the standard library without
+    running ensurepip and seeds pip, setuptools and wheel from system wheels.
+    If anything fails, the partially created virtualenv is removed again. |
+    :param target: Path where to create the virtualenv at
+    :param python: the interpreter of the virtualenv
+    :param system_site_packages: give the virtualenv access to the system site-packages
+    :param seed_dirs: directories to take the seed wheels from
+    :return: None
+    :raises VenvSeedError: if the virtualenv could not be created
+    """
+    wheels = find_seed_wheels(seed_dirs)
+    if "pip" not in wheels:
+        raise VenvSeedError("No pip wheel found to seed the virtualenv with")
+
+    cmd = [python.as_posix(), "-m", "venv", "--without-pip", target.as_posix()]
+    if system_site_packages:
+        cmd.append("--system-site-packages")
+
+    try:
+        run(cmd, stderr=PIPE, text=True, check=True)
+        for wheel in wheels.values():
+            install_seed_wheel(wheel, target)
+    except (OSError, CalledProcessError, VenvSeedError) as e:
+        shutil.rmtree(target, ignore_errors=True)
+        if isinstance(e, CalledProcessError):
+            raise VenvSeedError(f"Unable to create virtualenv: {e.stderr}")
+        raise VenvSeedError(str(e))
@@ -0,0 +1,200 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from subprocess import PIPE, check_output, run
+from typing import Dict, List
+
+from core.constants import KIAUH_CACHE_DIR
+
+WHEELHOUSE_DIR = KIAUH_CACHE_DIR.joinpath("wheels")
+DEFAULT_WHEELHOUSE_MAX_AGE_DAYS = 90
+DEFAULT_WHEELHOUSE_MAX_SIZE_MB = 1024
+
+# e.g. "cpython-311-aarch64-linux-gnu", falls back to "cpython-311-linux_aarch64"
+# for interpreters that don't define SOABI
+ABI_TAG_SCRIPT = (
+    "import sys, sysconfig;"
+    "print(sysconfig.get_config_var('SOABI') or '%s-%s' % ("
+    "sys.implementation.cache_tag, sysconfig.get_platform().replace('-', '_')))"
+)
+
+_wheelhouse: Wheelhouse | None = None
+
+
+def normalize_dist_name(name: str) -> str:
+    # wheel file names and dist-info directories may differ in case and in
+    # using "-", "_" or "." as separators, see PEP 503 and PEP 427
+    return re.sub(r"[-_.]+", "_", name).lower()
+
+
+class Wheelhouse:
+    """
+    Directory of wheels that is shared by all virtualenvs KIAUH manages. Wheels
+    are stored per interpreter ABI, so a wheel compiled for one Python version is
+    never installed into the env of another one. Packages that have to be
+    compiled from source are only built once and all following installs of the
+    same versions are served from the wheelhouse without network access.
+    """
+
+    def __init__(
+        self,
+        root: Path = WHEELHOUSE_DIR,
+        max_age_days: int = DEFAULT_WHEELHOUSE_MAX_AGE_DAYS,
+        max_size_mb: int = DEFAULT_WHEELHOUSE_MAX_SIZE_MB,
+    ) -> None:
+        self.root = root
+        self.max_age_days = max_age_days
+        self.max_size_mb = max_size_mb
+        self._lock = threading.Lock()
+        self._abi_tags: Dict[Path, str] = {}
+
+    def get_abi_tag(self, python: Path) -> str:
+        """
+        Get the ABI tag of an interpreter. The tag is queried once per interpreter
+        and session. |
+        :param python: Path of the interpreter, e.g. "<venv>/bin/python"
+        :return: the ABI tag
+        :raises CalledProcessError: if the interpreter could not be run
+        """
+        with self._lock:
+            tag = self._abi_tags.get(python)
+        if tag is not None:
+            return tag
+
+        cmd = [python.as_posix(), "-c", ABI_TAG_SCRIPT]
+        tag = check_output(cmd, text=True).strip()
+        with self._lock:
+            self._abi_tags[python] = tag
+
+        return tag
+
+    def get_wheel_dir(self, venv: Path) -> Path:
+        """
+        Get the wheel directory for the interpreter of a virtualenv |
+        :param venv: Path of the virtualenv
+        :return: Path of the wheel directory
+        :raises CalledProcessError: if the interpreter could not be run
+        """
+        return self.root.joinpath(self.get_abi_tag(venv.joinpath("bin/python")))
+
+    def get_install_args(self, venv: Path) -> List[str]:
+        """
+        Get the pip arguments that restrict an install to the wheelhouse |
+        :param venv: Path of the virtualenv
+        :return: List of pip arguments
+        """
+        wheel_dir = self.get_wheel_dir(venv).as_posix()
+        return ["--no-index", "--find-links", wheel_dir]
+
+    def build(self, venv: Path, pip_args: List[str]) -> bool:
+        """
+        Builds the wheels of all requirements that are not in the wheelhouse yet.
+        Wheels that are already present are reused and not built again. |
+        :param venv: Path of the virtualenv whose pip and interpreter are used
+        :param pip_args: the requirements and constraints arguments for pip
+        :return: True if all wheels are available, False otherwise
+        """
+        wheel_dir = self.get_wheel_dir(venv)
+        wheel_dir.mkdir(parents=True, exist_ok=True)
+
+        command = [
+            venv.joinpath("bin/pip").as_posix(),
+            "wheel",
+            "--wheel-dir",
+            wheel_dir.as_posix(),
+            "--find-links",
+            wheel_dir.as_posix(),
+            *pip_args,
+        ]
+        return run(command, stdout=PIPE, stderr=PIPE).returncode == 0
+
+    def mark_used(self, venv: Path) -> None:
+        """
+        Refreshes the mtime of all wheels that are installed in a virtualenv, so
+        wheels that are still in use are not evicted |
+        :param venv: Path of the virtualenv
+        :return: None
+        """
+        installed = set()
+        for dist_info in venv.glob("lib/python*/site-packages/*.dist-info"):
+            name, _, version = dist_info.name[: -len(".dist-info")].partition("-")
+            installed.add((normalize_dist_name(name), version))
+
+        now = time.time()
+        for wheel in self.get_wheel_dir(venv).glob("*.whl"):
+            name, version = wheel.name.split("-")[:2]
+            if (normalize_dist_name(name), version) in installed:
+                try:
+                    os.utime(wheel, (now, now))
+                except OSError:
+                    pass
+
+    def evict(self) -> int:
+        """
+        Removes all wheels that were not used within the maximum age. If the
+        wheelhouse still exceeds its maximum size afterward, the least recently
+        used wheels are removed until it fits. |
+        :return: the number of removed wheels
+        """
+        wheels = []
+        for wheel in self.root.glob("*/*.whl"):
+            try:
+                stat = wheel.stat()
+            except OSError:
+                continue
+            wheels.append((stat.st_mtime, stat.st_size, wheel))
+
+        # least recently used wheels first
+        wheels.sort()
+        min_mtime = time.time() - self.max_age_days * 86400
+        max_size = self.max_size_mb * 1024 * 1024
+        size = sum(w[1] for w in wheels)
+
+        removed = 0
+        for mtime, wheel_size, wheel in wheels:
+            if mtime >= min_mtime and size <= max_size:
+                break
+            try:
+                wheel.unlink()
+            except OSError:
+                continue
+            size -= wheel_size
+            removed += 1
+
+        return removed
+
+
+def get_wheelhouse() -> Wheelhouse | None:
+    """
+    Get the shared wheelhouse if it is enabled in the KIAUH settings |
+    :return: Wheelhouse or None if pip should install from the package index
+    """
+    global _wheelhouse
+
+    # imported here, the settings depend on sys_utils which depends on this module
+    from core.settings.kiauh_settings import KiauhSettings
+
+    settings = KiauhSettings().kiauh
+    if not settings.use_wheelhouse:
+        return None
+
+    max_age = settings.wheelhouse_max_age_days or DEFAULT_WHEELHOUSE_MAX_AGE_DAYS
+    max_size = settings.wheelhouse_max_size_mb or DEFAULT_WHEELHOUSE_MAX_SIZE_MB
+    if _wheelhouse is None:
+        _wheelhouse = Wheelhouse()
+    _wheelhouse.max_age_days = max_age
+    _wheelhouse.max_size_mb = max_size
+
+    return _wheelhouse
@@ -9,7 +9,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, List
 
 from core.logger import DialogType, Logger
 from core.submodules.simple_config_parser.src.simple_config_parser.simple_config_parser import (
@@ -28,6 +28,17 @@ CUSTOM_CFG = PROJECT_ROOT.joinpath("kiauh.cfg")
 @dataclass
 class AppSettings:
     backup_before_update: bool | None = field(default=None)
+    use_privileged_worker: bool | None = field(default=None)
+    deb_bundle_mode: str | None = field(default=None)
+    deb_bundle_dir: str | None = field(default=None)
+    use_wheelhouse: bool | None = field(default=None)
+    wheelhouse_max_age_days: int | None = field(default=None)
+    wheelhouse_max_size_mb: int | None = field(default=None)
+    force_pip_install: bool | None = field(default=None)
+    precompile_bytecode: bool | None = field(default=None)
+    clone_strategy: str | None = field(default=None)
+    clone_depth: int | None = field(default=None)
+    use_git_mirrors: bool | None = field(default=None)
 
 
 @dataclass
@@ -111,6 +122,15 @@ class KiauhSettings:
     def _validate_cfg(self) -> None:
         try:
             self._validate_bool("kiauh", "backup_before_update")
+            self._validate_choice(
+                "kiauh", "deb_bundle_mode", ["off", "export", "import"]
+            )
+            self._validate_int("kiauh", "wheelhouse_max_age_days", optional=True)
+            self._validate_int("kiauh", "wheelhouse_max_size_mb", optional=True)
+            self._validate_choice(
+                "kiauh", "clone_strategy", ["full", "partial", "shallow"]
+            )
+            self._validate_int("kiauh", "clone_depth", optional=True)
 
             self._validate_str("klipper", "repo_url")
             self._validate_str("klipper", "branch")
@@ -138,8 +158,10 @@ class KiauhSettings:
         self._v_section, self._v_option = (section, option)
         (bool(self.config.getboolean(section, option)))
 
-    def _validate_int(self, section: str, option: str) -> None:
+    def _validate_int(self, section: str, option: str, optional: bool = False) -> None:
         self._v_section, self._v_option = (section, option)
+        if optional and not self.config.has_option(section, option):
+            return
         int(self.config.getint(section, option))
 
     def _validate_str(self, section: str, option: str) -> None:
@@ -149,10 +171,49 @@ class KiauhSettings:
         if not v:
             raise ValueError
 
+    def _validate_choice(self, section: str, option: str, choices: List[str]) -> None:
+        # optional, an older config may not contain the option yet
+        self._v_section, self._v_option = (section, option)
+        if not self.config.has_option(section, option):
+            return
+        if self.config.getval(section, option) not in choices:
+            raise ValueError
+
     def _apply_settings_from_file(self) -> None:
         self.kiauh.backup_before_update = self.config.getboolean(
             "kiauh", "backup_before_update"
         )
+        self.kiauh.use_privileged_worker = self.config.getboolean(
+            "kiauh", "use_privileged_worker", fallback=False
+        )
+        self.kiauh.deb_bundle_mode = str(
+            self.config.getval("kiauh", "deb_bundle_mode", fallback="off")
+        )
+        self.kiauh.deb_bundle_dir = str(
+            self.config.getval("kiauh", "deb_bundle_dir", fallback="~/kiauh-deb-bundle")
+        )
+        self.kiauh.use_wheelhouse = self.config.getboolean(
+            "kiauh", "use_wheelhouse", fallback=False
+        )
+        self.kiauh.wheelhouse_max_age_days = self.config.getint(
+            "kiauh", "wheelhouse_max_age_days", fallback=90
+        )
+        self.kiauh.wheelhouse_max_size_mb = self.config.getint(
+            "kiauh", "wheelhouse_max_size_mb", fallback=1024
+        )
+        self.kiauh.force_pip_install = self.config.getboolean(
+            "kiauh", "force_pip_install", fallback=False
+        )
+        self.kiauh.precompile_bytecode = self.config.getboolean(
+            "kiauh", "precompile_bytecode", fallback=True
+        )
+        self.kiauh.clone_strategy = str(
+            self.config.getval("kiauh", "clone_strategy", fallback="full")
+        )
+        self.kiauh.clone_depth = self.config.getint("kiauh", "clone_depth", fallback=50)
+        self.kiauh.use_git_mirrors = self.config.getboolean(
+            "kiauh", "use_git_mirrors", fallback=False
+        )
         self.klipper.repo_url = self.config.getval("klipper", "repo_url")
         self.klipper.branch = self.config.getval("klipper", "branch")
         self.moonraker.repo_url = self.config.getval("moonraker", "repo_url")
@@ -172,6 +233,43 @@ class KiauhSettings:
             "backup_before_update",
             str(self.kiauh.backup_before_update),
         )
+        self.config.set_option(
+            "kiauh",
+            "use_privileged_worker",
+            str(self.kiauh.use_privileged_worker),
+        )
+        self.config.set_option(
+            "kiauh", "deb_bundle_mode", str(self.kiauh.deb_bundle_mode)
+        )
+        self.config.set_option(
+            "kiauh", "deb_bundle_dir", str(self.kiauh.deb_bundle_dir)
+        )
+        self.config.set_option(
+            "kiauh", "use_wheelhouse", str(self.kiauh.use_wheelhouse)
+        )
+        self.config.set_option(
+            "kiauh",
+            "wheelhouse_max_age_days",
+            str(self.kiauh.wheelhouse_max_age_days),
+        )
+        self.config.set_option(
+            "kiauh",
+            "wheelhouse_max_size_mb",
+            str(self.kiauh.wheelhouse_max_size_mb),
+        )
+        self.config.set_option(
+            "kiauh", "force_pip_install", str(self.kiauh.force_pip_install)
+        )
+        self.config.set_option(
+            "kiauh", "precompile_bytecode", str(self.kiauh.precompile_bytecode)
+        )
+        self.config.set_option(
+            "kiauh", "clone_strategy", str(self.kiauh.clone_strategy)
+        )
+        self.config.set_option("kiauh", "clone_depth", str(self.kiauh.clone_depth))
+        self.config.set_option(
+            "kiauh", "use_git_mirrors", str(self.kiauh.use_git_mirrors)
+        )
         self.config.set_option("klipper", "repo_url", self.klipper.repo_url)
         self.config.set_option("klipper", "branch", self.klipper.branch)
         self.config.set_option("moonraker", "repo_url", self.moonraker.repo_url)
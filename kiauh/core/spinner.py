@@ -23,14 +23,19 @@ class Spinner:
         animation: List[str] = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
         while not self._stop_event.is_set():
             for char in animation:
-                sys.stdout.write(f"\r{Color.GREEN}{char}{Color.RST} {self.message}")
+                sys.stdout.write(
+                    f"\r{Color.GREEN}{char}{Color.RST} {self.message}\033[K"
+                )
                 sys.stdout.flush()
                 time.sleep(self.interval)
                 if self._stop_event.is_set():
                     break
-        sys.stdout.write("\r" + " " * (len(self.message) + 1) + "\r")
+        sys.stdout.write("\r\033[K")
         sys.stdout.flush()
 
+    def set_message(self, message: str) -> None:
+        self.message = f"{message} ..."
+
     def start(self) -> None:
         self._stop_event.clear()
         if not self._thread.is_alive():
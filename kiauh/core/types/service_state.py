@@ -0,0 +1,76 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+SERVICE_STATE_PROPERTIES: List[str] = [
+    "Id",
+    "LoadState",
+    "ActiveState",
+    "SubState",
+    "UnitFileState",
+    "MainPID",
+    "ExecMainStartTimestamp",
+]
+
+
+@dataclass
+class ServiceState:
+    name: str
+    load_state: str = ""
+    active_state: str = ""
+    sub_state: str = ""
+    unit_file_state: str = ""
+    main_pid: int = 0
+    started_at: str | None = None
+
+    @property
+    def exists(self) -> bool:
+        return self.load_state not in ("", "not-found")
+
+    @property
+    def is_running(self) -> bool:
+        return self.active_state == "active" and self.sub_state == "running"
+
+    @property
+    def is_failed(self) -> bool:
+        return self.active_state == "failed"
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.unit_file_state.startswith("enabled")
+
+    @property
+    def is_masked(self) -> bool:
+        return self.load_state == "masked" or self.unit_file_state == "masked"
+
+
+def parse_service_state(name: str, properties: Dict[str, str]) -> ServiceState:
+    """
+    Creates a ServiceState from the output of "systemctl show" |
+    :param name: the name the unit was queried by
+    :param properties: Dict of property names and values of the unit
+    :return: ServiceState
+    """
+    try:
+        main_pid = int(properties.get("MainPID", "0"))
+    except ValueError:
+        main_pid = 0
+
+    return ServiceState(
+        name=properties.get("Id") or name,
+        load_state=properties.get("LoadState", ""),
+        active_state=properties.get("ActiveState", ""),
+        sub_state=properties.get("SubState", ""),
+        unit_file_state=properties.get("UnitFileState", ""),
+        main_pid=main_pid,
+        started_at=properties.get("ExecMainStartTimestamp") or None,
+    )
@@ -9,12 +9,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from subprocess import CalledProcessError, run
 
 from components.moonraker.moonraker import Moonraker
 from core.constants import CURRENT_USER
-from core.instance_manager.base_instance import BaseInstance
+from core.instance_manager.base_instance import (
+    BaseInstance,
+    invalidate_cached_properties,
+)
 from core.logger import Logger
 from core.submodules.simple_config_parser.src.simple_config_parser.simple_config_parser import (
     SimpleConfigParser,
@@ -31,6 +35,7 @@ from extensions.obico import (
 )
 from utils.fs_utils import create_folders
 from utils.sys_utils import get_service_file_path
+from utils.template_utils import render_template
 
 
 # noinspection PyMethodMayBeStatic
@@ -42,9 +47,6 @@ class MoonrakerObico:
     log_file_name: str = OBICO_LOG_NAME
     dir: Path = OBICO_DIR
     env_dir: Path = OBICO_ENV_DIR
-    data_dir: Path = field(init=False)
-    cfg_file: Path = field(init=False)
-    is_linked: bool = False
 
     def __post_init__(self):
         self.base: BaseInstance = BaseInstance(Moonraker, self.suffix)
@@ -53,9 +55,18 @@ class MoonrakerObico:
         self.service_file_path: Path = get_service_file_path(
             MoonrakerObico, self.suffix
         )
-        self.data_dir: Path = self.base.data_dir
-        self.cfg_file = self.base.cfg_dir.joinpath(OBICO_CFG_NAME)
-        self.is_linked: bool = self._check_link_status()
+
+    @cached_property
+    def data_dir(self) -> Path:
+        return self.base.data_dir
+
+    @cached_property
+    def cfg_file(self) -> Path:
+        return self.base.cfg_dir.joinpath(OBICO_CFG_NAME)
+
+    @cached_property
+    def is_linked(self) -> bool:
+        return self._check_link_status()
 
     def create(self) -> None:
         from utils.sys_utils import create_env_file, create_service_file
@@ -92,49 +103,24 @@ class MoonrakerObico:
         except CalledProcessError as e:
             Logger.print_error(f"Error during Obico linking: {e}")
             raise
+        finally:
+            # linking writes the auth token to the config file
+            invalidate_cached_properties(self)
 
     def _prep_service_file_content(self) -> str:
-        template = OBICO_SERVICE_TEMPLATE
-
-        try:
-            with open(template, "r") as template_file:
-                template_content = template_file.read()
-        except FileNotFoundError:
-            Logger.print_error(f"Unable to open {template} - File not found")
-            raise
-
-        service_content = template_content.replace(
-            "%USER%",
-            CURRENT_USER,
+        env_file = self.base.sysd_dir.joinpath(OBICO_ENV_FILE_NAME)
+        return render_template(
+            OBICO_SERVICE_TEMPLATE,
+            {
+                "USER": CURRENT_USER,
+                "OBICO_DIR": self.dir.as_posix(),
+                "ENV": self.env_dir.as_posix(),
+                "ENV_FILE": env_file.as_posix(),
+            },
         )
-        service_content = service_content.replace(
-            "%OBICO_DIR%",
-            self.dir.as_posix(),
-        )
-        service_content = service_content.replace(
-            "%ENV%",
-            self.env_dir.as_posix(),
-        )
-        service_content = service_content.replace(
-            "%ENV_FILE%",
-            self.base.sysd_dir.joinpath(OBICO_ENV_FILE_NAME).as_posix(),
-        )
-        return service_content
 
     def _prep_env_file_content(self) -> str:
-        template = OBICO_ENV_FILE_TEMPLATE
-
-        try:
-            with open(template, "r") as env_file:
-                env_template_file_content = env_file.read()
-        except FileNotFoundError:
-            Logger.print_error(f"Unable to open {template} - File not found")
-            raise
-        env_file_content = env_template_file_content.replace(
-            "%CFG%",
-            f"{self.cfg_file}",
-        )
-        return env_file_content
+        return render_template(OBICO_ENV_FILE_TEMPLATE, {"CFG": f"{self.cfg_file}"})
 
     def _check_link_status(self) -> bool:
         if not self.cfg_file or not self.cfg_file.exists():
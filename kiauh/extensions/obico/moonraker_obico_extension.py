@@ -12,8 +12,12 @@ from typing import List
 from components.klipper.klipper import Klipper
 from components.moonraker.moonraker import Moonraker
 from core.instance_manager.instance_manager import InstanceManager
-from core.instance_manager.base_instance import SUFFIX_BLACKLIST
+from core.instance_manager.base_instance import (
+    SUFFIX_BLACKLIST,
+    invalidate_cached_properties,
+)
 from core.logger import DialogType, Logger
+from core.services.unit_transaction import UnitTransaction
 from core.submodules.simple_config_parser.src.simple_config_parser.simple_config_parser import (
     SimpleConfigParser,
 )
@@ -41,8 +45,6 @@ from utils.git_utils import git_clone_wrapper, git_pull_wrapper
 from utils.input_utils import get_confirm, get_selection_input, get_string_input
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
-    cmd_sysctl_manage,
-    cmd_sysctl_service,
     create_python_venv,
     install_python_requirements,
     parse_packages_from_file,
@@ -100,24 +102,23 @@ class ObicoExtension(BaseExtension):
             self._get_server_url()
 
             # create obico instances
-            for moonraker in mr_instances:
-                instance = MoonrakerObico(suffix=moonraker.suffix)
-                instance.create()
-
-                cmd_sysctl_service(instance.service_file_path.name, "enable")
+            with UnitTransaction() as transaction:
+                for moonraker in mr_instances:
+                    instance = MoonrakerObico(suffix=moonraker.suffix)
+                    instance.create()
 
-                # create obico config
-                self._create_obico_cfg(instance, moonraker)
+                    transaction.enable(instance.service_file_path.name)
 
-                # create obico macros
-                self._create_obico_macros_cfg(moonraker)
+                    # create obico config
+                    self._create_obico_cfg(instance, moonraker)
 
-                # create obico update manager
-                self._create_obico_update_manager_cfg(moonraker)
+                    # create obico macros
+                    self._create_obico_macros_cfg(moonraker)
 
-                cmd_sysctl_service(instance.service_file_path.name, "start")
+                    # create obico update manager
+                    self._create_obico_update_manager_cfg(moonraker)
 
-            cmd_sysctl_manage("daemon-reload")
+                    transaction.start(instance.service_file_path.name)
 
             # add to klippers config
             self._patch_printer_cfg(kl_instances)
@@ -291,6 +292,7 @@ class ObicoExtension(BaseExtension):
             obico.base.log_dir.joinpath(obico.log_file_name).as_posix(),
         )
         scp.write_file(obico.cfg_file)
+        invalidate_cached_properties(obico)
 
     def _patch_printer_cfg(self, klipper: List[Klipper]) -> None:
         add_config_section(
@@ -344,11 +346,12 @@ class ObicoExtension(BaseExtension):
             Logger.print_info("No Obico instances found. Skipped ...")
             return
 
-        for instance in instance_list:
-            Logger.print_status(
-                f"Removing instance {instance.service_file_path.stem} ..."
-            )
-            InstanceManager.remove(instance)
+        with UnitTransaction():
+            for instance in instance_list:
+                Logger.print_status(
+                    f"Removing instance {instance.service_file_path.stem} ..."
+                )
+                InstanceManager.remove(instance)
 
     def _remove_obico_dir(self) -> None:
         Logger.print_status("Removing Obico for Klipper directory ...")
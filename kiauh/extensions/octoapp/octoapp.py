@@ -9,6 +9,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from subprocess import CalledProcessError, run
 
@@ -36,10 +37,6 @@ class Octoapp:
     log_file_name = OA_LOG_NAME
     dir: Path = OA_DIR
     env_dir: Path = OA_ENV_DIR
-    data_dir: Path = field(init=False)
-    store_dir: Path = field(init=False)
-    cfg_file: Path = field(init=False)
-    sys_cfg_file: Path = field(init=False)
 
     def __post_init__(self):
         self.base: BaseInstance = BaseInstance(Moonraker, self.suffix)
@@ -48,11 +45,22 @@ class Octoapp:
         self.service_file_path: Path = get_service_file_path(
             Octoapp, self.suffix
         )
-        self.store_dir = self.base.data_dir.joinpath("store")
-        self.cfg_file = self.base.cfg_dir.joinpath(OA_CFG_NAME)
-        self.sys_cfg_file = self.base.cfg_dir.joinpath(OA_SYS_CFG_NAME)
-        self.data_dir = self.base.data_dir
-        self.sys_cfg_file = self.base.cfg_dir.joinpath(OA_SYS_CFG_NAME)
+
+    @cached_property
+    def data_dir(self) -> Path:
+        return self.base.data_dir
+
+    @cached_property
+    def store_dir(self) -> Path:
+        return self.base.data_dir.joinpath("store")
+
+    @cached_property
+    def cfg_file(self) -> Path:
+        return self.base.cfg_dir.joinpath(OA_CFG_NAME)
+
+    @cached_property
+    def sys_cfg_file(self) -> Path:
+        return self.base.cfg_dir.joinpath(OA_SYS_CFG_NAME)
 
     def create(self) -> None:
         Logger.print_status("Creating OctoApp for Klipper Instance ...")
@@ -9,6 +9,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from subprocess import CalledProcessError
 
@@ -27,6 +28,7 @@ from extensions.telegram_bot import (
 )
 from utils.fs_utils import create_folders
 from utils.sys_utils import get_service_file_path
+from utils.template_utils import render_template
 
 
 # noinspection PyMethodMayBeStatic
@@ -38,8 +40,6 @@ class MoonrakerTelegramBot:
     log_file_name: str = TG_BOT_LOG_NAME
     bot_dir: Path = TG_BOT_DIR
     env_dir: Path = TG_BOT_ENV
-    data_dir: Path = field(init=False)
-    cfg_file: Path = field(init=False)
 
     def __post_init__(self):
         self.base: BaseInstance = BaseInstance(Moonraker, self.suffix)
@@ -48,8 +48,14 @@ class MoonrakerTelegramBot:
         self.service_file_path: Path = get_service_file_path(
             MoonrakerTelegramBot, self.suffix
         )
-        self.data_dir: Path = self.base.data_dir
-        self.cfg_file = self.base.cfg_dir.joinpath(TG_BOT_CFG_NAME)
+
+    @cached_property
+    def data_dir(self) -> Path:
+        return self.base.data_dir
+
+    @cached_property
+    def cfg_file(self) -> Path:
+        return self.base.cfg_dir.joinpath(TG_BOT_CFG_NAME)
 
     def create(self) -> None:
         from utils.sys_utils import create_env_file, create_service_file
@@ -75,53 +81,23 @@ class MoonrakerTelegramBot:
             raise
 
     def _prep_service_file_content(self) -> str:
-        template = TG_BOT_SERVICE_TEMPLATE
-
-        try:
-            with open(template, "r") as template_file:
-                template_content = template_file.read()
-        except FileNotFoundError:
-            Logger.print_error(f"Unable to open {template} - File not found")
-            raise
-
-        service_content = template_content.replace(
-            "%USER%",
-            CURRENT_USER,
-        )
-        service_content = service_content.replace(
-            "%TELEGRAM_BOT_DIR%",
-            self.bot_dir.as_posix(),
-        )
-        service_content = service_content.replace(
-            "%ENV%",
-            self.env_dir.as_posix(),
+        env_file = self.base.sysd_dir.joinpath(TG_BOT_ENV_FILE_NAME)
+        return render_template(
+            TG_BOT_SERVICE_TEMPLATE,
+            {
+                "USER": CURRENT_USER,
+                "TELEGRAM_BOT_DIR": self.bot_dir.as_posix(),
+                "ENV": self.env_dir.as_posix(),
+                "ENV_FILE": env_file.as_posix(),
+            },
         )
-        service_content = service_content.replace(
-            "%ENV_FILE%",
-            self.base.sysd_dir.joinpath(TG_BOT_ENV_FILE_NAME).as_posix(),
-        )
-        return service_content
 
     def _prep_env_file_content(self) -> str:
-        template = TG_BOT_ENV_FILE_TEMPLATE
-
-        try:
-            with open(template, "r") as env_file:
-                env_template_file_content = env_file.read()
-        except FileNotFoundError:
-            Logger.print_error(f"Unable to open {template} - File not found")
-            raise
-
-        env_file_content = env_template_file_content.replace(
-            "%TELEGRAM_BOT_DIR%",
-            self.bot_dir.as_posix(),
-        )
-        env_file_content = env_file_content.replace(
-            "%CFG%",
-            self.cfg_file.as_posix()
-        )
-        env_file_content = env_file_content.replace(
-            "%LOG%",
-            self.base.log_dir.joinpath(self.log_file_name).as_posix(),
+        return render_template(
+            TG_BOT_ENV_FILE_TEMPLATE,
+            {
+                "TELEGRAM_BOT_DIR": self.bot_dir.as_posix(),
+                "CFG": self.cfg_file.as_posix(),
+                "LOG": self.base.log_dir.joinpath(self.log_file_name).as_posix(),
+            },
         )
-        return env_file_content
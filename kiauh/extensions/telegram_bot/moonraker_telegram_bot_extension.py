@@ -13,6 +13,7 @@ from typing import List
 from components.moonraker.moonraker import Moonraker
 from core.instance_manager.instance_manager import InstanceManager
 from core.logger import DialogType, Logger
+from core.services.unit_transaction import UnitTransaction
 from extensions.base_extension import BaseExtension
 from extensions.telegram_bot import TG_BOT_REPO, TG_BOT_REQ_FILE
 from extensions.telegram_bot.moonraker_telegram_bot import (
@@ -27,8 +28,6 @@ from utils.git_utils import git_clone_wrapper, git_pull_wrapper
 from utils.input_utils import get_confirm
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
-    cmd_sysctl_manage,
-    cmd_sysctl_service,
     create_python_venv,
     install_python_requirements,
     parse_packages_from_file,
@@ -80,29 +79,29 @@ class TelegramBotExtension(BaseExtension):
             # create and start services / create bot configs
             show_config_dialog = False
             tb_names = [mr_i.suffix for mr_i in mr_instances]
-            for name in tb_names:
-                instance = MoonrakerTelegramBot(suffix=name)
-                instance.create()
-
-                cmd_sysctl_service(instance.service_file_path.name, "enable")
-
-                if create_example_cfg:
-                    Logger.print_status(
-                        f"Creating Telegram Bot config in {instance.base.cfg_dir} ..."
-                    )
-                    template = TG_BOT_DIR.joinpath("scripts/base_install_template")
-                    target_file = instance.cfg_file
-                    if not target_file.exists():
-                        show_config_dialog = True
-                        run(["cp", template, target_file], check=True)
-                    else:
-                        Logger.print_info(
-                            f"Telegram Bot config in {instance.base.cfg_dir} already exists! Skipped ..."
-                        )
+            with UnitTransaction() as transaction:
+                for name in tb_names:
+                    instance = MoonrakerTelegramBot(suffix=name)
+                    instance.create()
 
-                cmd_sysctl_service(instance.service_file_path.name, "start")
+                    transaction.enable(instance.service_file_path.name)
 
-            cmd_sysctl_manage("daemon-reload")
+                    if create_example_cfg:
+                        cfg_dir = instance.base.cfg_dir
+                        Logger.print_status(
+                            f"Creating Telegram Bot config in {cfg_dir} ..."
+                        )
+                        template = TG_BOT_DIR.joinpath("scripts/base_install_template")
+                        target_file = instance.cfg_file
+                        if not target_file.exists():
+                            show_config_dialog = True
+                            run(["cp", template, target_file], check=True)
+                        else:
+                            Logger.print_info(
+                                f"Telegram Bot config in {instance.base.cfg_dir} already exists! Skipped ..."
+                            )
+
+                    transaction.start(instance.service_file_path.name)
 
             # add to moonraker update manager
             self._patch_bot_update_manager(mr_instances)
@@ -187,11 +186,12 @@ class TelegramBotExtension(BaseExtension):
         self,
         instance_list: List[MoonrakerTelegramBot],
     ) -> None:
-        for instance in instance_list:
-            Logger.print_status(
-                f"Removing instance {instance.service_file_path.stem} ..."
-            )
-            InstanceManager.remove(instance)
+        with UnitTransaction():
+            for instance in instance_list:
+                Logger.print_status(
+                    f"Removing instance {instance.service_file_path.stem} ..."
+                )
+                InstanceManager.remove(instance)
 
     def _remove_bot_dir(self) -> None:
         if not TG_BOT_DIR.exists():
@@ -11,6 +11,9 @@ import sys
 
 from core.logger import Logger
 from core.menus.main_menu import MainMenu
+from core.menus.update_menu import get_remote_prefetch_probes
+from core.services.privileged_client import PrivilegedClient
+from core.services.remote_prefetcher import RemotePrefetcher
 from core.settings.kiauh_settings import KiauhSettings
 
 
@@ -22,7 +25,10 @@ def ensure_encoding() -> None:
 
 def main() -> None:
     try:
-        KiauhSettings()
+        settings = KiauhSettings()
+        if settings.kiauh.use_privileged_worker:
+            PrivilegedClient().start()
+        RemotePrefetcher().start(get_remote_prefetch_probes())
         ensure_encoding()
         MainMenu().run()
     except KeyboardInterrupt:
@@ -31,6 +31,7 @@ from components.moonraker.moonraker_setup import install_moonraker_packages
 from core.backup_manager.backup_manager import BackupManager, BackupManagerException
 from core.instance_manager.instance_manager import InstanceManager
 from core.logger import Logger
+from core.services.bytecode import precompile_bytecode
 from core.settings.kiauh_settings import RepoSettings
 from utils.git_utils import GitException, get_repo_name, git_clone_wrapper
 from utils.instance_utils import get_instances
@@ -51,6 +52,7 @@ def run_switch_repo_routine(
     repo_dir: Path = KLIPPER_DIR if name == "klipper" else MOONRAKER_DIR
     env_dir: Path = KLIPPER_ENV_DIR if name == "klipper" else MOONRAKER_ENV_DIR
     req_file = KLIPPER_REQ_FILE if name == "klipper" else MOONRAKER_REQ_FILE
+    pkg_dir = "klippy" if name == "klipper" else "moonraker"
     backup_dir: Path = KLIPPER_BACKUP_DIR if name == "klipper" else MOONRAKER_BACKUP_DIR
     _type = Klipper if name == "klipper" else Moonraker
 
@@ -101,6 +103,7 @@ def run_switch_repo_routine(
             raise GitException(f"Failed to recreate virtualenv for {_type.__name__}")
         else:
             install_python_requirements(env_dir, req_file)
+            precompile_bytecode(env_dir, [repo_dir.joinpath(pkg_dir)])
 
         Logger.print_ok(f"Switched to {repo_url} at branch {branch}!")
 
@@ -12,15 +12,24 @@ from __future__ import annotations
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Literal, Set
+from subprocess import CalledProcessError
+from typing import Callable, Dict, List, Literal, Set
 
 from components.klipper.klipper import Klipper
 from components.moonraker.moonraker import Moonraker
 from core.constants import (
     GLOBAL_DEPS,
     PRINTER_DATA_BACKUP_DIR,
+    SYSTEMD,
 )
 from core.logger import DialogType, Logger
+from core.services.deb_bundle import (
+    export_deb_bundle,
+    release_deb_bundle,
+    use_deb_bundle,
+)
+from core.services.status_cache import StatusCache, get_git_dependencies
+from core.settings.kiauh_settings import KiauhSettings
 from core.types.color import Color
 from core.types.component_status import ComponentStatus, StatusCode
 from utils.git_utils import (
@@ -37,13 +46,15 @@ from utils.sys_utils import (
     update_system_package_lists,
 )
 
+from kiauh import PROJECT_ROOT
+
 
 def get_kiauh_version() -> str:
     """
     Helper method to get the current KIAUH version by reading the latest tag
     :return: string of the latest tag
     """
-    lastest_tag: str = get_local_tags(Path(__file__).parent.parent)[-1]
+    lastest_tag: str = get_local_tags(PROJECT_ROOT)[-1]
     return lastest_tag
 
 
@@ -85,8 +96,58 @@ def check_install_dependencies(
         Logger.print_info("The following packages need installation:")
         for r in requirements:
             print(Color.apply(f"● {r}", Color.CYAN))
+
+        settings = KiauhSettings()
+        mode = settings.kiauh.deb_bundle_mode
+        bundle_dir = Path(str(settings.kiauh.deb_bundle_dir)).expanduser()
+
+        # the regular lists are updated before the bundle is imported, as
+        # updating the bundle lists makes the regular lists look up to date
         update_system_package_lists(silent=False)
-        install_system_packages(requirements)
+
+        source_file = use_deb_bundle(bundle_dir) if mode == "import" else None
+        try:
+            install_system_packages(requirements)
+        finally:
+            if source_file is not None:
+                release_deb_bundle(source_file, bundle_dir)
+
+        if mode == "export":
+            # the dependencies are added to the bundle as well, including the
+            # ones that were installed on this host already
+            _export_deb_bundle(bundle_dir, sorted(requirements))
+
+
+def _export_deb_bundle(bundle_dir: Path, packages: List[str]) -> None:
+    Logger.print_status(f"Exporting packages to {bundle_dir} ...")
+    try:
+        exported = export_deb_bundle(bundle_dir, packages)
+        Logger.print_ok(f"{len(exported)} package(s) added to the bundle!")
+    except (OSError, CalledProcessError) as e:
+        Logger.print_error(f"Error exporting packages: {e}")
+
+
+def install_planned_dependencies(
+    sources: Dict[str, Callable[[], List[str]]], include_global: bool = True
+) -> None:
+    """
+    Collects the system packages of several components and installs all of the
+    missing ones with a single apt run. Running this before the install or update
+    steps of the components means their own dependency checks find everything
+    installed already and don't run apt again. |
+    :param sources: Dict of component names and functions returning their packages
+    :param include_global: Wether to include the global dependencies or not
+    :return: None
+    """
+    deps: Set[str] = set()
+    for name, get_packages in sources.items():
+        try:
+            deps.update(get_packages())
+        except (OSError, ValueError) as e:
+            # the component step will report this error again on its own
+            Logger.print_warn(f"Unable to read the dependencies of {name}: {e}")
+
+    check_install_dependencies(deps, include_global)
 
 
 def get_install_status(
@@ -103,6 +164,54 @@ def get_install_status(
     :param files: List of optional files to check for existence
     :return: Dictionary with status string, statuscode and instance count
     """
+    key = (
+        repo_dir,
+        env_dir,
+        instance_type.__name__ if instance_type is not None else None,
+        tuple(files) if files is not None else None,
+    )
+    dependencies = get_status_dependencies(repo_dir, env_dir, instance_type, files)
+
+    return StatusCache().get(
+        key,
+        dependencies,
+        lambda: _get_install_status(repo_dir, env_dir, instance_type, files),
+    )
+
+
+def get_status_dependencies(
+    repo_dir: Path,
+    env_dir: Path | None = None,
+    instance_type: type | None = None,
+    files: List[Path] | None = None,
+) -> List[Path]:
+    """
+    Get all paths the installation status of a software component depends on.
+    If none of them changed, the status of the component did not change either. |
+    :param repo_dir: the repository directory
+    :param env_dir: the python environment directory
+    :param instance_type: The component type
+    :param files: List of optional files to check for existence
+    :return: List of paths
+    """
+    dependencies: List[Path] = [repo_dir, *get_git_dependencies(repo_dir)]
+
+    if env_dir is not None:
+        dependencies.append(env_dir)
+    if instance_type is not None:
+        dependencies.append(SYSTEMD)
+    if files is not None:
+        dependencies.extend(files)
+
+    return dependencies
+
+
+def _get_install_status(
+    repo_dir: Path,
+    env_dir: Path | None = None,
+    instance_type: type | None = None,
+    files: List[Path] | None = None,
+) -> ComponentStatus:
     from utils.instance_utils import get_instances
 
     checks = []
@@ -8,18 +8,86 @@
 # ======================================================================= #
 from __future__ import annotations
 
+import os
 import shutil
 import tempfile
+import threading
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
 from core.logger import Logger
+from core.submodules.simple_config_parser.src.simple_config_parser.constants import (
+    SECTION_RE,
+)
 from core.submodules.simple_config_parser.src.simple_config_parser.simple_config_parser import (
     SimpleConfigParser,
 )
 from utils.instance_type import InstanceType
 
 ConfigOption = Tuple[str, str]
+ConfigSection = Tuple[str, int]
+
+# cache for the sections of config files keyed by path, the value
+# holds the (inode, mtime, size) triple the sections were read from
+_sections_cache: Dict[Path, Tuple[Tuple[int, int, int], List[ConfigSection]]] = {}
+_sections_lock = threading.Lock()
+
+
+def scan_config_sections(cfg_file: Path) -> Iterator[ConfigSection]:
+    """
+    Streams a config file and yields the name and line number of each section
+    header, without parsing any options |
+    :param cfg_file: the config file to scan
+    :return: Iterator of section name and zero-based line number tuples
+    """
+    with open(cfg_file, "r") as f:
+        for line_no, line in enumerate(f):
+            # cheap pre-check, every section header starts with a bracket
+            if not line.startswith("["):
+                continue
+            match = SECTION_RE.match(line)
+            if match:
+                yield match.group(1), line_no
+
+
+def get_config_sections(cfg_file: Path) -> List[ConfigSection]:
+    """
+    Get the sections of a config file. The result is cached until the inode,
+    mtime or size of the file change. |
+    :param cfg_file: the config file to scan
+    :return: List of section name and zero-based line number tuples or an
+        empty list if the file does not exist
+    """
+    try:
+        stat = os.stat(cfg_file)
+    except OSError:
+        return []
+
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _sections_lock:
+        cached = _sections_cache.get(cfg_file)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    try:
+        sections = list(scan_config_sections(cfg_file))
+    except OSError:
+        return []
+
+    with _sections_lock:
+        _sections_cache[cfg_file] = (key, sections)
+
+    return sections
+
+
+def has_config_section(cfg_file: Path, section: str) -> bool:
+    """
+    Checks if a config file contains the given section |
+    :param cfg_file: the config file to check
+    :param section: the section name without brackets, e.g. "include mainsail.cfg"
+    :return: True if the section exists, False otherwise
+    """
+    return any(name == section for name, _ in get_config_sections(cfg_file))
 
 
 def add_config_section(
@@ -38,12 +106,12 @@ def add_config_section(
             Logger.print_warn(f"'{cfg_file}' not found!")
             continue
 
-        scp = SimpleConfigParser()
-        scp.read_file(cfg_file)
-        if scp.has_section(section):
+        if has_config_section(cfg_file, section):
             Logger.print_info("Section already exist. Skipped ...")
             continue
 
+        scp = SimpleConfigParser()
+        scp.read_file(cfg_file)
         scp.add_section(section)
 
         if options is not None:
@@ -90,12 +158,12 @@ def remove_config_section(
             Logger.print_warn(f"'{cfg_file}' not found!")
             continue
 
-        scp = SimpleConfigParser()
-        scp.read_file(cfg_file)
-        if not scp.has_section(section):
+        if not has_config_section(cfg_file, section):
             Logger.print_info("Section does not exist. Skipped ...")
             continue
 
+        scp = SimpleConfigParser()
+        scp.read_file(cfg_file)
         scp.remove_section(section)
         scp.write_file(cfg_file)
 
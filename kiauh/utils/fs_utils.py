@@ -10,7 +10,6 @@
 # ======================================================================= #
 from __future__ import annotations
 
-import re
 import shutil
 from pathlib import Path
 from subprocess import DEVNULL, PIPE, CalledProcessError, call, check_output, run
@@ -18,7 +17,9 @@ from typing import List
 from zipfile import ZipFile
 
 from core.decorators import deprecated
+from core.instance_manager.instance_registry import InstanceRegistry
 from core.logger import Logger
+from core.services.privileged_client import check_privileged_result, run_privileged
 
 
 def check_file_exist(file_path: Path, sudo=False) -> bool:
@@ -29,6 +30,9 @@ def check_file_exist(file_path: Path, sudo=False) -> bool:
     :return: True, if file exists, otherwise False
     """
     if sudo:
+        results = run_privileged([{"op": "exists", "path": file_path.as_posix()}])
+        if results is not None:
+            return bool(results[0].get("ok") and results[0].get("value"))
         try:
             command = ["sudo", "find", file_path.as_posix()]
             check_output(command, stderr=DEVNULL)
@@ -46,6 +50,11 @@ def create_symlink(source: Path, target: Path, sudo=False) -> None:
     try:
         cmd = ["ln", "-sf", source.as_posix(), target.as_posix()]
         if sudo:
+            op = {"op": "symlink", "src": source.as_posix(), "dst": target.as_posix()}
+            results = run_privileged([op])
+            if results is not None:
+                check_privileged_result(results[0], cmd)
+                return
             cmd.insert(0, "sudo")
         run(cmd, stderr=PIPE, check=True)
     except CalledProcessError as e:
@@ -53,6 +62,38 @@ def create_symlink(source: Path, target: Path, sudo=False) -> None:
         raise
 
 
+def copy_with_sudo(source: Path, target: Path) -> None:
+    """
+    Copies a file to a location that requires root permissions |
+    :param source: the file to copy
+    :param target: the target file or directory
+    :return: None
+    :raises CalledProcessError: if the file could not be copied
+    """
+    cmd = ["cp", source.as_posix(), target.as_posix()]
+    results = run_privileged([{"op": "copy", "src": cmd[1], "dst": cmd[2]}])
+    if results is not None:
+        check_privileged_result(results[0], cmd)
+        return
+    run(["sudo", *cmd], stderr=PIPE, check=True)
+
+
+def move_with_sudo(source: Path, target: Path) -> None:
+    """
+    Moves a file to a location that requires root permissions |
+    :param source: the file to move
+    :param target: the target file or directory
+    :return: None
+    :raises CalledProcessError: if the file could not be moved
+    """
+    cmd = ["mv", source.as_posix(), target.as_posix()]
+    results = run_privileged([{"op": "move", "src": cmd[1], "dst": cmd[2]}])
+    if results is not None:
+        check_privileged_result(results[0], cmd)
+        return
+    run(["sudo", *cmd], stderr=PIPE, check=True)
+
+
 def remove_with_sudo(files: Path | List[Path]) -> bool:
     _files = []
     _removed = []
@@ -61,6 +102,21 @@ def remove_with_sudo(files: Path | List[Path]) -> bool:
     else:
         _files.append(files)
 
+    # remove all files with a single request if the privileged worker is running
+    ops = [{"op": "remove", "path": f.as_posix()} for f in _files]
+    results = run_privileged(ops) if ops else None
+    if results is not None:
+        for f, result in zip(_files, results):
+            try:
+                if not check_privileged_result(result, ["rm", "-rf", f.as_posix()]):
+                    Logger.print_info(f"File '{f}' does not exist. Skipped ...")
+                    continue
+                Logger.print_ok(f"File '{f}' was successfully removed!")
+                _removed.append(f)
+            except CalledProcessError as e:
+                Logger.print_error(f"Error removing file '{f}': {e}")
+        return len(_removed) > 0
+
     for f in _files:
         try:
             cmd = ["sudo", "find", f.as_posix()]
@@ -145,14 +201,10 @@ def get_data_dir(instance_type: type, suffix: str) -> Path:
     # if the service file exists, we read the data dir path from it
     # this also ensures compatibility with pre v6.0.0 instances
     service_file_path: Path = get_service_file_path(instance_type, suffix)
-    if service_file_path and service_file_path.exists():
-        with open(service_file_path, "r") as service_file:
-            lines = service_file.readlines()
-            for line in lines:
-                pattern = r"^EnvironmentFile=(.+)(/systemd/.+\.env)"
-                match = re.search(pattern, line)
-                if match:
-                    return Path(match.group(1))
+    if service_file_path:
+        data_dir = InstanceRegistry().get_data_dir(service_file_path)
+        if data_dir is not None:
+            return data_dir
 
     if suffix != "":
         # this is the new data dir naming scheme introduced in v6.0.0
@@ -0,0 +1,273 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SHA_RE = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+CONFIG_SECTION_RE = re.compile(r'^\[\s*([\w.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*]')
+CONFIG_OPTION_RE = re.compile(r"^([A-Za-z][\w-]*)\s*(?:=\s*(.*))?$")
+
+# refs that belong to a single worktree and are therefore not read from the
+# common git directory, see 'git help worktree' for details
+PER_WORKTREE_REFS = ("refs/bisect/", "refs/worktree/", "refs/rewritten/")
+
+# cache for parsed packed-refs files keyed by path, the value holds
+# the (mtime, size) pair the content was parsed from
+_packed_refs_cache: Dict[Path, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+_packed_refs_lock = threading.Lock()
+
+
+class GitReader:
+    """
+    Reads branches, refs, tags and config values of a local git repository
+    directly from the files in its git directory, without spawning git. Supports
+    regular repositories, gitfile indirection (submodules) and linked worktrees.
+    """
+
+    def __init__(self, repo: Path) -> None:
+        self.repo = repo
+        git_dir = self._find_git_dir(repo)
+        common_dir = self._find_common_dir(git_dir) if git_dir is not None else None
+        # missing or broken repositories fall back to the default layout, whose
+        # files don't exist, so all lookups come up empty, see is_supported
+        self.git_dir: Path = git_dir or repo.joinpath(".git")
+        self.common_dir: Path = common_dir or self.git_dir
+        self._is_found = git_dir is not None and common_dir is not None
+
+    @property
+    def is_supported(self) -> bool:
+        """
+        Whether the repository can be read without the git CLI. This is not the
+        case for missing or broken repositories and for the reftable ref backend
+        """
+        if not self._is_found:
+            return False
+        if not self.git_dir.joinpath("HEAD").is_file():
+            return False
+        ref_storage = self.get_config_value("extensions", "refstorage")
+        return ref_storage is None or ref_storage.lower() == "files"
+
+    def get_head(self) -> Tuple[str | None, str | None]:
+        """
+        Read HEAD of the repository |
+        :return: Tuple of the symbolic ref (None if detached) and the commit sha
+        """
+        content = self._read_text(self.git_dir.joinpath("HEAD"))
+        if content is None:
+            return None, None
+        if content.startswith("ref:"):
+            ref = content[4:].strip()
+            return ref, self.resolve_ref(ref)
+        return None, content if SHA_RE.match(content) else None
+
+    def get_current_branch(self) -> str:
+        """
+        Get the name of the checked out branch |
+        :return: branch name or an empty string for a detached HEAD
+        """
+        ref, _ = self.get_head()
+        if ref is None or not ref.startswith("refs/heads/"):
+            return ""
+        return ref[len("refs/heads/") :]
+
+    def resolve_ref(self, ref: str, depth: int = 0) -> str | None:
+        """
+        Resolve a ref to the sha it points to. Symbolic refs are followed. |
+        :param ref: full name of the ref, e.g. 'refs/remotes/origin/master'
+        :param depth: recursion depth used to detect symbolic ref loops
+        :return: sha or None if the ref does not exist
+        """
+        if depth > 5:
+            return None
+
+        content = self._read_text(self._get_ref_path(ref))
+        if content is not None:
+            if content.startswith("ref:"):
+                return self.resolve_ref(content[4:].strip(), depth + 1)
+            return content if SHA_RE.match(content) else None
+
+        return self.get_packed_refs().get(ref)
+
+    def get_refs(self, prefix: str) -> Dict[str, str]:
+        """
+        Get all refs starting with the given prefix |
+        :param prefix: prefix of the refs, e.g. 'refs/tags/'
+        :return: Dict of full ref names and the sha they point to
+        """
+        refs = {
+            name: sha
+            for name, sha in self.get_packed_refs().items()
+            if name.startswith(prefix)
+        }
+
+        # loose refs take precedence over packed ones
+        base = self.common_dir
+        ref_dir = base.joinpath(prefix)
+        for root, _, files in os.walk(ref_dir):
+            for file in files:
+                path = Path(root, file)
+                name = path.relative_to(base).as_posix()
+                if name.endswith(".lock"):
+                    continue
+                content = self._read_text(path)
+                if content is not None and SHA_RE.match(content):
+                    refs[name] = content
+
+        return refs
+
+    def get_tags(self) -> List[str]:
+        """
+        Get the names of all tags of the repository |
+        :return: unsorted list of tag names
+        """
+        prefix = "refs/tags/"
+        return [name[len(prefix) :] for name in self.get_refs(prefix)]
+
+    def get_packed_refs(self) -> Dict[str, str]:
+        """
+        Parse the packed-refs file of the repository. The result is cached until
+        size or mtime of the file change. |
+        :return: Dict of full ref names and the sha they point to
+        """
+        path = self.common_dir.joinpath("packed-refs")
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return {}
+
+        key = (stat.st_mtime_ns, stat.st_size)
+        with _packed_refs_lock:
+            cached = _packed_refs_cache.get(path)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        refs: Dict[str, str] = {}
+        content = self._read_text(path) or ""
+        for line in content.splitlines():
+            # skip the header and peeled lines of annotated tags
+            if not line or line.startswith("#") or line.startswith("^"):
+                continue
+            parts = line.split(" ", 1)
+            if len(parts) == 2 and SHA_RE.match(parts[0]):
+                refs[parts[1].strip()] = parts[0]
+
+        with _packed_refs_lock:
+            _packed_refs_cache[path] = (key, refs)
+
+        return refs
+
+    def get_config_value(
+        self, section: str, key: str, subsection: str | None = None
+    ) -> str | None:
+        """
+        Read a value from the config file of the repository, e.g. the url of the
+        origin remote with get_config_value("remote", "url", "origin") |
+        :param section: the section name, case-insensitive
+        :param key: the option name, case-insensitive
+        :param subsection: optional subsection name, case-sensitive
+        :return: the last value defined for the option or None
+        """
+        content = self._read_text(self.common_dir.joinpath("config"), strip=False)
+        if content is None:
+            return None
+
+        value: str | None = None
+        in_section = False
+        for raw_line in content.splitlines():
+            line = raw_line.strip()
+            if not line or line[0] in "#;":
+                continue
+
+            section_match = CONFIG_SECTION_RE.match(line)
+            if section_match:
+                name, sub = section_match.group(1), section_match.group(2)
+                # old-style [section.subsection] headers
+                if sub is None and "." in name:
+                    name, sub = name.split(".", 1)
+                in_section = name.lower() == section.lower() and sub == subsection
+                line = line[section_match.end() :].strip()
+                if not line:
+                    continue
+
+            if not in_section:
+                continue
+
+            option_match = CONFIG_OPTION_RE.match(line)
+            if option_match and option_match.group(1).lower() == key.lower():
+                value = self._parse_config_value(option_match.group(2))
+
+        return value
+
+    def _get_ref_path(self, ref: str) -> Path:
+        if ref == "HEAD" or not ref.startswith("refs/"):
+            return self.git_dir.joinpath(ref)
+        if ref.startswith(PER_WORKTREE_REFS):
+            return self.git_dir.joinpath(ref)
+        return self.common_dir.joinpath(ref)
+
+    def _parse_config_value(self, raw: str | None) -> str:
+        if raw is None:
+            # a key without a value is a boolean true
+            return "true"
+
+        value, in_quotes, escaped = [], False, False
+        for char in raw:
+            if escaped:
+                value.append({"n": "\n", "t": "\t", "b": "\b"}.get(char, char))
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_quotes = not in_quotes
+            elif char in "#;" and not in_quotes:
+                break
+            else:
+                value.append(char)
+
+        return "".join(value).strip()
+
+    def _find_git_dir(self, repo: Path) -> Path | None:
+        dot_git = repo.joinpath(".git")
+        if dot_git.is_dir():
+            return dot_git
+        if not dot_git.is_file():
+            return None
+
+        # gitfile indirection as used by submodules and linked worktrees
+        content = self._read_text(dot_git)
+        if content is None or not content.startswith("gitdir:"):
+            return None
+        git_dir = Path(content[len("gitdir:") :].strip())
+        if not git_dir.is_absolute():
+            git_dir = repo.joinpath(git_dir)
+        return git_dir.resolve() if git_dir.is_dir() else None
+
+    def _find_common_dir(self, git_dir: Path) -> Path | None:
+        # linked worktrees keep everything but HEAD and per-worktree
+        # refs in the git directory of the main worktree
+        content = self._read_text(git_dir.joinpath("commondir"))
+        if content is None:
+            return git_dir
+        common_dir = Path(content)
+        if not common_dir.is_absolute():
+            common_dir = git_dir.joinpath(common_dir)
+        return common_dir.resolve() if common_dir.is_dir() else None
+
+    def _read_text(self, path: Path, strip: bool = True) -> str | None:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                content = f.read()
+        except OSError:
+            return None
+        return content.strip() if strip else content
@@ -1,21 +1,39 @@
 from __future__ import annotations
 
-import json
 import re
 import shutil
-import urllib.request
-from http.client import HTTPResponse
+import threading
+from fnmatch import fnmatchcase
 from json import JSONDecodeError
 from pathlib import Path
 from subprocess import DEVNULL, PIPE, CalledProcessError, check_output, run
-from typing import List, Tuple, Type
+from typing import Dict, List, Set, Tuple, Type
 
+from core.constants import GITHUB_API_URL, KIAUH_DATA_DIR
 from core.instance_manager.instance_manager import InstanceManager
 from core.logger import Logger
+from core.services.http_cache import HttpCache
+from core.settings.kiauh_settings import KiauhSettings
+from utils.git_reader import GitReader
 from utils.input_utils import get_confirm, get_number_input
 from utils.instance_type import InstanceType
 from utils.instance_utils import get_instances
 
+GIT_MIRRORS_DIR = KIAUH_DATA_DIR.joinpath("mirrors")
+MIRROR_REFSPECS = ["+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"]
+# deepen steps of a shallow clone to reach the last tag, each doubles the amount
+MAX_DEEPEN_STEPS = 5
+
+# memoized results of 'git describe', see _describe_commit()
+_describe_cache: Dict[Tuple, str] = {}
+_describe_lock = threading.Lock()
+
+_http_cache = HttpCache()
+
+# repositories whose remote was fetched ahead of an update, see git_cmd_fetch()
+_fetched: Set[Path] = set()
+_fetched_lock = threading.Lock()
+
 
 class GitException(Exception):
     pass
@@ -45,6 +63,7 @@ def git_clone_wrapper(
 
         git_cmd_clone(repo, target_dir)
         git_cmd_checkout(branch, target_dir)
+        git_cmd_deepen_to_tag(target_dir)
     except CalledProcessError:
         log = "An unexpected error occured during cloning of the repository."
         Logger.print_error(log)
@@ -80,18 +99,24 @@ def get_repo_name(repo: Path) -> Tuple[str, str]:
     if not repo.exists() or not repo.joinpath(".git").exists():
         return "-", "-"
 
-    try:
-        cmd = ["git", "-C", repo.as_posix(), "config", "--get", "remote.origin.url"]
-        result: str = check_output(cmd, stderr=DEVNULL).decode(encoding="utf-8")
-        substrings: List[str] = result.strip().split("/")[-2:]
-
-        orga: str = substrings[0] if substrings[0] else "-"
-        name: str = substrings[1] if substrings[1] else "-"
+    reader = GitReader(repo)
+    if reader.is_supported:
+        result = reader.get_config_value("remote", "url", "origin") or ""
+    else:
+        try:
+            cmd = ["git", "-C", repo.as_posix(), "config", "--get", "remote.origin.url"]
+            result = check_output(cmd, stderr=DEVNULL).decode(encoding="utf-8")
+        except CalledProcessError:
+            return "-", "-"
+
+    substrings: List[str] = result.strip().split("/")[-2:]
+    if len(substrings) < 2:
+        return "-", "-"
 
-        return orga, name.replace(".git", "")
+    orga: str = substrings[0] if substrings[0] else "-"
+    name: str = substrings[1] if substrings[1] else "-"
 
-    except CalledProcessError:
-        return "-", "-"
+    return orga, name.replace(".git", "")
 
 
 def get_current_branch(repo: Path) -> str:
@@ -100,6 +125,10 @@ def get_current_branch(repo: Path) -> str:
     :param repo: Path to the local Git repository
     :return: Current branch
     """
+    reader = GitReader(repo)
+    if reader.is_supported:
+        return reader.get_current_branch()
+
     try:
         cmd = ["git", "branch", "--show-current"]
         result: str = check_output(cmd, stderr=DEVNULL, cwd=repo).decode(
@@ -107,7 +136,7 @@ def get_current_branch(repo: Path) -> str:
         )
         return result.strip() if result else "-"
 
-    except CalledProcessError:
+    except (CalledProcessError, OSError):
         return "-"
 
 
@@ -115,49 +144,43 @@ def get_local_tags(repo_path: Path, _filter: str | None = None) -> List[str]:
     """
     Get all tags of a local Git repository
     :param repo_path: Path to the local Git repository
-    :param _filter: Optional filter to filter the tags by
+    :param _filter: Optional glob pattern to filter the tags by
     :return: List of tags
     """
-    try:
-        cmd: List[str] = ["git", "tag", "-l"]
-
-        if _filter is not None:
-            cmd.append(f"'${_filter}'")
-
-        result: str = check_output(
-            cmd,
-            stderr=DEVNULL,
-            cwd=repo_path.as_posix(),
-        ).decode(encoding="utf-8")
-
-        tags: List[str] = result.split("\n")[:-1]
-
-        return sorted(tags, key=lambda x: [int(i) if i.isdigit() else i for i in
-                                                re.split(r'(\d+)', x)])
-
-    except CalledProcessError:
-        return []
+    reader = GitReader(repo_path)
+    if reader.is_supported:
+        tags: List[str] = reader.get_tags()
+    else:
+        try:
+            cmd: List[str] = ["git", "tag", "-l"]
+            result: str = check_output(
+                cmd,
+                stderr=DEVNULL,
+                cwd=repo_path.as_posix(),
+            ).decode(encoding="utf-8")
+            tags = result.split("\n")[:-1]
+        except (CalledProcessError, OSError):
+            return []
+
+    if _filter is not None:
+        tags = [tag for tag in tags if fnmatchcase(tag, _filter)]
+
+    return sorted(tags, key=lambda x: [int(i) if i.isdigit() else i for i in
+                                            re.split(r'(\d+)', x)])
 
 
 def get_remote_tags(repo_path: str) -> List[str]:
     """
-    Gets the tags of a GitHub repostiory
+    Gets the tags of a GitHub repostiory. Responses are cached on disk and
+    revalidated with GitHub once the cached response is outdated.
     :param repo_path: path of the GitHub repository - e.g. `<owner>/<name>`
     :return: List of tags
     """
     try:
-        url = f"https://api.github.com/repos/{repo_path}/tags"
-        with urllib.request.urlopen(url) as r:
-            response: HTTPResponse = r
-            if response.getcode() != 200:
-                Logger.print_error(
-                    f"Error retrieving tags: HTTP status code {response.getcode()}"
-                )
-                return []
-
-            data = json.loads(response.read())
-            return [item["name"] for item in data]
-    except (JSONDecodeError, TypeError) as e:
+        url = f"{GITHUB_API_URL}/repos/{repo_path}/tags"
+        data = _http_cache.get_json(url)
+        return [item["name"] for item in data]
+    except (JSONDecodeError, TypeError, KeyError) as e:
         Logger.print_error(f"Error while processing the response: {e}")
         raise
 
@@ -228,10 +251,22 @@ def get_local_commit(repo: Path) -> str | None:
     if not repo.exists() or not repo.joinpath(".git").exists():
         return None
 
+    return _describe_commit(repo, "HEAD")
+
+
+def read_upstream_file(repo: Path, file: Path) -> str | None:
+    """
+    Read a file of a repository as it is in the upstream branch, i.e. as it will
+    be after the next pull, without touching the working tree |
+    :param repo: Path to the local Git repository
+    :param file: Path of the file in the working tree of the repository
+    :return: the content or None if the upstream branch or the file doesn't exist
+    """
     try:
-        cmd = "git describe HEAD --always --tags | cut -d '-' -f 1,2"
-        return check_output(cmd, shell=True, text=True, cwd=repo).strip()
-    except CalledProcessError:
+        path = file.relative_to(repo).as_posix()
+        cmd = ["git", "show", f"@{{upstream}}:{path}"]
+        return check_output(cmd, cwd=repo, text=True, stderr=DEVNULL)
+    except (CalledProcessError, OSError, ValueError):
         return None
 
 
@@ -239,23 +274,138 @@ def get_remote_commit(repo: Path) -> str | None:
     if not repo.exists() or not repo.joinpath(".git").exists():
         return None
 
+    branch = get_current_branch(repo)
+    return _describe_commit(repo, f"origin/{branch}")
+
+
+def _describe_commit(repo: Path, rev: str) -> str | None:
+    """
+    Describe a revision by its nearest tag and the distance to it, shortened to
+    the form "<tag>-<distance>". The revision is resolved in-process and the
+    output of 'git describe' is memoized by commit, tags and shallow boundary,
+    so git only runs if one of them changed. |
+    :param repo: Path to the local Git repository
+    :param rev: 'HEAD' or a remote tracking branch like 'origin/master'
+    :return: the description or None if the revision does not exist
+    """
+    reader = GitReader(repo)
+    key: Tuple | None = None
+    if reader.is_supported:
+        if rev == "HEAD":
+            _, sha = reader.get_head()
+        else:
+            sha = reader.resolve_ref(f"refs/remotes/{rev}")
+        if sha is None:
+            return None
+
+        tags = tuple(sorted(reader.get_refs("refs/tags/").items()))
+        # deepening a shallow clone can make more tags reachable
+        shallow = reader.common_dir.joinpath("shallow")
+        boundary = shallow.read_text() if shallow.is_file() else ""
+        key = (reader.common_dir, sha, tags, boundary)
+        with _describe_lock:
+            if key in _describe_cache:
+                return _describe_cache[key]
+        rev = sha
+
     try:
-        branch = get_current_branch(repo)
-        cmd = f"git describe 'origin/{branch}' --always --tags | cut -d '-' -f 1,2"
-        return check_output(
-            cmd,
-            shell=True,
-            text=True,
-            cwd=repo,
-            stderr=DEVNULL,
-        ).strip()
-    except CalledProcessError:
+        cmd = ["git", "describe", rev, "--always", "--tags"]
+        result = check_output(cmd, text=True, cwd=repo, stderr=DEVNULL)
+    except (CalledProcessError, OSError):
+        return None
+
+    # equivalent of piping the output through "cut -d '-' -f 1,2"
+    description = "-".join(result.strip().split("-")[:2])
+    if key is not None:
+        with _describe_lock:
+            _describe_cache[key] = description
+
+    return description
+
+
+def get_clone_args() -> List[str]:
+    """
+    Get the arguments for 'git clone' of the clone strategy set in the KIAUH
+    settings. A partial clone fetches the full history but downloads the file
+    contents of older commits only when they are needed, a shallow clone only
+    fetches the last commits of each branch. |
+    :return: List of arguments
+    """
+    settings = KiauhSettings().kiauh
+    strategy = settings.clone_strategy
+    if strategy == "partial":
+        return ["--filter=blob:none"]
+    if strategy == "shallow":
+        # all branches are fetched, so any branch can be checked out afterward
+        depth = max(1, settings.clone_depth or 1)
+        return ["--depth", str(depth), "--no-single-branch"]
+    return []
+
+
+def get_mirror_dir(repo: str) -> Path:
+    """
+    Get the directory of the bare mirror of a repository |
+    :param repo: the URL of the repository
+    :return: Path of the mirror, e.g. "<mirrors>/github.com/Klipper3d/klipper.git"
+    """
+    path = re.sub(r"^[a-z+]+://", "", repo.strip())
+    # scp-like URLs, e.g. "git@github.com:Klipper3d/klipper.git"
+    path = re.sub(r"^[^/@]+@([^/:]+):", r"\1/", path)
+    path = re.sub(r"\.git$", "", path.rstrip("/"))
+    parts = [p for p in re.split(r"[/:]+", path) if p not in ("", ".", "..")]
+    return GIT_MIRRORS_DIR.joinpath(*parts[:-1], f"{parts[-1]}.git")
+
+
+def git_cmd_update_mirror(repo: str) -> Path | None:
+    """
+    Creates the bare mirror of a repository or refreshes it with a single
+    fetch if it exists already |
+    :param repo: the URL of the repository
+    :return: Path of the mirror or None if it could not be created or updated
+    """
+    mirror = get_mirror_dir(repo)
+    git = ["git", "--git-dir", mirror.as_posix()]
+    created = False
+    try:
+        if mirror.joinpath("HEAD").exists():
+            Logger.print_status(f"Updating mirror of '{repo}' ...")
+        else:
+            Logger.print_status(f"Creating mirror of '{repo}' ...")
+            mirror.parent.mkdir(parents=True, exist_ok=True)
+            created = True
+            # unlike 'clone --mirror', only branches and tags are fetched, so the
+            # pull request refs of GitHub never end up in the mirror
+            commands = [
+                ["git", "init", "--bare", "--quiet", mirror.as_posix()],
+                [*git, "remote", "add", "origin", repo],
+                [*git, "config", "remote.origin.fetch", MIRROR_REFSPECS[0]],
+                [*git, "config", "--add", "remote.origin.fetch", MIRROR_REFSPECS[1]],
+            ]
+            for cmd in commands:
+                run(cmd, check=True, stdout=PIPE, stderr=PIPE)
+
+        cmd = [*git, "fetch", "--prune", "--quiet", "origin"]
+        run(cmd, check=True, stdout=PIPE, stderr=PIPE)
+        return mirror
+    except (CalledProcessError, OSError) as e:
+        Logger.print_warn(f"Unable to update mirror, cloning without it: {e}")
+        if created:
+            shutil.rmtree(mirror, ignore_errors=True)
         return None
 
 
 def git_cmd_clone(repo: str, target_dir: Path) -> None:
     try:
-        command = ["git", "clone", repo, target_dir.as_posix()]
+        args = get_clone_args()
+        mirror = None
+        if KiauhSettings().kiauh.use_git_mirrors:
+            mirror = git_cmd_update_mirror(repo)
+        if mirror is not None:
+            # only objects missing in the mirror are fetched from the remote, the
+            # clone gets copies of all objects, so it doesn't depend on the mirror
+            args = ["--reference-if-able", mirror.as_posix(), "--dissociate"]
+
+        command = ["git", "clone", *args, repo, target_dir.as_posix()]
         run(command, check=True)
 
         Logger.print_ok("Clone successful!")
@@ -281,7 +431,34 @@ def git_cmd_checkout(branch: str | None, target_dir: Path) -> None:
         raise
 
 
+def git_cmd_fetch(target_dir: Path) -> None:
+    """
+    Fetches the remote of a repository without touching the working tree. The
+    next pull of the repository merges the fetched commits without contacting
+    the remote again. |
+    :param target_dir: Path of the repository
+    :return: None
+    :raises CalledProcessError: if the fetch failed
+    """
+    command = ["git", "fetch", "--quiet"]
+    run(command, cwd=target_dir, check=True, stdout=PIPE, stderr=PIPE)
+    with _fetched_lock:
+        _fetched.add(target_dir)
+
+
 def git_cmd_pull(target_dir: Path) -> None:
+    with _fetched_lock:
+        fetched = target_dir in _fetched
+        _fetched.discard(target_dir)
+
+    if fetched:
+        # the commits are present already, if the upstream branch can't be
+        # fast-forwarded to, a regular pull decides how to integrate it
+        command = ["git", "merge", "--ff-only", "--quiet", "@{upstream}"]
+        result = run(command, cwd=target_dir, stdout=PIPE, stderr=PIPE)
+        if result.returncode == 0:
+            return
+
     try:
         command = ["git", "pull"]
         run(command, cwd=target_dir, check=True)
@@ -291,9 +468,90 @@ def git_cmd_pull(target_dir: Path) -> None:
         raise
 
 
+def is_shallow_repository(repo_dir: Path) -> bool:
+    try:
+        cmd = ["git", "rev-parse", "--is-shallow-repository"]
+        result = check_output(cmd, cwd=repo_dir, stderr=DEVNULL, text=True)
+        return result.strip() == "true"
+    except (CalledProcessError, OSError):
+        return False
+
+
+def _rev_exists(repo_dir: Path, rev: str) -> bool:
+    cmd = ["git", "rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}"]
+    return run(cmd, cwd=repo_dir, stdout=DEVNULL, stderr=DEVNULL).returncode == 0
+
+
+def git_cmd_deepen(repo_dir: Path, amount: int) -> None:
+    """
+    Makes sure the history of a shallow clone reaches back at least the given
+    amount of commits. The history is deepened by the missing amount first,
+    if that is not sufficient, e.g. because of merge commits, the clone is
+    converted into a full clone. |
+    :param repo_dir: Path of the repository
+    :param amount: the amount of commits that have to be present before HEAD
+    :return: None
+    :raises CalledProcessError: if fetching the history failed
+    """
+    if not is_shallow_repository(repo_dir) or _rev_exists(repo_dir, f"HEAD~{amount}"):
+        return
+
+    Logger.print_status("Fetching missing history of shallow clone ...")
+    cmd = ["git", "fetch", "--deepen", str(amount)]
+    run(cmd, cwd=repo_dir, check=True, stdout=PIPE, stderr=PIPE)
+    if not is_shallow_repository(repo_dir) or _rev_exists(repo_dir, f"HEAD~{amount}"):
+        return
+
+    cmd = ["git", "fetch", "--unshallow"]
+    run(cmd, cwd=repo_dir, check=True, stdout=PIPE, stderr=PIPE)
+
+
+def _has_tag_in_history(repo_dir: Path) -> bool:
+    cmd = ["git", "describe", "--tags", "--abbrev=0", "HEAD"]
+    return run(cmd, cwd=repo_dir, stdout=DEVNULL, stderr=DEVNULL).returncode == 0
+
+
+def _has_remote_tags(repo_dir: Path) -> bool:
+    cmd = ["git", "ls-remote", "--tags", "--refs", "origin"]
+    result = run(cmd, cwd=repo_dir, stdout=PIPE, stderr=DEVNULL, text=True)
+    return result.returncode == 0 and bool(result.stdout.strip())
+
+
+def git_cmd_deepen_to_tag(repo_dir: Path) -> None:
+    """
+    Deepens the history of a shallow clone until it contains the nearest tag.
+    'git describe' only finds the tags in the history of a commit, without them
+    the versions of the components, including the version Klipper compiles into
+    the firmware, would only be the commit hash. Repositories without tags
+    and tags further back than MAX_DEEPEN_STEPS keep the shallow history. |
+    :param repo_dir: Path of the repository
+    :return: None
+    """
+    if not is_shallow_repository(repo_dir) or _has_tag_in_history(repo_dir):
+        return
+    if not _has_remote_tags(repo_dir):
+        return
+
+    Logger.print_status("Fetching history of shallow clone up to the last tag ...")
+    amount = max(1, KiauhSettings().kiauh.clone_depth or 1)
+    try:
+        for _ in range(MAX_DEEPEN_STEPS):
+            cmd = ["git", "fetch", "--deepen", str(amount)]
+            run(cmd, cwd=repo_dir, check=True, stdout=PIPE, stderr=PIPE)
+            if not is_shallow_repository(repo_dir) or _has_tag_in_history(repo_dir):
+                return
+            amount *= 2
+        Logger.print_warn("The last tag is too far back in the history!")
+    except CalledProcessError as e:
+        Logger.print_warn(f"Unable to fetch the last tag: {e.stderr.decode()}")
+    Logger.print_warn("The version is shown as commit hash instead!")
+
+
 def rollback_repository(repo_dir: Path, instance: Type[InstanceType]) -> None:
     q1 = "How many commits do you want to roll back"
     amount = get_number_input(q1, 1, allow_go_back=True)
+    if amount is None:
+        return
 
     instances = get_instances(instance)
 
@@ -312,6 +570,7 @@ def rollback_repository(repo_dir: Path, instance: Type[InstanceType]) -> None:
     InstanceManager.stop_all(instances)
 
     try:
+        git_cmd_deepen(repo_dir, amount)
         cmd = ["git", "reset", "--hard", f"HEAD~{amount}"]
         run(cmd, cwd=repo_dir, check=True, stdout=PIPE, stderr=PIPE)
         Logger.print_ok(f"Rolled back {amount} commits!", start="\n")
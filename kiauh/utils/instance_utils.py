@@ -8,14 +8,29 @@
 # ======================================================================= #
 from __future__ import annotations
 
-import re
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 from core.constants import SYSTEMD
 from core.instance_manager.base_instance import SUFFIX_BLACKLIST
+from core.instance_manager.instance_registry import InstanceRegistry
+from core.types.service_state import ServiceState
 from utils.instance_type import InstanceType
 
+# names of all systemd services that are managed by KIAUH, instances of a
+# service are named "<name>-<suffix>.service" and are included as well
+KIAUH_SERVICE_NAMES: List[str] = [
+    "klipper",
+    "moonraker",
+    "KlipperScreen",
+    "crowsnest",
+    "mobileraker",
+    "moonraker-obico",
+    "moonraker-telegram-bot",
+    "octoeverywhere",
+    "octoapp",
+]
+
 
 def get_instances(instance_type: type, suffix_blacklist: List[str] = SUFFIX_BLACKLIST) -> List[InstanceType]:
     from utils.common import convert_camelcase_to_kebabcase
@@ -24,14 +39,8 @@ def get_instances(instance_type: type, suffix_blacklist: List[str] = SUFFIX_BLAC
         raise ValueError("instance_type must be a class")
 
     name = convert_camelcase_to_kebabcase(instance_type.__name__)
-    pattern = re.compile(f"^{name}(-[0-9a-zA-Z]+)?.service$")
-
-    service_list = [
-        Path(SYSTEMD, service)
-        for service in SYSTEMD.iterdir()
-        if pattern.search(service.name)
-        and not any(s in service.name for s in suffix_blacklist)
-    ]
+    units = InstanceRegistry().find_units(name, "service", suffix_blacklist)
+    service_list = [Path(SYSTEMD, unit) for unit in units]
 
     instance_list = [
         instance_type(get_instance_suffix(name, service)) for service in service_list
@@ -54,3 +63,22 @@ def get_instance_suffix(name: str, file_path: Path) -> str:
     # otherwise there is and hyphen left, and we return the part after the hyphen
     suffix = file_path.stem[len(name) :]
     return suffix[1:] if suffix else ""
+
+
+def get_service_snapshot(extra_services: List[str] | None = None) -> Dict[str, ServiceState]:
+    """
+    Reads the state of all KIAUH managed services, and of any extra services,
+    with a single systemctl call |
+    :param extra_services: Optional list of other services to include
+    :return: Dict of service names and their ServiceState
+    """
+    from utils.sys_utils import get_service_states
+
+    registry = InstanceRegistry()
+    services: List[str] = []
+    for name in KIAUH_SERVICE_NAMES:
+        services.extend(registry.find_units(name, "service"))
+    services.extend(extra_services or [])
+
+    # a service may match more than one name, so we remove duplicates
+    return get_service_states(list(dict.fromkeys(services)))
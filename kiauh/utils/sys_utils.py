@@ -9,20 +9,48 @@
 from __future__ import annotations
 
 import os
-import re
 import select
 import shutil
 import socket
 import sys
+import tempfile
 import time
 import urllib.error
 import urllib.request
+from contextlib import contextmanager
 from pathlib import Path
-from subprocess import DEVNULL, PIPE, CalledProcessError, Popen, check_output, run
-from typing import List, Literal, Set
+from subprocess import (
+    DEVNULL,
+    PIPE,
+    CalledProcessError,
+    CompletedProcess,
+    Popen,
+    check_output,
+    run,
+)
+from typing import Dict, Iterator, List, Literal, Set, Tuple
 
 from core.constants import SYSTEMD
+from core.instance_manager.instance_registry import InstanceRegistry
 from core.logger import Logger
+from core.services.apt_upgrades import get_package_upgrades
+from core.services.dpkg_index import DpkgIndex
+from core.services.pip_versions import (
+    get_installed_version,
+    get_latest_pip_version,
+    is_pip_updated,
+    set_pip_updated,
+)
+from core.services.privileged_client import check_privileged_result, run_privileged
+from core.services.requirements_fingerprint import is_up_to_date, write_fingerprint
+from core.services.unit_transaction import UnitTransaction
+from core.services.venv_seed import VenvSeedError, create_seeded_venv
+from core.services.wheelhouse import Wheelhouse, get_wheelhouse
+from core.types.service_state import (
+    SERVICE_STATE_PROPERTIES,
+    ServiceState,
+    parse_service_state,
+)
 from utils.fs_utils import check_file_exist, remove_with_sudo
 from utils.input_utils import get_confirm
 
@@ -38,6 +66,16 @@ SysCtlServiceAction = Literal[
 ]
 SysCtlManageAction = Literal["daemon-reload", "reset-failed"]
 
+# ActiveState values of a service that count as success for an action
+SYSCTL_TARGET_STATES: Dict[str, Tuple[str, ...]] = {
+    "start": ("active",),
+    "restart": ("active",),
+    "stop": ("inactive", "failed"),
+}
+SYSCTL_ACTIVE_ENTER = "ActiveEnterTimestampMonotonic"
+SYSCTL_POLL_INTERVAL = 0.5
+SYSCTL_WAIT_TIMEOUT = 90.0
+
 
 class VenvCreationFailedException(Exception):
     pass
@@ -78,15 +116,26 @@ def parse_packages_from_file(source_file: Path) -> List[str]:
     :return: A list of package names
     """
 
-    packages = []
     with open(source_file, "r") as file:
-        for line in file:
-            line = line.strip()
-            if line.startswith("PKGLIST="):
-                line = line.replace('"', "")
-                line = line.replace("PKGLIST=", "")
-                line = line.replace("${PKGLIST}", "")
-                packages.extend(line.split())
+        return parse_packages_from_str(file.read())
+
+
+def parse_packages_from_str(content: str) -> List[str]:
+    """
+    Read the package names from the content of a bash script, when defined like:
+    PKGLIST="package1 package2 package3" |
+    :param content: content of the script
+    :return: A list of package names
+    """
+
+    packages = []
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith("PKGLIST="):
+            line = line.replace('"', "")
+            line = line.replace("PKGLIST=", "")
+            line = line.replace("${PKGLIST}", "")
+            packages.extend(line.split())
 
     return packages
 
@@ -111,6 +160,17 @@ def create_python_venv(
         "--system-site-packages"
     ) if allow_access_to_system_site_packages else None
     if not target.exists():
+        try:
+            # creating the env with venv and seeding it from the system wheels takes
+            # a fraction of the time virtualenv needs, which is the fallback
+            create_seeded_venv(
+                target, system_site_packages=allow_access_to_system_site_packages
+            )
+            Logger.print_ok("Setup of virtualenv successful!")
+            return True
+        except VenvSeedError as e:
+            Logger.print_info(f"{e}, falling back to virtualenv ...")
+
         try:
             run(cmd, check=True)
             Logger.print_ok("Setup of virtualenv successful!")
@@ -127,7 +187,7 @@ def create_python_venv(
 
         try:
             shutil.rmtree(target)
-            create_python_venv(target)
+            create_python_venv(target, False, allow_access_to_system_site_packages)
             return True
         except OSError as e:
             log = f"Error removing existing virtualenv: {e.strerror}"
@@ -137,10 +197,20 @@ def create_python_venv(
 
 def update_python_pip(target: Path) -> None:
     """
-    Updates pip in the provided target destination |
+    Updates pip in the provided target destination. Pip is updated at most once
+    per virtualenv and session and not at all if the latest version is installed |
     :param target: Path of the virtualenv
     :return: None
     """
+    if is_pip_updated(target):
+        return
+
+    latest = get_latest_pip_version()
+    if latest is not None and get_installed_version(target, "pip") == latest:
+        Logger.print_info(f"pip {latest} is up to date, skipping update ...")
+        set_pip_updated(target)
+        return
+
     Logger.print_status("Updating pip ...")
     try:
         pip_location: Path = target.joinpath("bin/pip")
@@ -157,6 +227,7 @@ def update_python_pip(target: Path) -> None:
             return
 
         Logger.print_ok("Updating pip successful!")
+        set_pip_updated(target)
     except FileNotFoundError as e:
         Logger.print_error(e)
         raise
@@ -165,31 +236,95 @@ def update_python_pip(target: Path) -> None:
         raise
 
 
-def install_python_requirements(target: Path, requirements: Path) -> None:
+def get_requirement_args(
+    requirements: List[Path], constraints: List[Path] | None = None
+) -> List[str]:
     """
-    Installs the python packages based on a provided requirements.txt |
+    Get the pip arguments for a set of requirements and constraints files |
+    :param requirements: List of requirements files
+    :param constraints: List of constraints files
+    :return: List of pip arguments
+    """
+    args = []
+    for requirement in requirements:
+        args.extend(["-r", requirement.as_posix()])
+    for constraint in constraints or []:
+        args.extend(["-c", constraint.as_posix()])
+    return args
+
+
+@contextmanager
+def measure_phase(timings: Dict[str, float], phase: str) -> Iterator[None]:
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.monotonic() - start
+
+
+def print_phase_timings(timings: Dict[str, float]) -> None:
+    phases = ", ".join(f"{name} {duration:.1f}s" for name, duration in timings.items())
+    Logger.print_info(f"Timings: {phases}")
+
+
+def install_python_requirements(
+    target: Path,
+    requirements: Path | List[Path],
+    force: bool = False,
+    constraints: List[Path] | None = None,
+) -> None:
+    """
+    Installs the python packages of one or more requirements files with a single
+    pip run, so all of them are resolved together. Pip is skipped if the same
+    requirements were installed with the same interpreter before and the
+    installed packages have not changed since. |
     :param target: Path of the virtualenv
-    :param requirements: Path to the requirements.txt file
+    :param requirements: Path or List of Paths to the requirements files
+    :param force: Run pip even if the requirements are up to date
+    :param constraints: List of constraints files
     :return: None
     """
+    # imported here, the settings depend on this module
+    from core.settings.kiauh_settings import KiauhSettings
+
+    if not isinstance(requirements, list):
+        requirements = [requirements]
+    files = [*requirements, *(constraints or [])]
+    pip_args = get_requirement_args(requirements, constraints)
+
+    force = force or bool(KiauhSettings().kiauh.force_pip_install)
+    if not force and is_up_to_date(target, files):
+        Logger.print_info("Python requirements are up to date, skipping pip ...")
+        return
+
+    timings: Dict[str, float] = {}
     try:
-        # always update pip before installing requirements
-        update_python_pip(target)
+        # update pip first, skipped if it is up to date or was already updated
+        with measure_phase(timings, "pip update"):
+            update_python_pip(target)
 
         Logger.print_status("Installing Python requirements ...")
-        command = [
-            target.joinpath("bin/pip").as_posix(),
-            "install",
-            "-r",
-            f"{requirements}",
-        ]
-        result = run(command, stderr=PIPE, text=True)
+        wheelhouse = get_wheelhouse()
+        if wheelhouse is not None:
+            with measure_phase(timings, "wheelhouse install"):
+                installed = install_from_wheelhouse(wheelhouse, target, pip_args)
+            if installed:
+                Logger.print_ok("Installing Python requirements successful!")
+                write_fingerprint(target, files)
+                print_phase_timings(timings)
+                return
+
+        command = [target.joinpath("bin/pip").as_posix(), "install", *pip_args]
+        with measure_phase(timings, "install"):
+            result = run(command, stderr=PIPE, text=True)
 
         if result.returncode != 0 or result.stderr:
             Logger.print_error(f"{result.stderr}", False)
             raise VenvCreationFailedException("Installing Python requirements failed!")
 
         Logger.print_ok("Installing Python requirements successful!")
+        write_fingerprint(target, files)
+        print_phase_timings(timings)
 
     except Exception as e:
         log = f"Error installing Python requirements: {e}"
@@ -197,12 +332,50 @@ def install_python_requirements(target: Path, requirements: Path) -> None:
         raise VenvCreationFailedException(log)
 
 
-def update_system_package_lists(silent: bool, rls_info_change=False) -> None:
+def install_from_wheelhouse(
+    wheelhouse: Wheelhouse, target: Path, pip_args: List[str]
+) -> bool:
     """
-    Updates the systems package list |
-    :param silent: Log info to the console or not
-    :param rls_info_change: Flag for "--allow-releaseinfo-change"
-    :return: None
+    Installs python requirements from the wheelhouse only. Missing wheels are
+    built first, if that fails the caller has to install from the package index. |
+    :param wheelhouse: the wheelhouse to install from
+    :param target: Path of the virtualenv
+    :param pip_args: the requirements and constraints arguments for pip
+    :return: True if the requirements were installed, False otherwise
+    """
+    try:
+        command = [
+            target.joinpath("bin/pip").as_posix(),
+            "install",
+            *wheelhouse.get_install_args(target),
+            *pip_args,
+        ]
+
+        # if all wheels are in the wheelhouse already, no network access is needed
+        if run(command, stdout=PIPE, stderr=PIPE).returncode != 0:
+            Logger.print_status("Building missing wheels ...")
+            if not wheelhouse.build(target, pip_args):
+                Logger.print_warn("Building wheels failed!")
+                return False
+
+            result = run(command, stderr=PIPE, text=True)
+            if result.returncode != 0:
+                Logger.print_error(f"{result.stderr}", False)
+                Logger.print_warn("Installing from the wheelhouse failed!")
+                return False
+
+        wheelhouse.mark_used(target)
+        wheelhouse.evict()
+        return True
+    except (OSError, CalledProcessError) as e:
+        Logger.print_warn(f"Unable to use the wheelhouse: {e}")
+        return False
+
+
+def check_package_lists_outdated() -> bool:
+    """
+    Checks if the last update of the systems package lists is too long ago |
+    :return: True if the package lists should be updated, False otherwise
     """
     cache_mtime: float = 0
     cache_files: List[Path] = [
@@ -216,7 +389,17 @@ def update_system_package_lists(silent: bool, rls_info_change=False) -> None:
     update_age = int(time.time() - cache_mtime)
     update_interval = 6 * 3600  # 48hrs
 
-    if update_age <= update_interval:
+    return update_age > update_interval
+
+
+def update_system_package_lists(silent: bool, rls_info_change=False) -> None:
+    """
+    Updates the systems package list |
+    :param silent: Log info to the console or not
+    :param rls_info_change: Flag for "--allow-releaseinfo-change"
+    :return: None
+    """
+    if not check_package_lists_outdated():
         return
 
     if not silent:
@@ -245,15 +428,7 @@ def get_upgradable_packages() -> List[str]:
     :return: A list of package names available for upgrade
     """
     try:
-        command = ["apt", "list", "--upgradable"]
-        output: str = check_output(command, stderr=DEVNULL, text=True, encoding="utf-8")
-        pkglist = []
-        for line in output.split("\n"):
-            if "/" not in line:
-                continue
-            pkg = line.split("/")[0]
-            pkglist.append(pkg)
-        return pkglist
+        return [upgrade.name for upgrade in get_package_upgrades()]
     except CalledProcessError as e:
         raise Exception(f"Error reading upgradable packages: {e}")
 
@@ -264,6 +439,10 @@ def check_package_install(packages: Set[str]) -> List[str]:
     :param packages: List of strings of package names
     :return: A list containing the names of packages that are not installed
     """
+    index = DpkgIndex()
+    if index.is_available:
+        return index.get_missing(sorted(packages))
+
     not_installed = []
     for package in packages:
         command = ["dpkg-query", "-f'${Status}'", "--show", package]
@@ -395,6 +574,32 @@ def set_nginx_permissions() -> None:
         Logger.print_ok("Permissions granted.")
 
 
+def run_sysctl(args: List[str], check: bool = False) -> CompletedProcess:
+    """
+    Runs systemctl with root permissions, either in the privileged worker
+    if it is running or with sudo. stderr is always captured as text. |
+    :param args: the systemctl arguments, e.g. ["restart", "klipper.service"]
+    :param check: raise CalledProcessError if systemctl failed
+    :return: CompletedProcess
+    """
+    command = ["sudo", "systemctl", *args]
+    results = run_privileged([{"op": "systemctl", "args": args}])
+    if results is None:
+        result = run(command, stderr=PIPE, text=True)
+    elif not results[0].get("ok"):
+        result = CompletedProcess(command, 1, stderr=results[0].get("error", ""))
+    else:
+        value = results[0]["value"]
+        result = CompletedProcess(
+            command, value["returncode"], value["stdout"], value["stderr"]
+        )
+
+    if check and result.returncode != 0:
+        raise CalledProcessError(result.returncode, command, stderr=result.stderr)
+
+    return result
+
+
 def cmd_sysctl_service(name: str, action: SysCtlServiceAction) -> None:
     """
     Helper method to execute several actions for a specific systemd service. |
@@ -402,21 +607,185 @@ def cmd_sysctl_service(name: str, action: SysCtlServiceAction) -> None:
     :param action: Either "start", "stop", "restart" or "disable"
     :return: None
     """
+    transaction = UnitTransaction.get_active()
+    if transaction is not None and transaction.queue(name, action):
+        return
+
     try:
         Logger.print_status(f"{action.capitalize()} {name} ...")
-        run(["sudo", "systemctl", action, name], stderr=PIPE, check=True)
+        run_sysctl([action, name], check=True)
         Logger.print_ok("OK!")
     except CalledProcessError as e:
-        log = f"Failed to {action} {name}: {e.stderr.decode()}"
+        log = f"Failed to {action} {name}: {e.stderr}"
         Logger.print_error(log)
         raise
 
 
+def cmd_sysctl_services(
+    names: List[str],
+    action: SysCtlServiceAction,
+    no_block: bool = False,
+    timeout: float = SYSCTL_WAIT_TIMEOUT,
+) -> None:
+    """
+    Helper method to execute an action for several systemd services with a single
+    systemctl call. The result is reported for each service individually. |
+    :param names: List of service names
+    :param action: Either "start", "stop", "restart", "enable" or "disable", ...
+    :param no_block: Don't wait for the jobs in systemctl, but poll the state of
+        the services until they reached the target state or the timeout expired
+    :param timeout: Seconds to wait for the target state in no-block mode
+    :return: None
+    :raises CalledProcessError: if the action failed for any of the services
+    """
+    if not names:
+        return
+
+    transaction = UnitTransaction.get_active()
+    if transaction is not None:
+        queued = [name for name in names if transaction.queue(name, action)]
+        names = [name for name in names if name not in queued]
+        if not names:
+            return
+
+    no_block = no_block and action in SYSCTL_TARGET_STATES
+    args: List[str] = [action]
+    if no_block:
+        args.append("--no-block")
+    args.extend(names)
+
+    # a restarted service is active before and after the restart,
+    # so we need to know when it was activated the last time
+    since: Dict[str, Dict[str, str]] = {}
+    if no_block and action == "restart":
+        since = get_sysctl_unit_properties(names, [SYSCTL_ACTIVE_ENTER])
+
+    result = run_sysctl(args)
+
+    failed: List[str] = []
+    if action in SYSCTL_TARGET_STATES and (no_block or result.returncode != 0):
+        # find out which of the services did not reach the target state
+        deadline = time.monotonic() + (timeout if no_block else 0)
+        failed = wait_for_sysctl_states(names, action, deadline, since)
+    elif result.returncode != 0:
+        failed = names
+
+    for name in names:
+        Logger.print_status(f"{action.capitalize()} {name} ...")
+        if name not in failed:
+            Logger.print_ok("OK!")
+            continue
+
+        lines = [line for line in result.stderr.splitlines() if name in line]
+        if not lines and len(names) == 1 and result.stderr.strip():
+            lines = [result.stderr.strip()]
+        error = "\n".join(lines) if lines else "Target state not reached!"
+        Logger.print_error(f"Failed to {action} {name}: {error}")
+
+    if failed:
+        raise CalledProcessError(
+            result.returncode or 1, result.args, stderr=result.stderr
+        )
+
+
+def wait_for_sysctl_states(
+    names: List[str],
+    action: SysCtlServiceAction,
+    deadline: float,
+    since: Dict[str, Dict[str, str]] | None = None,
+) -> List[str]:
+    """
+    Polls the state of systemd services until each of them reached the target
+    state of the given action or failed, or the deadline passed |
+    :param names: List of service names
+    :param action: Either "start", "stop" or "restart"
+    :param deadline: time.monotonic() value after which polling stops
+    :param since: Optional properties read before the action, a service that
+        has the same activation timestamp has not been restarted yet
+    :return: List of services that did not reach the target state
+    """
+    since = since or {}
+    targets = SYSCTL_TARGET_STATES[action]
+    props_names = ["ActiveState", "LoadState", SYSCTL_ACTIVE_ENTER]
+
+    def is_done(name: str, props: Dict[str, str]) -> bool:
+        state = props.get("ActiveState")
+        if state == "failed" or props.get("LoadState") != "loaded":
+            return True
+        if state not in targets:
+            return False
+        previous = since.get(name, {}).get(SYSCTL_ACTIVE_ENTER)
+        return previous is None or props.get(SYSCTL_ACTIVE_ENTER) != previous
+
+    pending = list(names)
+    while True:
+        states = get_sysctl_unit_properties(pending, props_names)
+        pending = [n for n in pending if not is_done(n, states.get(n, {}))]
+        if not pending or time.monotonic() >= deadline:
+            break
+        time.sleep(SYSCTL_POLL_INTERVAL)
+
+    states = get_sysctl_unit_properties(names, ["ActiveState"])
+    return [
+        name
+        for name in names
+        if name in pending or states.get(name, {}).get("ActiveState") not in targets
+    ]
+
+
+def get_sysctl_unit_properties(
+    names: List[str], properties: List[str]
+) -> Dict[str, Dict[str, str]]:
+    """
+    Reads properties of several systemd units with a single "systemctl show" call |
+    :param names: List of unit names
+    :param properties: List of property names, e.g. ["ActiveState", "SubState"]
+    :return: Dict of unit names and their properties, units systemctl could not
+        be queried for are missing
+    """
+    if not names:
+        return {}
+
+    try:
+        command = ["systemctl", "show", "-p", ",".join(properties), *names]
+        output = check_output(command, stderr=DEVNULL, text=True)
+    except (CalledProcessError, OSError):
+        return {}
+
+    # systemctl prints one block of properties per unit in the
+    # order they were requested, separated by an empty line
+    units: Dict[str, Dict[str, str]] = {}
+    for name, block in zip(names, output.strip().split("\n\n")):
+        units[name] = dict(
+            line.split("=", 1) for line in block.splitlines() if "=" in line
+        )
+    return units
+
+
+def get_service_states(names: List[str]) -> Dict[str, ServiceState]:
+    """
+    Reads the state of several systemd services with a single "systemctl show" call |
+    :param names: List of service names
+    :return: Dict of the provided service names and their ServiceState, services
+        systemctl could not be queried for are missing
+    """
+    units = get_sysctl_unit_properties(names, SERVICE_STATE_PROPERTIES)
+    return {name: parse_service_state(name, props) for name, props in units.items()}
+
+
 def cmd_sysctl_manage(action: SysCtlManageAction) -> None:
+    transaction = UnitTransaction.get_active()
+    if transaction is not None and action == "daemon-reload":
+        transaction.request_reload()
+        return
+    if transaction is not None and action == "reset-failed":
+        transaction.request_reset_failed()
+        return
+
     try:
-        run(["sudo", "systemctl", action], stderr=PIPE, check=True)
+        run_sysctl([action], check=True)
     except CalledProcessError as e:
-        log = f"Failed to run {action}: {e.stderr.decode()}"
+        log = f"Failed to run {action}: {e.stderr}"
         Logger.print_error(log)
         raise
 
@@ -431,14 +800,7 @@ def unit_file_exists(
     :param exclude: List of strings of names to exclude
     :return: True if the unit file exists, False otherwise
     """
-    exclude = exclude or []
-    pattern = re.compile(f"^{name}(-[0-9a-zA-Z]+)?.{suffix}$")
-    service_list = [
-        Path(SYSTEMD, service)
-        for service in SYSTEMD.iterdir()
-        if pattern.search(service.name) and not any(s in service.name for s in exclude)
-    ]
-    return any(service_list)
+    return any(InstanceRegistry().find_units(name, suffix, exclude))
 
 
 def log_process(process: Popen) -> None:
@@ -466,21 +828,74 @@ def log_process(process: Popen) -> None:
 def create_service_file(name: str, content: str) -> None:
     """
     Creates a service file at the provided path with the provided content.
+    If a UnitTransaction is active, the file is written when it is committed.
     :param name: the name of the service file
     :param content: the content of the service file
     :return: None
     """
-    try:
-        run(
-            ["sudo", "tee", SYSTEMD.joinpath(name)],
-            input=content.encode(),
-            stdout=DEVNULL,
-            check=True,
-        )
-        Logger.print_ok(f"Service file created: {SYSTEMD.joinpath(name)}")
-    except CalledProcessError as e:
-        Logger.print_error(f"Error creating service file: {e}")
-        raise
+    transaction = UnitTransaction.get_active()
+    if transaction is not None:
+        transaction.write(name, content)
+        return
+
+    write_service_files({name: content})
+
+
+def write_service_files(files: Dict[str, str]) -> None:
+    """
+    Writes several service files to the systemd directory with a single
+    privileged call, either one request to the privileged worker or
+    one "sudo install" for all files |
+    :param files: Dict of service file names and their content
+    :return: None
+    :raises CalledProcessError: if any of the files could not be written
+    """
+    if not files:
+        return
+
+    paths = {name: SYSTEMD.joinpath(name).as_posix() for name in files}
+    ops = [{"op": "write", "path": paths[n], "content": c} for n, c in files.items()]
+    results = run_privileged(ops)
+    if results is None:
+        install_service_files(files)
+        for path in paths.values():
+            Logger.print_ok(f"Service file created: {path}")
+        return
+
+    error: CalledProcessError | None = None
+    for name, result in zip(files, results):
+        try:
+            check_privileged_result(result, ["tee", paths[name]])
+            Logger.print_ok(f"Service file created: {paths[name]}")
+        except CalledProcessError as e:
+            Logger.print_error(f"Error creating service file: {e}")
+            error = error or e
+
+    if error is not None:
+        raise error
+
+
+def install_service_files(files: Dict[str, str]) -> None:
+    """
+    Renders the service files into a temporary directory and installs
+    all of them to the systemd directory with a single sudo call |
+    :param files: Dict of service file names and their content
+    :return: None
+    :raises CalledProcessError: if the files could not be installed
+    """
+    with tempfile.TemporaryDirectory(prefix="kiauh-units-") as tmp_dir:
+        sources = []
+        for name, content in files.items():
+            source = Path(tmp_dir, name)
+            source.write_text(content)
+            sources.append(source.as_posix())
+
+        cmd = ["sudo", "install", "-m", "644", "-t", SYSTEMD.as_posix(), *sources]
+        try:
+            run(cmd, stderr=PIPE, check=True)
+        except CalledProcessError as e:
+            Logger.print_error(f"Error creating service files: {e}")
+            raise
 
 
 def create_env_file(path: Path, content: str) -> None:
@@ -509,6 +924,11 @@ def remove_system_service(service_name: str) -> None:
         if not service_name.endswith(".service"):
             raise ValueError(f"service_name '{service_name}' must end with '.service'")
 
+        transaction = UnitTransaction.get_active()
+        if transaction is not None:
+            # a removed service must not be written or started afterward
+            transaction.discard(service_name)
+
         file: Path = SYSTEMD.joinpath(service_name)
         if not file.exists() or not file.is_file():
             Logger.print_info(f"Service '{service_name}' does not exist! Skipped ...")
@@ -518,6 +938,8 @@ def remove_system_service(service_name: str) -> None:
         cmd_sysctl_service(service_name, "stop")
         cmd_sysctl_service(service_name, "disable")
         remove_with_sudo(file)
+        # within a transaction, systemd is reloaded once after
+        # all services were removed, otherwise right away
         cmd_sysctl_manage("daemon-reload")
         cmd_sysctl_manage("reset-failed")
         Logger.print_ok(f"{service_name} successfully removed!")
@@ -0,0 +1,85 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from core.logger import Logger
+
+PLACEHOLDER_RE = re.compile(r"%(\w+)%")
+
+# the parts of a compiled template alternate between literal text
+# and placeholder names, starting and ending with literal text
+CompiledTemplate = List[str]
+
+_templates: Dict[Path, Tuple[Tuple[int, int], CompiledTemplate]] = {}
+_templates_lock = threading.Lock()
+
+
+def compile_template(content: str) -> CompiledTemplate:
+    """
+    Splits the content of a template into literal text and placeholders |
+    :param content: the content of the template
+    :return: the compiled template
+    """
+    return PLACEHOLDER_RE.split(content)
+
+
+def get_template(template: Path) -> CompiledTemplate:
+    """
+    Reads and compiles a template file. The compiled template is cached and only
+    read again after the mtime or size of the file changed. |
+    :param template: Path to the template file
+    :return: the compiled template
+    :raises FileNotFoundError: if the template file does not exist
+    """
+    try:
+        stat = os.stat(template)
+    except FileNotFoundError:
+        Logger.print_error(f"Unable to open {template} - File not found")
+        raise
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _templates_lock:
+        cached = _templates.get(template)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    with open(template, "r") as f:
+        compiled = compile_template(f.read())
+
+    with _templates_lock:
+        _templates[template] = (key, compiled)
+
+    return compiled
+
+
+def render_template(template: Path, values: Dict[str, str]) -> str:
+    """
+    Replaces all placeholders of a template file in a single pass. A placeholder
+    must be defined in the template file as %PLACEHOLDER%, placeholders without
+    a value are kept as they are. |
+    :param template: Path to the template file
+    :param values: Dict of placeholder names and their values
+    :return: the rendered content
+    :raises FileNotFoundError: if the template file does not exist
+    """
+    parts = get_template(template)
+    rendered = []
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            rendered.append(part)
+        else:
+            rendered.append(values.get(part, f"%{part}%"))
+
+    return "".join(rendered)